@@ -2,6 +2,7 @@ import re
 from collections import namedtuple
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, List, Mapping, NamedTuple, Sequence, Set, Tuple, Union
 
 from django.utils.functional import cached_property
@@ -1039,12 +1040,40 @@ default_config = SearchConfig(
 )
 
 
+#: Number of parse trees of search queries kept per process, see `parse_search_query_tree`
+PARSE_TREE_CACHE_SIZE = 1000
+
+#: Longest search query whose parse tree is cached
+PARSE_TREE_CACHE_MAX_QUERY_LENGTH = 2000
+
+
+@lru_cache(maxsize=PARSE_TREE_CACHE_SIZE)
+def _parse_search_query_tree(query: str) -> Node:
+    return event_search_grammar.parse(query)
+
+
+def parse_search_query_tree(query: str) -> Node:
+    """
+    Parses a search query with the grammar, which is by far the most
+    expensive part of `parse_search_query`. Alert rules, dashboards and
+    saved searches send the same queries over and over, so parse trees are
+    cached per process.
+
+    The tree only depends on the query, everything that depends on the
+    config or the params, such as relative dates, is resolved from the tree
+    by `SearchVisitor` on every search. Trees must not be modified.
+    """
+    if len(query) > PARSE_TREE_CACHE_MAX_QUERY_LENGTH:
+        return event_search_grammar.parse(query)
+    return _parse_search_query_tree(query)
+
+
 def parse_search_query(query, config=None, params=None) -> Sequence[SearchFilter]:
     if config is None:
         config = default_config
 
     try:
-        tree = event_search_grammar.parse(query)
+        tree = parse_search_query_tree(query)
     except IncompleteParseError as e:
         idx = e.column()
         prefix = query[max(0, idx - 5) : idx]
@@ -326,9 +326,11 @@ def handle_discard(request, group_list, projects, user):
             else:
                 groups_to_delete[group.project_id].append(group)
 
+                hashes = list(GroupHash.objects.filter(group=group).values_list("hash", flat=True))
                 GroupHash.objects.filter(group=group).update(
                     group=None, group_tombstone_id=tombstone.id
                 )
+                GroupHash.invalidate_cache(group.project_id, hashes)
 
     for project in projects:
         delete_group_list(request, project, groups_to_delete.get(project.id), delete_type="discard")
@@ -352,6 +354,12 @@ def delete_group_list(request, project, group_list, delete_type):
     eventstream_state = eventstream.start_delete_groups(project.id, group_ids)
     transaction_id = uuid4().hex
 
+    hashes = list(
+        GroupHash.objects.filter(project_id=project.id, group__id__in=group_ids).values_list(
+            "hash", flat=True
+        )
+    )
+
     # We do not want to delete split hashes as they are necessary for keeping groups... split.
     GroupHash.objects.filter(
         project_id=project.id, group__id__in=group_ids, state=GroupHash.State.SPLIT
@@ -359,6 +367,7 @@ def delete_group_list(request, project, group_list, delete_type):
     GroupHash.objects.filter(project_id=project.id, group__id__in=group_ids).exclude(
         state=GroupHash.State.SPLIT
     ).delete()
+    GroupHash.invalidate_cache(project.id, hashes)
 
     # We remove `GroupInbox` rows here so that they don't end up influencing queries for
     # `Group` instances that are pending deletion
@@ -1,16 +1,20 @@
 import functools
 import logging
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Iterable, Mapping, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
 
 import pytz
 import sentry_sdk
 from django.conf import settings
+from django.db import connections
 from django.db.models import Min, prefetch_related_objects
 from django.utils import timezone
+from sentry_sdk import Hub
 
-from sentry import tagstore, tsdb
+from sentry import options, tagstore, tsdb
 from sentry.api.serializers import Serializer, register, serialize
 from sentry.api.serializers.models.actor import ActorSerializer
 from sentry.app import env
@@ -72,6 +76,55 @@ def merge_list_dictionaries(dict1, dict2):
         dict1.setdefault(key, []).extend(val)
 
 
+_attrs_thread_pool = ThreadPoolExecutor(max_workers=10)
+_attrs_thread = threading.local()
+
+
+def _run_attrs_fetcher(name: str, fetcher: Callable[[], Any], hub: Hub) -> Any:
+    with hub.start_span(op="serializer.fetch_attrs", description=name):
+        return fetcher()
+
+
+def _run_attrs_fetcher_in_thread(name: str, fetcher: Callable[[], Any], hub: Hub) -> Any:
+    _attrs_thread.active = True
+    try:
+        with Hub(hub) as thread_hub:
+            return _run_attrs_fetcher(name, fetcher, thread_hub)
+    finally:
+        _attrs_thread.active = False
+        # Threads of the pool outlive requests, which usually close connections.
+        connections.close_all()
+
+
+def fetch_attrs(fetchers: Mapping[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Calls independent fetchers of serializer attributes and returns their
+    results by name. Every fetcher is reported as a span.
+
+    With the ``api.group-serializer.concurrent-attrs`` option the first
+    fetcher runs in the calling thread while all others run on a thread
+    pool, so the latency is that of the slowest fetcher rather than the sum
+    of all. Fetchers that run on the pool call this sequentially, as they
+    would otherwise wait for the pool they occupy.
+    """
+    hub = Hub.current
+    if (
+        len(fetchers) < 2
+        or getattr(_attrs_thread, "active", False)
+        or not options.get("api.group-serializer.concurrent-attrs")
+    ):
+        return {name: _run_attrs_fetcher(name, fetcher, hub) for name, fetcher in fetchers.items()}
+
+    (first_name, first_fetcher), *others = fetchers.items()
+    futures = {
+        name: _attrs_thread_pool.submit(_run_attrs_fetcher_in_thread, name, fetcher, hub)
+        for name, fetcher in others
+    }
+    results = {first_name: _run_attrs_fetcher(first_name, first_fetcher, hub)}
+    results.update((name, future.result()) for name, future in futures.items())
+    return results
+
+
 class GroupSerializerBase(Serializer):
     def __init__(
         self,
@@ -902,18 +955,21 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
                 start=self.start,
                 end=self.end,
             )
-            time_range_result = partial_execute_seen_stats_query()
-            filtered_result = (
-                partial_execute_seen_stats_query(conditions=self.conditions)
-                if self.conditions and not self._collapse("filtered")
-                else None
-            )
-            if not self._collapse("lifetime"):
-                lifetime_result = (
-                    partial_execute_seen_stats_query(start=None, end=None)
-                    if self.start or self.end
-                    else time_range_result
+            fetchers = {"seen_stats.time_range": partial_execute_seen_stats_query}
+            if self.conditions and not self._collapse("filtered"):
+                fetchers["seen_stats.filtered"] = functools.partial(
+                    partial_execute_seen_stats_query, conditions=self.conditions
+                )
+            if not self._collapse("lifetime") and (self.start or self.end):
+                fetchers["seen_stats.lifetime"] = functools.partial(
+                    partial_execute_seen_stats_query, start=None, end=None
                 )
+            results = fetch_attrs(fetchers)
+
+            time_range_result = results["seen_stats.time_range"]
+            filtered_result = results.get("seen_stats.filtered")
+            if not self._collapse("lifetime"):
+                lifetime_result = results.get("seen_stats.lifetime", time_range_result)
             else:
                 lifetime_result = None
 
@@ -936,90 +992,101 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
             **query_params,
         )
 
-    def get_attrs(self, item_list, user):
+    def _get_base_attrs(self, item_list, user):
         if not self._collapse("base"):
-            attrs = super().get_attrs(item_list, user)
-        else:
-            seen_stats = self._get_seen_stats(item_list, user)
-            if seen_stats:
-                attrs = {item: seen_stats.get(item, {}) for item in item_list}
+            return super().get_attrs(item_list, user)
+
+        seen_stats = self._get_seen_stats(item_list, user)
+        if seen_stats:
+            return {item: seen_stats.get(item, {}) for item in item_list}
+        return {item: {} for item in item_list}
+
+    def _get_session_counts(self, item_list):
+        uniq_project_ids = list({item.project_id for item in item_list})
+        cache_keys = {pid: self._build_session_cache_key(pid) for pid in uniq_project_ids}
+        cache_data = cache.get_many(cache_keys.values())
+        session_counts = {}
+        missed_items = []
+        for item in item_list:
+            num_sessions = cache_data.get(cache_keys[item.project_id])
+            if num_sessions is None:
+                found = "miss"
+                missed_items.append(item)
             else:
-                attrs = {item: {} for item in item_list}
+                found = "hit"
+                session_counts[item] = num_sessions
+            metrics.incr(f"group.get_session_counts.{found}")
+
+        if missed_items:
+            filters = {"project_id": list({item.project_id for item in missed_items})}
+            if self.environment_ids:
+                filters["environment"] = self.environment_ids
+
+            result_totals = raw_query(
+                selected_columns=["sessions"],
+                dataset=Dataset.Sessions,
+                start=self.start,
+                end=self.end,
+                filter_keys=filters,
+                groupby=["project_id"],
+                referrer="serializers.GroupSerializerSnuba.session_totals",
+            )
+
+            results = {}
+            for data in result_totals["data"]:
+                cache_key = self._build_session_cache_key(data["project_id"])
+                results[data["project_id"]] = data["sessions"]
+                cache.set(cache_key, data["sessions"], 3600)
+
+            for item in missed_items:
+                session_counts[item] = results.get(item.project_id)
+
+        return session_counts
+
+    def get_attrs(self, item_list, user):
+        # All fetchers are independent of each other, see `fetch_attrs`
+        fetchers = {"base": functools.partial(self._get_base_attrs, item_list, user)}
 
         if self.stats_period and not self._collapse("stats"):
             partial_get_stats = functools.partial(
                 self.get_stats, item_list=item_list, user=user, environment_ids=self.environment_ids
             )
-            stats = partial_get_stats()
-            filtered_stats = (
-                partial_get_stats(conditions=self.conditions)
-                if self.conditions and not self._collapse("filtered")
-                else None
-            )
+            fetchers["stats"] = partial_get_stats
+            if self.conditions and not self._collapse("filtered"):
+                fetchers["filtered_stats"] = functools.partial(
+                    partial_get_stats, conditions=self.conditions
+                )
+            if self._expand("sessions"):
+                fetchers["sessions"] = functools.partial(self._get_session_counts, item_list)
+
+        if self._expand("inbox"):
+            fetchers["inbox"] = functools.partial(get_inbox_details, item_list)
+
+        if self._expand("owners"):
+            fetchers["owners"] = functools.partial(get_owner_details, item_list)
+
+        results = fetch_attrs(fetchers)
+        attrs = results["base"]
+
+        if "stats" in results:
+            stats = results["stats"]
+            filtered_stats = results.get("filtered_stats")
             for item in item_list:
                 if filtered_stats:
                     attrs[item].update({"filtered_stats": filtered_stats[item.id]})
                 attrs[item].update({"stats": stats[item.id]})
 
-            if self._expand("sessions"):
-                uniq_project_ids = list({item.project_id for item in item_list})
-                cache_keys = {pid: self._build_session_cache_key(pid) for pid in uniq_project_ids}
-                cache_data = cache.get_many(cache_keys.values())
-                missed_items = []
-                for item in item_list:
-                    num_sessions = cache_data.get(cache_keys[item.project_id])
-                    if num_sessions is None:
-                        found = "miss"
-                        missed_items.append(item)
-                    else:
-                        found = "hit"
-                        attrs[item].update(
-                            {
-                                "sessionCount": num_sessions,
-                            }
-                        )
-                    metrics.incr(f"group.get_session_counts.{found}")
-
-                if missed_items:
-                    filters = {"project_id": list({item.project_id for item in missed_items})}
-                    if self.environment_ids:
-                        filters["environment"] = self.environment_ids
-
-                    result_totals = raw_query(
-                        selected_columns=["sessions"],
-                        dataset=Dataset.Sessions,
-                        start=self.start,
-                        end=self.end,
-                        filter_keys=filters,
-                        groupby=["project_id"],
-                        referrer="serializers.GroupSerializerSnuba.session_totals",
-                    )
-
-                    results = {}
-                    for data in result_totals["data"]:
-                        cache_key = self._build_session_cache_key(data["project_id"])
-                        results[data["project_id"]] = data["sessions"]
-                        cache.set(cache_key, data["sessions"], 3600)
-
-                    for item in missed_items:
-                        if item.project_id in results.keys():
-                            attrs[item].update(
-                                {
-                                    "sessionCount": results[item.project_id],
-                                }
-                            )
-                        else:
-                            attrs[item].update({"sessionCount": None})
+        if "sessions" in results:
+            for item in item_list:
+                attrs[item].update({"sessionCount": results["sessions"][item]})
 
-        if self._expand("inbox"):
-            inbox_stats = get_inbox_details(item_list)
+        if "inbox" in results:
             for item in item_list:
-                attrs[item].update({"inbox": inbox_stats.get(item.id)})
+                attrs[item].update({"inbox": results["inbox"].get(item.id)})
 
-        if self._expand("owners"):
-            owner_details = get_owner_details(item_list)
+        if "owners" in results:
             for item in item_list:
-                attrs[item].update({"owners": owner_details.get(item.id)})
+                attrs[item].update({"owners": results["owners"].get(item.id)})
 
         return attrs
 
@@ -1082,8 +1149,7 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
             start_key = start_key.replace(minute=0)
 
         if self.environment_ids:
-            self.environment_ids.sort()
-            env_key = "-".join(str(eid) for eid in self.environment_ids)
+            env_key = "-".join(str(eid) for eid in sorted(self.environment_ids))
 
         start_key = start_key.strftime("%m/%d/%Y, %H:%M:%S") if start_key != "" else ""
         end_key = end_key.strftime("%m/%d/%Y, %H:%M:%S") if end_key != "" else ""
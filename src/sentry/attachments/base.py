@@ -132,6 +132,22 @@ class BaseAttachmentCache:
         key = ATTACHMENT_DATA_CHUNK_KEY.format(key=key, id=id, chunk_index=chunk_index)
         self.inner.set(key, zlib.compress(chunk_data), timeout, raw=True)
 
+    def set_chunks(self, chunks, timeout=None):
+        """
+        Store multiple chunks at once. ``chunks`` is an iterable of
+        ``(key, id, chunk_index, chunk_data)`` tuples.
+        """
+        self.inner.set_many(
+            {
+                ATTACHMENT_DATA_CHUNK_KEY.format(
+                    key=key, id=id, chunk_index=chunk_index
+                ): zlib.compress(chunk_data)
+                for key, id, chunk_index, chunk_data in chunks
+            },
+            timeout,
+            raw=True,
+        )
+
     def set_unchunked_data(self, key, id, data, timeout=None, metrics_tags=None):
         key = ATTACHMENT_UNCHUNKED_DATA_KEY.format(key=key, id=id)
         compressed = zlib.compress(data)
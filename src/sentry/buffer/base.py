@@ -1,6 +1,7 @@
 import logging
+from collections import defaultdict
 
-from django.db.models import F
+from django.db.models import Case, F, Value, When
 
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
@@ -28,7 +29,7 @@ class Buffer(Service, metaclass=BufferMount):
     keep up with the updates.
     """
 
-    __all__ = ("incr", "process", "process_pending", "validate")
+    __all__ = ("incr", "process", "process_batch", "process_pending", "validate")
 
     def incr(self, model, columns, filters, extra=None, signal_only=None):
         """
@@ -51,27 +52,31 @@ class Buffer(Service, metaclass=BufferMount):
     def process_pending(self, partition=None):
         return []
 
-    def process(self, model, columns, filters, extra=None, signal_only=None):
+    def _get_update_kwargs(self, model, columns, extra=None):
         from sentry.event_manager import ScoreClause
         from sentry.models import Group
 
+        update_kwargs = {c: F(c) + v for c, v in columns.items()}
+
+        if extra:
+            update_kwargs.update(extra)
+
+        # HACK(dcramer): this is gross, but we don't have a good hook to compute this property today
+        # XXX(dcramer): remove once we can replace 'priority' with something reasonable via Snuba
+        if model is Group and "last_seen" in update_kwargs and "times_seen" in update_kwargs:
+            update_kwargs["score"] = ScoreClause(
+                group=None,
+                times_seen=update_kwargs["times_seen"],
+                last_seen=update_kwargs["last_seen"],
+            )
+
+        return update_kwargs
+
+    def process(self, model, columns, filters, extra=None, signal_only=None):
         created = False
 
         if not signal_only:
-            update_kwargs = {c: F(c) + v for c, v in columns.items()}
-
-            if extra:
-                update_kwargs.update(extra)
-
-            # HACK(dcramer): this is gross, but we don't have a good hook to compute this property today
-            # XXX(dcramer): remove once we can replace 'priority' with something reasonable via Snuba
-            if model is Group and "last_seen" in update_kwargs and "times_seen" in update_kwargs:
-                update_kwargs["score"] = ScoreClause(
-                    group=None,
-                    times_seen=update_kwargs["times_seen"],
-                    last_seen=update_kwargs["last_seen"],
-                )
-
+            update_kwargs = self._get_update_kwargs(model, columns, extra)
             _, created = model.objects.create_or_update(values=update_kwargs, **filters)
 
         buffer_incr_complete.send_robust(
@@ -82,3 +87,63 @@ class Buffer(Service, metaclass=BufferMount):
             created=created,
             sender=model,
         )
+
+    def process_batch(self, model, updates):
+        """
+        Processes many buffered updates of a model, `updates` being a list of
+        ``(columns, filters, extra, signal_only)`` tuples as passed to
+        `process`.
+
+        Updates of existing rows filtered only by their primary key are
+        applied with a single UPDATE statement per set of updated columns.
+        All other updates are processed one by one.
+        """
+        bulk_updates = defaultdict(dict)
+        for columns, filters, extra, signal_only in updates:
+            if signal_only or len(filters) != 1 or not ({"id", "pk"} & filters.keys()):
+                Buffer.process(self, model, columns, filters, extra, signal_only)
+                continue
+
+            (pk,) = filters.values()
+            shape = (tuple(sorted(columns)), tuple(sorted(extra or ())))
+            bulk_updates[shape][pk] = (columns, filters, extra)
+
+        for rows in bulk_updates.values():
+            existing = set(model.objects.filter(pk__in=list(rows)).values_list("pk", flat=True))
+
+            # Rows that do not exist (anymore) go through `create_or_update`
+            for pk in set(rows) - existing:
+                columns, filters, extra = rows.pop(pk)
+                Buffer.process(self, model, columns, filters, extra)
+
+            if not rows:
+                continue
+
+            update_kwargs = {
+                pk: self._get_update_kwargs(model, columns, extra)
+                for pk, (columns, _, extra) in rows.items()
+            }
+            fields = next(iter(update_kwargs.values())).keys()
+
+            values = {}
+            for name in fields:
+                field = model._meta.get_field(name)
+                whens = []
+                for pk, kwargs in update_kwargs.items():
+                    value = kwargs[name]
+                    if not hasattr(value, "resolve_expression"):
+                        value = Value(value, output_field=field)
+                    whens.append(When(pk=pk, then=value))
+                values[name] = Case(*whens, default=F(name), output_field=field)
+
+            model.objects.filter(pk__in=list(rows)).update(**values)
+
+            for columns, filters, extra in rows.values():
+                buffer_incr_complete.send_robust(
+                    model=model,
+                    columns=columns,
+                    filters=filters,
+                    extra=extra,
+                    created=False,
+                    sender=model,
+                )
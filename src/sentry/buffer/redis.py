@@ -1,12 +1,16 @@
 import pickle
+import struct
 import threading
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 from time import time
 
+import msgpack
 from django.db import models
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 
+from sentry import options
 from sentry.buffer import Buffer
 from sentry.exceptions import InvalidConfiguration
 from sentry.tasks.process_buffer import process_incr, process_pending
@@ -19,6 +23,43 @@ from sentry.utils.redis import get_cluster_from_options
 _local_buffers = None
 _local_buffers_lock = threading.Lock()
 
+# Prefix of values in the versioned msgpack format. It is neither a pickle
+# opcode nor the start of a JSON document, so all formats can be told apart.
+MSGPACK_PREFIX = b"\x01"
+# msgpack extension type of timezone aware datetimes, packed as microseconds
+# since the epoch
+DATETIME_EXT_TYPE = 1
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _msgpack_default(value):
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        micros = (value - EPOCH) // timedelta(microseconds=1)
+        return msgpack.ExtType(DATETIME_EXT_TYPE, struct.pack(">q", micros))
+    raise TypeError(type(value))
+
+
+def _is_msgpack_exact(value):
+    """
+    Whether msgpack restores a value with the same types. Tuples would come
+    back as lists, or break decoding when used as map keys.
+    """
+    if isinstance(value, tuple):
+        return False
+    if isinstance(value, list):
+        return all(_is_msgpack_exact(item) for item in value)
+    if isinstance(value, dict):
+        return all(_is_msgpack_exact(k) and _is_msgpack_exact(v) for k, v in value.items())
+    return True
+
+
+def _msgpack_ext_hook(code, data):
+    if code == DATETIME_EXT_TYPE:
+        (micros,) = struct.unpack(">q", data)
+        return EPOCH + timedelta(microseconds=micros)
+    return msgpack.ExtType(code, data)
+
 
 class PendingBuffer:
     def __init__(self, size):
@@ -129,6 +170,38 @@ class RedisBuffer(Buffer):
             result[k] = self._load_value((t, v))
         return result
 
+    def _dump_field(self, value, use_msgpack):
+        """
+        Encodes filters or an extra value for the buffer hash. Values that
+        msgpack cannot represent exactly (e.g. model instances, expressions or
+        tuples) are pickled.
+        """
+        if use_msgpack and _is_msgpack_exact(value):
+            try:
+                return MSGPACK_PREFIX + msgpack.packb(
+                    value, default=_msgpack_default, use_bin_type=True
+                )
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return pickle.dumps(value)
+
+    def _load_field(self, payload, json_prefix):
+        """
+        Decodes filters or an extra value written in any of the supported
+        formats: msgpack, typed JSON or pickle.
+        """
+        if payload.startswith(MSGPACK_PREFIX):
+            # Maps with keys other than strings, such as ints, are valid.
+            return msgpack.unpackb(
+                payload[1:], raw=False, ext_hook=_msgpack_ext_hook, strict_map_key=False
+            )
+        elif payload.startswith(json_prefix):
+            if json_prefix == b"{":
+                return self._load_values(json.loads(payload.decode("utf-8")))
+            return self._load_value(json.loads(payload.decode("utf-8")))
+        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+        return pickle.loads(payload)
+
     def _load_value(self, payload):
         (type_, value) = payload
         if type_ == "s":
@@ -161,12 +234,12 @@ class RedisBuffer(Buffer):
         # keys (one per Redis partition)
         conn = self.cluster.get_local_client_for_key(key)
 
+        # Readers of all formats have to be deployed before this is enabled
+        use_msgpack = options.get("buffer.write-msgpack")
+
         pipe = conn.pipeline()
         pipe.hsetnx(key, "m", f"{model.__module__}.{model.__name__}")
-        # TODO(dcramer): once this goes live in production, we can kill the pickle path
-        # (this is to ensure a zero downtime deploy where we can transition event processing)
-        pipe.hsetnx(key, "f", pickle.dumps(filters))
-        # pipe.hsetnx(key, 'f', json.dumps(self._dump_values(filters)))
+        pipe.hsetnx(key, "f", self._dump_field(filters, use_msgpack))
         for column, amount in columns.items():
             pipe.hincrby(key, "i+" + column, amount)
 
@@ -175,10 +248,7 @@ class RedisBuffer(Buffer):
             # hook here
             # e.g. "update score if last_seen or times_seen is changed"
             for column, value in extra.items():
-                # TODO(dcramer): once this goes live in production, we can kill the pickle path
-                # (this is to ensure a zero downtime deploy where we can transition event processing)
-                pipe.hset(key, "e+" + column, pickle.dumps(value))
-                # pipe.hset(key, 'e+' + column, json.dumps(self._dump_value(value)))
+                pipe.hset(key, "e+" + column, self._dump_field(value, use_msgpack))
 
         if signal_only is True:
             pipe.hset(key, "s", "1")
@@ -243,9 +313,103 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if len(batch_keys) > 1 and options.get("buffer.process-batched"):
+            self._process_batch(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
+    def _load_buffer_values(self, key, values):
+        """
+        Decodes a buffer hash into the ``(model, columns, filters, extra,
+        signal_only)`` arguments of `Buffer.process`.  Returns `None` if the
+        hash was already processed.
+        """
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_text(k): v for k, v in values.items()}
+
+        if not values:
+            metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+            self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            return None
+
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))  # NOQA
+
+        filters = self._load_field(values.pop("f"), json_prefix=b"{")
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                extra_values[k[2:]] = self._load_field(v, json_prefix=b"[")
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
+
+    def _process_batch(self, keys):
+        """
+        Processes many keys at once: locks are acquired and hashes drained
+        with one round trip per Redis host, and updates are applied in bulk
+        per model with `Buffer.process_batch`.
+        """
+        # prevent a stampede due to the way we use celery etas + duplicate
+        # tasks
+        with self.cluster.map() as conn:
+            locks = {key: conn.set(self._make_lock_key(key), "1", nx=True, ex=10) for key in keys}
+
+        locked_keys = []
+        for key, lock in locks.items():
+            if lock.value:
+                locked_keys.append(key)
+            else:
+                metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.locked", extra={"redis_key": key})
+
+        try:
+            router = self.cluster.get_router()
+            keys_by_host = defaultdict(list)
+            for key in locked_keys:
+                keys_by_host[router.get_host_for_key(key)].append(key)
+
+            # Pending keys live on the host of the keys they reference, and
+            # draining a hash has to be atomic, so each host gets one
+            # transaction.
+            values_by_key = {}
+            for host_id, host_keys in keys_by_host.items():
+                pipe = self.cluster.get_local_client(host_id).pipeline()
+                for key in host_keys:
+                    pipe.hgetall(key)
+                    pipe.zrem(self._make_pending_key_from_key(key), key)
+                    pipe.delete(key)
+                results = pipe.execute()
+                values_by_key.update(zip(host_keys, results[::3]))
+
+            updates_by_model = defaultdict(list)
+            for key, values in values_by_key.items():
+                update = self._load_buffer_values(key, values)
+                if update is not None:
+                    model, *args = update
+                    updates_by_model[model].append(args)
+
+            metrics.timing("buffer.batch-size", len(values_by_key))
+            for model, updates in updates_by_model.items():
+                super().process_batch(model, updates)
+        finally:
+            if locked_keys:
+                with self.cluster.map() as conn:
+                    for key in locked_keys:
+                        conn.delete(self._make_lock_key(key))
+
     def _process_single_incr(self, key):
         client = self.cluster.get_routing_client()
         lock_key = self._make_lock_key(key)
@@ -266,42 +430,10 @@ class RedisBuffer(Buffer):
             pipe.delete(key)
             values = pipe.execute()[0]
 
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_text(k): v for k, v in values.items()}
-
-            if not values:
-                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
-                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            update = self._load_buffer_values(key, values)
+            if update is None:
                 return
 
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))  # NOQA
-
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super().process(model, incr_values, filters, extra_values, signal_only)
+            super().process(*update)
         finally:
             client.delete(lock_key)
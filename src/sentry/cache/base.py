@@ -38,6 +38,27 @@ class BaseCache(local):
     def get(self, key, version=None, raw=False):
         raise NotImplementedError
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        """
+        Store a mapping of key to value. Backends should override this to
+        store all values in a single round trip.
+        """
+        for key, value in items.items():
+            self.set(key, value, timeout, version=version, raw=raw)
+
+    def get_many(self, keys, version=None, raw=False):
+        """
+        Fetch multiple keys at once. Returns a mapping of key to value for all
+        keys that were found. Backends should override this to fetch all keys
+        in a single round trip.
+        """
+        rv = {}
+        for key in keys:
+            value = self.get(key, version=version, raw=raw)
+            if value is not None:
+                rv[key] = value
+        return rv
+
     def _mark_transaction(self, op):
         """
         Mark transaction with a tag so we can identify system components that rely
@@ -16,15 +16,21 @@ class CommonRedisCache(BaseCache):
         self.client = client
         BaseCache.__init__(self, **options)
 
-    def set(self, key, value, timeout, version=None, raw=False):
-        key = self.make_key(key, version=version)
+    def _encode(self, key, value, raw):
         v = json.dumps(value) if not raw else value
         if len(v) > self.max_size:
             raise ValueTooLarge(f"Cache key too large: {key!r} {len(v)!r}")
+        return v
+
+    def _set(self, client, key, v, timeout):
         if timeout:
-            self.client.setex(key, int(timeout), v)
+            client.setex(key, int(timeout), v)
         else:
-            self.client.set(key, v)
+            client.set(key, v)
+
+    def set(self, key, value, timeout, version=None, raw=False):
+        key = self.make_key(key, version=version)
+        self._set(self.client, key, self._encode(key, value, raw), timeout)
 
         self._mark_transaction("set")
 
@@ -51,6 +57,19 @@ class RbCache(CommonRedisCache):
         client = cluster.get_routing_client()
         CommonRedisCache.__init__(self, client, **options)
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        values = {}
+        for key, value in items.items():
+            key = self.make_key(key, version=version)
+            values[key] = self._encode(key, value, raw)
+
+        # Commands issued on a mapping client are sent in one batch per host.
+        with self.client.map() as client:
+            for key, v in values.items():
+                self._set(client, key, v, timeout)
+
+        self._mark_transaction("set_many")
+
 
 # Confusing legacy name for RbCache.  We don't actually have a pure redis cache
 RedisCache = RbCache
@@ -60,3 +79,31 @@ class RedisClusterCache(CommonRedisCache):
     def __init__(self, cluster_id, **options):
         client = redis_clusters.get(cluster_id)
         CommonRedisCache.__init__(self, client=client, **options)
+
+    def set_many(self, items, timeout, version=None, raw=False):
+        values = {}
+        for key, value in items.items():
+            key = self.make_key(key, version=version)
+            values[key] = self._encode(key, value, raw)
+
+        with self.client.pipeline(transaction=False) as pipe:
+            for key, v in values.items():
+                self._set(pipe, key, v, timeout)
+            pipe.execute()
+
+        self._mark_transaction("set_many")
+
+    def get_many(self, keys, version=None, raw=False):
+        keys = list(keys)
+        with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(self.make_key(key, version=version))
+            results = pipe.execute()
+
+        self._mark_transaction("get_many")
+
+        rv = {}
+        for key, result in zip(keys, results):
+            if result is not None:
+                rv[key] = result if raw else json.loads(result)
+        return rv
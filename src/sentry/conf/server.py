@@ -1313,6 +1313,18 @@ SENTRY_SNUBA = os.environ.get("SNUBA", "http://127.0.0.1:1218")
 SENTRY_SNUBA_TIMEOUT = 30
 SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
 
+# Seconds model instances are kept in a per-process cache in front of the
+# shared cache by `get_from_cache` and `get_many_from_cache`, by model label.
+# Every process saving the models needs the same configuration to invalidate
+# the caches of the other processes, e.g. {"sentry.project": 10}.
+SENTRY_MODEL_LOCAL_CACHE_TTLS = {}
+# Number of instances kept in the per-process cache of each model
+SENTRY_MODEL_LOCAL_CACHE_SIZE = 1000
+
+# Seconds between refreshes of the per-process snapshot of killswitch options.
+# 0 looks up the options on every check.
+SENTRY_KILLSWITCH_SNAPSHOT_INTERVAL = 0
+
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS = {}
@@ -2311,6 +2323,9 @@ SENTRY_REPROCESSING_ATTACHMENT_CHUNK_SIZE = 2 ** 20
 
 SENTRY_REPROCESSING_SYNC_REDIS_CLUSTER = "default"
 
+# Redis cluster of the sliding window counters of frequency alert conditions
+SENTRY_RULE_FREQUENCY_COUNTERS_REDIS_CLUSTER = "default"
+
 # Timeout for the project counter statement execution.
 # In case of contention on the project counter, prevent workers saturation with
 # save_event tasks from single project.
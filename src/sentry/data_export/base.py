@@ -4,6 +4,9 @@ from enum import Enum
 MAX_BATCH_SIZE = 8 * 1024 * 1024
 EXPORTED_ROWS_LIMIT = 10000000
 SNUBA_MAX_RESULTS = 10000
+# Byte offsets of the blobs of each shard of an export start at a multiple of this, so that
+# ordering blobs by offset stitches the shards in order. Larger than the export file limit.
+EXPORT_SHARD_OFFSET_STRIDE = 2 ** 32
 DEFAULT_EXPIRATION = timedelta(weeks=4)
 
 
@@ -2,7 +2,7 @@ import logging
 
 from sentry.api.utils import get_date_range_from_params
 from sentry.models import Environment, Group, Project
-from sentry.search.events.fields import get_function_alias
+from sentry.search.events.fields import get_function_alias, is_function
 from sentry.snuba import discover
 from sentry.utils.compat import map
 
@@ -45,6 +45,16 @@ class DiscoverProcessor:
             params=self.params,
             sort=discover_query.get("sort"),
         )
+        self.supports_keyset_pagination = (
+            not equations
+            and not any(is_function(field) for field in discover_query["field"])
+            and discover_query.get("sort") in (None, "", "-timestamp")
+        )
+        self.keyset_data_fn = self.get_keyset_data_fn(
+            fields=discover_query["field"],
+            query=discover_query["query"],
+            params=self.params,
+        )
 
     @staticmethod
     def get_projects(organization_id, query):
@@ -93,6 +103,31 @@ class DiscoverProcessor:
 
         return data_fn
 
+    @staticmethod
+    def get_keyset_data_fn(fields, query, params):
+        """
+        Returns a function that fetches events between `start` and `end` sorted by
+        timestamp and event id, newest first. Callers paginate by moving `end` to the
+        timestamp of the last row and skipping the rows already seen at that timestamp,
+        so that `offset` stays small no matter how many rows were exported before.
+        Only applicable to queries without aggregates, see `supports_keyset_pagination`.
+        """
+        selected_columns = fields + [field for field in ("timestamp", "id") if field not in fields]
+
+        def data_fn(start, end, offset, limit):
+            return discover.query(
+                selected_columns=selected_columns,
+                query=query,
+                params=dict(params, start=start, end=end),
+                offset=offset,
+                orderby=["-timestamp", "-id"],
+                limit=limit,
+                referrer="data_export.tasks.discover_keyset",
+                auto_fields=True,
+            )
+
+        return data_fn
+
     def handle_fields(self, result_list):
         # Find issue short_id if present
         # (originally in `/api/bases/organization_events.py`)
@@ -2,15 +2,18 @@ import codecs
 import csv
 import logging
 import tempfile
+from datetime import timedelta
 from hashlib import sha1
 
 import sentry_sdk
 from celery.exceptions import MaxRetriesExceededError
 from celery.task import current
+from dateutil.parser import parse as parse_date
 from django.core.files.base import ContentFile
 from django.db import IntegrityError, router
 from django.utils import timezone
 
+from sentry import options
 from sentry.models import (
     DEFAULT_BLOB_SIZE,
     MAX_FILE_SIZE,
@@ -20,11 +23,13 @@ from sentry.models import (
     FileBlobIndex,
 )
 from sentry.tasks.base import instrumented_task
-from sentry.utils import metrics
+from sentry.utils import metrics, redis
+from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.db import atomic_transaction
 from sentry.utils.sdk import capture_exception
 
 from .base import (
+    EXPORT_SHARD_OFFSET_STRIDE,
     EXPORTED_ROWS_LIMIT,
     MAX_BATCH_SIZE,
     SNUBA_MAX_RESULTS,
@@ -38,6 +43,9 @@ from .utils import handle_snuba_errors
 
 logger = logging.getLogger(__name__)
 
+# How long the state of the shards of an export is kept
+SHARD_STATE_TTL = int(timedelta(days=1).total_seconds())
+
 
 @instrumented_task(
     name="sentry.data_export.tasks.assemble_download",
@@ -104,6 +112,12 @@ def assemble_download(
 
             processor = get_processor(data_export, environment_id)
 
+            num_shards = get_export_shard_count(data_export, processor, export_limit)
+            if first_page and num_shards:
+                return assemble_shards(
+                    data_export, processor, batch_size, environment_id, num_shards
+                )
+
             with tempfile.TemporaryFile(mode="w+b") as tf:
                 # XXX(python3):
                 #
@@ -204,6 +218,219 @@ def assemble_download(
                 merge_export_blobs.delay(data_export_id)
 
 
+@instrumented_task(
+    name="sentry.data_export.tasks.assemble_download_shard",
+    queue="data_export",
+    default_retry_delay=60,
+    max_retries=3,
+    acks_late=True,
+)
+def assemble_download_shard(
+    data_export_id,
+    shard,
+    num_shards,
+    start,
+    end,
+    batch_size=SNUBA_MAX_RESULTS,
+    skip=0,
+    bytes_written=0,
+    environment_id=None,
+    export_retries=3,
+    countdown=60,
+    **kwargs,
+):
+    """
+    Exports the rows of a Discover export between the `start` and `end` timestamps, see
+    `assemble_shards`. Like `assemble_download`, each task writes up to MAX_BATCH_SIZE
+    bytes and then schedules itself for the rest of the shard, continuing from the
+    keyset cursor `end` and `skip`.
+    """
+    with sentry_sdk.start_transaction(
+        op="task.data_export.assemble_shard",
+        name="DataExportAssembleShard",
+        sampled=True,
+    ):
+        try:
+            data_export = ExportedData.objects.get(id=data_export_id)
+        except ExportedData.DoesNotExist as error:
+            logger.exception(error)
+            return
+
+        logger.info(
+            "dataexport.run_shard",
+            extra={"data_export_id": data_export_id, "shard": shard, "end": end, "skip": skip},
+        )
+
+        try:
+            processor = get_processor(data_export, environment_id)
+
+            with tempfile.TemporaryFile(mode="w+b") as tf:
+                tfw = codecs.getwriter("utf-8")(tf)
+
+                writer = csv.DictWriter(tfw, processor.header_fields, extrasaction="ignore")
+                if shard == 0 and bytes_written == 0:
+                    writer.writeheader()
+
+                starting_pos = tf.tell()
+                shard_start = to_datetime(start)
+                next_end = to_datetime(end)
+                next_skip = skip
+
+                while True:
+                    rows, next_end, next_skip = process_discover_keyset(
+                        processor, shard_start, next_end, next_skip, batch_size
+                    )
+                    writer.writerows(rows)
+
+                    if len(rows) < batch_size or tf.tell() - starting_pos >= MAX_BATCH_SIZE:
+                        break
+
+                chunk_size = tf.tell()
+                tf.seek(0)
+                new_bytes_written = store_export_chunk_as_blob(
+                    data_export,
+                    bytes_written,
+                    tf,
+                    offset_base=shard * EXPORT_SHARD_OFFSET_STRIDE,
+                )
+                bytes_written += new_bytes_written
+        except ExportError as error:
+            if error.recoverable and export_retries > 0:
+                assemble_download_shard.apply_async(
+                    args=[data_export_id],
+                    kwargs={
+                        "shard": shard,
+                        "num_shards": num_shards,
+                        "start": start,
+                        "end": end,
+                        "batch_size": batch_size // 2,
+                        "skip": skip,
+                        "bytes_written": bytes_written,
+                        "environment_id": environment_id,
+                        "export_retries": export_retries - 1,
+                    },
+                    countdown=countdown,
+                )
+            else:
+                return data_export.email_failure(message=str(error))
+        except Exception as error:
+            metrics.incr("dataexport.error", tags={"error": str(error)}, sample_rate=1.0)
+            logger.error(
+                "dataexport.error: %s",
+                str(error),
+                extra={"query": data_export.payload, "org": data_export.organization_id},
+            )
+            capture_exception(error)
+
+            try:
+                current.retry()
+            except MaxRetriesExceededError:
+                metrics.incr(
+                    "dataexport.end",
+                    tags={"success": False, "error": str(error)},
+                    sample_rate=1.0,
+                )
+                return data_export.email_failure(message="Internal processing failure")
+        else:
+            if len(rows) >= batch_size and new_bytes_written:
+                assemble_download_shard.delay(
+                    data_export_id,
+                    shard=shard,
+                    num_shards=num_shards,
+                    start=start,
+                    end=to_timestamp(next_end),
+                    batch_size=batch_size,
+                    skip=next_skip,
+                    bytes_written=bytes_written,
+                    environment_id=environment_id,
+                    export_retries=export_retries,
+                )
+            else:
+                # Nothing was stored although there were rows, because the shard reached
+                # the file size limit.
+                truncated = chunk_size > 0 and not new_bytes_written
+                finish_export_shard(data_export_id, shard, num_shards, bytes_written, truncated)
+
+
+def get_export_shard_count(data_export, processor, export_limit):
+    """
+    Returns the number of time range shards a Discover export is split into, or 0 if it is
+    exported with offset pagination by `assemble_download`. Only queries without
+    aggregates can be paginated on timestamp and event id. Exports with a row limit aren't
+    sharded, since shards don't know how many rows the others export.
+    """
+    if data_export.query_type != ExportQueryType.DISCOVER or export_limit < EXPORTED_ROWS_LIMIT:
+        return 0
+    if not processor.supports_keyset_pagination:
+        return 0
+    return options.get("dataexport.discover-keyset-shards")
+
+
+def assemble_shards(data_export, processor, batch_size, environment_id, num_shards):
+    """
+    Splits the time range of a Discover export into `num_shards` contiguous ranges, newest
+    first, and schedules `assemble_download_shard` for each of them.
+    """
+    start, end = processor.start, processor.end
+    step = (end - start) / num_shards
+    boundaries = [end]
+    for index in range(1, num_shards):
+        boundaries.append((end - step * index).replace(microsecond=0))
+    boundaries.append(start)
+
+    logger.info(
+        "dataexport.shard",
+        extra={"data_export_id": data_export.id, "num_shards": num_shards},
+    )
+    for shard in range(num_shards):
+        assemble_download_shard.delay(
+            data_export.id,
+            shard=shard,
+            num_shards=num_shards,
+            start=to_timestamp(boundaries[shard + 1]),
+            end=to_timestamp(boundaries[shard]),
+            batch_size=batch_size,
+            environment_id=environment_id,
+        )
+
+
+def finish_export_shard(data_export_id, shard, num_shards, bytes_written, truncated):
+    """
+    Records that a shard of an export is done. The last shard to finish schedules
+    `merge_export_blobs` with the shards that fit the export file size limit: shards are
+    included in order until one no longer fits or one was truncated, so that the merged
+    file never skips rows.
+    """
+    key = f"dataexport:shards:{data_export_id}"
+    client = redis.clusters.get("default").get_local_client_for_key(key)
+    with client.pipeline() as pipeline:
+        pipeline.hset(key, shard, f"{bytes_written}:{int(truncated)}")
+        pipeline.hgetall(key)
+        pipeline.expire(key, SHARD_STATE_TTL)
+        added, shards, _ = pipeline.execute()
+
+    # The client does not decode responses
+    shards = {key.decode("utf-8"): value.decode("utf-8") for key, value in shards.items()}
+    if not added or len(shards) < num_shards:
+        return
+
+    size_limit = get_export_size_limit()
+    size = 0
+    included = 0
+    for index in range(num_shards):
+        shard_bytes, shard_truncated = (int(value) for value in shards[str(index)].split(":"))
+        if size + shard_bytes > size_limit:
+            break
+        size += shard_bytes
+        included += 1
+        if shard_truncated:
+            break
+
+    metrics.timing("dataexport.shards", num_shards, sample_rate=1.0)
+    metrics.timing("dataexport.file_size", size, sample_rate=1.0)
+    merge_export_blobs.delay(data_export_id, max_offset=included * EXPORT_SHARD_OFFSET_STRIDE)
+
+
 def get_processor(data_export, environment_id):
     try:
         if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
@@ -254,11 +481,40 @@ def process_discover(processor, limit, offset):
     return processor.handle_fields(raw_data_unicode)
 
 
+@handle_snuba_errors(logger)
+def process_discover_keyset(processor, start, end, skip, limit):
+    """
+    Fetches a page of rows between `start` and `end`, skipping the first `skip` of them.
+    Returns the rows and the `end` and `skip` of the next page: `end` moves to just after
+    the timestamp of the last row and `skip` counts the rows already seen at it.
+    """
+    rows = processor.keyset_data_fn(start=start, end=end, offset=skip, limit=limit)["data"]
+    if not rows:
+        return rows, end, skip
+
+    timestamps = [parse_date(row["timestamp"]).replace(microsecond=0) for row in rows]
+    next_end = min(timestamps[-1] + timedelta(seconds=1), end)
+    if next_end == end:
+        next_skip = skip + len(rows)
+    else:
+        next_skip = timestamps.count(timestamps[-1])
+    return processor.handle_fields(rows), next_end, next_skip
+
+
 class ExportDataFileTooBig(Exception):
     pass
 
 
-def store_export_chunk_as_blob(data_export, bytes_written, fileobj, blob_size=DEFAULT_BLOB_SIZE):
+def get_export_size_limit():
+    # there is a maximum file size allowed, so we need to make sure we don't exceed it
+    # NOTE: there seems to be issues with downloading files larger than 1 GB on slower
+    # networks, limit the export to 1 GB for now to improve reliability
+    return min(MAX_FILE_SIZE, 2 ** 30)
+
+
+def store_export_chunk_as_blob(
+    data_export, bytes_written, fileobj, blob_size=DEFAULT_BLOB_SIZE, offset_base=0
+):
     try:
         with atomic_transaction(
             using=(
@@ -276,22 +532,21 @@ def store_export_chunk_as_blob(data_export, bytes_written, fileobj, blob_size=DE
                 blob_fileobj = ContentFile(contents)
                 blob = FileBlob.from_file(blob_fileobj, logger=logger)
                 ExportedDataBlob.objects.get_or_create(
-                    data_export=data_export, blob_id=blob.id, offset=bytes_written + bytes_offset
+                    data_export=data_export,
+                    blob_id=blob.id,
+                    offset=offset_base + bytes_written + bytes_offset,
                 )
 
                 bytes_offset += blob.size
 
-                # there is a maximum file size allowed, so we need to make sure we don't exceed it
-                # NOTE: there seems to be issues with downloading files larger than 1 GB on slower
-                # networks, limit the export to 1 GB for now to improve reliability
-                if bytes_written + bytes_offset >= min(MAX_FILE_SIZE, 2 ** 30):
+                if bytes_written + bytes_offset >= get_export_size_limit():
                     raise ExportDataFileTooBig()
     except ExportDataFileTooBig:
         return 0
 
 
 @instrumented_task(name="sentry.data_export.tasks.merge_blobs", queue="data_export", acks_late=True)
-def merge_export_blobs(data_export_id, **kwargs):
+def merge_export_blobs(data_export_id, max_offset=None, **kwargs):
     with sentry_sdk.start_transaction(
         op="task.data_export.merge",
         name="DataExportMerge",
@@ -335,9 +590,12 @@ def merge_export_blobs(data_export_id, **kwargs):
                 size = 0
                 file_checksum = sha1(b"")
 
-                for export_blob in ExportedDataBlob.objects.filter(
-                    data_export=data_export
-                ).order_by("offset"):
+                export_blobs = ExportedDataBlob.objects.filter(data_export=data_export)
+                if max_offset is not None:
+                    # Blobs of shards that didn't fit into the file, see `finish_export_shard`
+                    export_blobs = export_blobs.filter(offset__lt=max_offset)
+
+                for export_blob in export_blobs.order_by("offset"):
                     blob = FileBlob.objects.get(pk=export_blob.blob_id)
                     FileBlobIndex.objects.create(file=file, blob=blob, offset=size)
                     size += blob.size
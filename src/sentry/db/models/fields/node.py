@@ -129,19 +129,11 @@ class NodeData(MutableMapping):
             self.data["_ref"] = ref
             self.data["_ref_version"] = self.ref_version
 
-    def save(self, subkeys=None):
-        """
-        Write current data back to nodestore.
-
-        :param subkeys: Additional JSON payloads to attach to nodestore value,
-            currently only {"unprocessed": {...}} is added for reprocessing.
-            See documentation of nodestore.
-        """
-
+    def _get_subkeys_to_write(self, subkeys=None):
         # We never loaded any data for reading or writing, so there
         # is nothing to save.
         if self._node_data is None:
-            return
+            return None
 
         # We can't put our wrappers into the nodestore, so we need to
         # ensure that the data is converted into a plain old dict
@@ -151,8 +143,35 @@ class NodeData(MutableMapping):
 
         subkeys = subkeys or {}
         subkeys[None] = to_write
+        return subkeys
 
-        nodestore.set_subkeys(self.id, subkeys)
+    def save(self, subkeys=None):
+        """
+        Write current data back to nodestore.
+
+        :param subkeys: Additional JSON payloads to attach to nodestore value,
+            currently only {"unprocessed": {...}} is added for reprocessing.
+            See documentation of nodestore.
+        """
+        subkeys = self._get_subkeys_to_write(subkeys)
+        if subkeys is not None:
+            nodestore.set_subkeys(self.id, subkeys)
+
+    @staticmethod
+    def save_many(nodes):
+        """
+        Write multiple nodes back to nodestore at once.
+
+        :param nodes: A list of ``(node_data, subkeys)`` tuples, see `save`.
+        """
+        items = {}
+        for node_data, subkeys in nodes:
+            subkeys = node_data._get_subkeys_to_write(subkeys)
+            if subkeys is not None:
+                items[node_data.id] = subkeys
+
+        if items:
+            nodestore.set_subkeys_multi(items)
 
 
 class NodeField(GzippedDictField):
@@ -1,8 +1,10 @@
 import logging
 import threading
+import time
 import weakref
 from contextlib import contextmanager
 from typing import Any, Generator, Generic, Mapping, MutableMapping, Optional, Sequence, Tuple
+from uuid import uuid4
 
 from django.conf import settings
 from django.db import router
@@ -12,6 +14,7 @@ from django.db.models.signals import class_prepared, post_delete, post_init, pos
 
 from sentry.db.models.manager import M, make_key
 from sentry.db.models.manager.base_query_set import BaseQuerySet
+from sentry.db.models.manager.local_cache import LocalModelCache
 from sentry.db.models.query import create_or_update
 from sentry.utils.cache import cache
 from sentry.utils.compat import zip
@@ -23,6 +26,11 @@ _local_cache = threading.local()
 _local_cache_generation = 0
 _local_cache_enabled = False
 
+#: Seconds between checks of the version key that invalidates the
+#: process-local tier of all processes
+LOCAL_TIER_VERSION_CHECK_INTERVAL = 1
+LOCAL_TIER_VERSION_TTL = 60 * 60 * 24
+
 
 class BaseManager(Manager, Generic[M]):  # type: ignore
     lookup_handlers = {"iexact": lambda x: x.upper()}
@@ -41,6 +49,7 @@ class BaseManager(Manager, Generic[M]):  # type: ignore
         self.cache_ttl = kwargs.pop("cache_ttl", 60 * 5)
         self._cache_version: Optional[str] = kwargs.pop("cache_version", None)
         self.__local_cache = threading.local()
+        self._local_tier: Optional[LocalModelCache] = None
         super().__init__(*args, **kwargs)
 
     @staticmethod
@@ -72,6 +81,32 @@ class BaseManager(Manager, Generic[M]):  # type: ignore
         cache_: MutableMapping[str, Any] = _local_cache.cache
         return cache_
 
+    def _get_local_tier(self) -> Optional[LocalModelCache]:
+        """
+        Returns the process-local tier of the cache, if it is enabled for
+        this model with ``SENTRY_MODEL_LOCAL_CACHE_TTLS``.
+
+        Unlike ``local_cache()`` the tier is always active, but entries expire
+        and all processes drop their entries when an instance of the model
+        is saved or deleted. Updates that bypass the model signals, such as
+        ``QuerySet.update``, are only seen once the entries expire.
+        """
+        ttl = settings.SENTRY_MODEL_LOCAL_CACHE_TTLS.get(self.model._meta.label_lower)
+        if not ttl:
+            return None
+
+        local_tier = self._local_tier
+        if local_tier is None or local_tier.ttl != ttl:
+            local_tier = self._local_tier = LocalModelCache(
+                ttl, settings.SENTRY_MODEL_LOCAL_CACHE_SIZE
+            )
+
+        if time.monotonic() - local_tier.version_checked_at >= LOCAL_TIER_VERSION_CHECK_INTERVAL:
+            local_tier.set_version(
+                cache.get(self.__get_local_tier_version_key(), version=self.cache_version)
+            )
+        return local_tier
+
     def _get_cache(self) -> MutableMapping[str, Any]:
         if not hasattr(self.__local_cache, "value"):
             self.__local_cache.value = weakref.WeakKeyDictionary()
@@ -98,12 +133,14 @@ class BaseManager(Manager, Generic[M]):  # type: ignore
         # we can't serialize weakrefs
         d.pop("_BaseManager__cache", None)
         d.pop("_BaseManager__local_cache", None)
+        d.pop("_local_tier", None)
         return d
 
     def __setstate__(self, state: Mapping[str, Any]) -> None:
         self.__dict__.update(state)
         # TODO(typing): Basically everywhere else we set this to `threading.local()`.
         self.__local_cache = weakref.WeakKeyDictionary()  # type: ignore
+        self._local_tier = None
 
     def __class_prepared(self, sender: Any, **kwargs: Any) -> None:
         """
@@ -118,6 +155,8 @@ class BaseManager(Manager, Generic[M]):  # type: ignore
         post_init.connect(self.__post_init, sender=sender, weak=False)
         post_save.connect(self.__post_save, sender=sender, weak=False)
         post_delete.connect(self.__post_delete, sender=sender, weak=False)
+        post_save.connect(self.__invalidate_local_tier, sender=sender, weak=False)
+        post_delete.connect(self.__invalidate_local_tier, sender=sender, weak=False)
 
     def __cache_state(self, instance: M) -> None:
         """
@@ -201,9 +240,29 @@ class BaseManager(Manager, Generic[M]):  # type: ignore
             key=self.__get_lookup_cache_key(**{pk_name: instance.pk}), version=self.cache_version
         )
 
+    def __invalidate_local_tier(self, instance: M, **kwargs: Any) -> None:
+        """
+        Drops the process-local tier of all processes.
+        """
+        if self.model._meta.label_lower not in settings.SENTRY_MODEL_LOCAL_CACHE_TTLS:
+            return
+
+        version = uuid4().hex
+        cache.set(
+            self.__get_local_tier_version_key(),
+            version,
+            LOCAL_TIER_VERSION_TTL,
+            version=self.cache_version,
+        )
+        if self._local_tier is not None:
+            self._local_tier.set_version(version)
+
     def __get_lookup_cache_key(self, **kwargs: Any) -> str:
         return make_key(self.model, "modelcache", kwargs)
 
+    def __get_local_tier_version_key(self) -> str:
+        return make_key(self.model, "modelcache-version", {})
+
     def __value_for_field(self, instance: M, key: str) -> Any:
         """
         Return the cacheable value for a field.
@@ -250,48 +309,63 @@ class BaseManager(Manager, Generic[M]):  # type: ignore
 
         if key in self.cache_fields or key == pk_name:
             cache_key = self.__get_lookup_cache_key(**{key: value})
-            local_cache = self._get_local_cache()
-            if local_cache is not None:
-                result = local_cache.get(cache_key)
-                if result is not None:
-                    return result
-
-            retval = cache.get(cache_key, version=self.cache_version)
-            if retval is None:
-                result = self.get(**kwargs)
-                # Ensure we're pushing it into the cache
-                self.__post_save(instance=result)
-                if local_cache is not None:
-                    local_cache[cache_key] = result
-                return result
+            local_tier = self._get_local_tier()
+            if local_tier is None:
+                return self.__get_from_cache(cache_key, key, value, kwargs)
+
+            return local_tier.get_many(
+                [cache_key],
+                lambda cache_keys: {
+                    cache_key: self.__get_from_cache(cache_key, key, value, kwargs)
+                },
+            )[cache_key]
+        else:
+            raise ValueError("We cannot cache this query. Just hit the database.")
 
-            # If we didn't look up by pk we need to hit the reffed
-            # key
-            if key != pk_name:
-                result = self.get_from_cache(**{pk_name: retval})
-                if local_cache is not None:
-                    local_cache[cache_key] = result
+    def __get_from_cache(
+        self, cache_key: str, key: str, value: Any, kwargs: Mapping[str, Any]
+    ) -> M:
+        pk_name = self.model._meta.pk.name
+        local_cache = self._get_local_cache()
+        if local_cache is not None:
+            result = local_cache.get(cache_key)
+            if result is not None:
                 return result
 
-            if not isinstance(retval, self.model):
-                if settings.DEBUG:
-                    raise ValueError("Unexpected value type returned from cache")
-                logger.error("Cache response returned invalid value %r", retval)
-                return self.get(**kwargs)
+        retval = cache.get(cache_key, version=self.cache_version)
+        if retval is None:
+            result = self.get(**kwargs)
+            # Ensure we're pushing it into the cache
+            self.__post_save(instance=result)
+            if local_cache is not None:
+                local_cache[cache_key] = result
+            return result
 
-            if key == pk_name and int(value) != retval.pk:
-                if settings.DEBUG:
-                    raise ValueError("Unexpected value returned from cache")
-                logger.error("Cache response returned invalid value %r", retval)
-                return self.get(**kwargs)
+        # If we didn't look up by pk we need to hit the reffed
+        # key
+        if key != pk_name:
+            result = self.get_from_cache(**{pk_name: retval})
+            if local_cache is not None:
+                local_cache[cache_key] = result
+            return result
 
-            retval._state.db = router.db_for_read(self.model, **kwargs)
+        if not isinstance(retval, self.model):
+            if settings.DEBUG:
+                raise ValueError("Unexpected value type returned from cache")
+            logger.error("Cache response returned invalid value %r", retval)
+            return self.get(**kwargs)
 
-            # Explicitly typing to satisfy mypy.
-            r: M = retval
-            return r
-        else:
-            raise ValueError("We cannot cache this query. Just hit the database.")
+        if key == pk_name and int(value) != retval.pk:
+            if settings.DEBUG:
+                raise ValueError("Unexpected value returned from cache")
+            logger.error("Cache response returned invalid value %r", retval)
+            return self.get(**kwargs)
+
+        retval._state.db = router.db_for_read(self.model, **kwargs)
+
+        # Explicitly typing to satisfy mypy.
+        r: M = retval
+        return r
 
     def get_many_from_cache(self, values: Sequence[str], key: str = "pk") -> Sequence[Any]:
         """
@@ -321,6 +395,25 @@ class BaseManager(Manager, Generic[M]):  # type: ignore
         if key not in self.cache_fields and key != pk_name:
             raise ValueError("We cannot cache this query. Just hit the database.")
 
+        local_tier = self._get_local_tier()
+        if local_tier is None:
+            return self.__get_many_from_cache(values, key)
+
+        lookup_values = {self.__get_lookup_cache_key(**{key: value}): value for value in values}
+        return list(
+            local_tier.get_many(
+                list(lookup_values),
+                lambda cache_keys: {
+                    self.__get_lookup_cache_key(**{key: getattr(result, key)}): result
+                    for result in self.__get_many_from_cache(
+                        [lookup_values[cache_key] for cache_key in cache_keys], key
+                    )
+                },
+            ).values()
+        )
+
+    def __get_many_from_cache(self, values: Sequence[str], key: str) -> Sequence[Any]:
+        pk_name = self.model._meta.pk.name
         final_results = []
         cache_lookup_cache_keys = []
         cache_lookup_values = []
@@ -0,0 +1,137 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, MutableMapping, Optional, Sequence, Tuple
+
+#: Seconds a thread waits for another thread loading the same key before
+#: loading it by itself.
+LOAD_WAIT_TIMEOUT = 5
+
+
+class LocalModelCache:
+    """
+    A bounded, thread-safe, process-local cache of model instances with a
+    fixed TTL for every entry.
+
+    Concurrent misses for the same key are coalesced: the first thread
+    loads the key while all others wait for its result. Entries loaded
+    while the cache was cleared are discarded, so a load that raced with an
+    invalidation never stores a stale instance.
+
+    Instances are stored pickled, so every caller gets its own copy and
+    changes made by one caller never leak to others.
+
+    :param ttl: Seconds an entry is kept.
+    :param max_size: Number of entries kept, least recently used entries
+        are evicted first.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        #: The last seen value of the version key shared by all processes
+        self.version: Optional[str] = None
+        self.version_checked_at = 0.0
+        self._items: MutableMapping[str, Tuple[float, bytes]] = OrderedDict()
+        self._loading: Dict[str, threading.Event] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _get(self, key: str, now: float) -> Tuple[bool, Optional[bytes]]:
+        try:
+            expires_at, value = self._items[key]
+        except KeyError:
+            return False, None
+
+        if expires_at <= now:
+            del self._items[key]
+            return False, None
+
+        self._items.move_to_end(key)
+        return True, value
+
+    def _set_many(self, items: Dict[str, Any], generation: int) -> None:
+        pickled = {key: pickle.dumps(value) for key, value in items.items()}
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            expires_at = time.monotonic() + self.ttl
+            for key, value in pickled.items():
+                self._items[key] = (expires_at, value)
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def get_many(
+        self, keys: Sequence[str], load: Callable[[Sequence[str]], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Returns the cached values of the given keys, calling ``load`` with
+        the keys that are missing. Keys that ``load`` does not return are
+        missing from the result as well.
+        """
+        cached = {}
+        own_keys = []
+        waiting = {}
+        event = threading.Event()
+
+        with self._lock:
+            now = time.monotonic()
+            generation = self._generation
+            for key in keys:
+                found, value = self._get(key, now)
+                if found:
+                    cached[key] = value
+                elif key in self._loading:
+                    waiting[key] = self._loading[key]
+                else:
+                    self._loading[key] = event
+                    own_keys.append(key)
+
+        rv = {key: pickle.loads(value) for key, value in cached.items()}
+        if own_keys:
+            try:
+                loaded = load(own_keys)
+                self._set_many(loaded, generation)
+                rv.update(loaded)
+            finally:
+                with self._lock:
+                    for key in own_keys:
+                        self._loading.pop(key, None)
+                event.set()
+
+        remaining = []
+        for key, loading in waiting.items():
+            loading.wait(LOAD_WAIT_TIMEOUT)
+            with self._lock:
+                found, value = self._get(key, time.monotonic())
+            if found:
+                rv[key] = pickle.loads(value)
+            else:
+                remaining.append(key)
+
+        # The other thread failed to load these keys or they do not exist.
+        if remaining:
+            rv.update(load(remaining))
+
+        return rv
+
+    def set_version(self, version: Optional[str]) -> None:
+        """
+        Records the current value of the shared version key, dropping all
+        entries when it changed.
+        """
+        self.version_checked_at = time.monotonic()
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._generation += 1
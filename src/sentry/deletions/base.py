@@ -1,13 +1,29 @@
 import logging
 import re
+import time
 
+from django.db import models
+
+from sentry import options
 from sentry.constants import ObjectStatus
 from sentry.utils import metrics
-from sentry.utils.query import bulk_delete_objects
+from sentry.utils.query import bulk_delete_objects, bulk_delete_objects_after
 
 _leaf_re = re.compile(r"^(UserReport|Event|Group)(.+)")
 
 
+def record_deleted_rows(model, method, count, started):
+    """
+    Reports progress of a deletion: the number of rows of `model` deleted since
+    `started`, and the rate they were deleted at.
+    """
+    tags = {"model": model.__name__, "method": method}
+    metrics.incr("deletions.rows", amount=count, tags=tags)
+    duration = time.time() - started
+    if count and duration > 0:
+        metrics.timing("deletions.rows_per_second", count / duration, tags=tags)
+
+
 class BaseRelation:
     def __init__(self, params, task):
         self.task = task
@@ -157,6 +173,8 @@ class ModelDeletionTask(BaseDeletionTask):
         self.query = query
         self.query_limit = query_limit or self.DEFAULT_QUERY_LIMIT or self.chunk_size
         self.order_by = order_by
+        # The largest id deleted so far, see `chunk`
+        self.last_id = None
 
     def __repr__(self):
         return "<{}: model={} query={} order_by={} transaction_id={} actor_id={}>".format(
@@ -187,11 +205,19 @@ class ModelDeletionTask(BaseDeletionTask):
         """
         query_limit = self.query_limit
         remaining = self.chunk_size
+        # Without an explicit order, walk the rows in primary key order and resume each
+        # query after the last deleted row, which lets Postgres use the primary key index
+        # instead of rescanning rows that are already gone.
+        keyset = not self.order_by and options.get("deletions.set-based")
 
         while remaining > 0:
             queryset = getattr(self.model, self.manager_name).filter(**self.query)
             if self.order_by:
                 queryset = queryset.order_by(self.order_by)
+            elif keyset:
+                queryset = queryset.order_by("id")
+                if self.last_id is not None:
+                    queryset = queryset.filter(id__gt=self.last_id)
 
             if num_shards:
                 assert num_shards > 1
@@ -204,14 +230,51 @@ class ModelDeletionTask(BaseDeletionTask):
                 return False
 
             self.delete_bulk(queryset)
+            if keyset:
+                self.last_id = queryset[-1].id
             remaining = remaining - query_limit
         # We have more work to do as we didn't run out of rows to delete.
         return True
 
+    def can_delete_set_based(self):
+        """
+        Whether instances can be deleted with a single queryset delete. That still runs
+        Django cascades and sends delete signals for models that have receivers. Models
+        overriding `Model.delete`, and tasks overriding `delete_instance`, still delete
+        one instance at a time.
+        """
+        return (
+            options.get("deletions.set-based")
+            and self.model.delete is models.Model.delete
+            and type(self).delete_instance is ModelDeletionTask.delete_instance
+        )
+
     def delete_instance_bulk(self, instance_list):
-        # slow, but ensures Django cascades are handled
-        for instance in instance_list:
-            self.delete_instance(instance)
+        started = time.time()
+        if not self.can_delete_set_based():
+            # slow, but ensures Django cascades are handled
+            for instance in instance_list:
+                self.delete_instance(instance)
+            record_deleted_rows(self.model, "instance", len(instance_list), started)
+            return
+
+        instance_ids = [instance.id for instance in instance_list]
+        getattr(self.model, self.manager_name).filter(id__in=instance_ids).delete()
+        record_deleted_rows(self.model, "set", len(instance_ids), started)
+
+        # Don't log Group and Event child object deletions.
+        model_name = self.model.__name__
+        if not _leaf_re.search(model_name):
+            for instance_id in instance_ids:
+                self.logger.info(
+                    "object.delete.executed",
+                    extra={
+                        "object_id": instance_id,
+                        "transaction_id": self.transaction_id,
+                        "app_label": self.model._meta.app_label,
+                        "model": model_name,
+                    },
+                )
 
     def delete_instance(self, instance):
         instance_id = instance.id
@@ -267,14 +330,28 @@ class BulkModelDeletionTask(ModelDeletionTask):
         return self.delete_instance_bulk()
 
     def delete_instance_bulk(self):
+        started = time.time()
         try:
-            return bulk_delete_objects(
+            if not options.get("deletions.set-based"):
+                return bulk_delete_objects(
+                    model=self.model,
+                    limit=self.chunk_size,
+                    transaction_id=self.transaction_id,
+                    partition_key=self.partition_key,
+                    **self.query,
+                )
+
+            deleted, last_id = bulk_delete_objects_after(
                 model=self.model,
                 limit=self.chunk_size,
-                transaction_id=self.transaction_id,
+                after_id=self.last_id,
                 partition_key=self.partition_key,
                 **self.query,
             )
+            record_deleted_rows(self.model, "bulk", deleted, started)
+            if last_id is not None:
+                self.last_id = last_id
+            return deleted > 0
         finally:
             # Don't log Group and Event child object deletions.
             model_name = self.model.__name__
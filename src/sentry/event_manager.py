@@ -3,6 +3,7 @@ import ipaddress
 import logging
 import random
 import time
+from collections import defaultdict
 from datetime import datetime, timedelta
 from io import BytesIO
 
@@ -23,6 +24,7 @@ from sentry.constants import (
     DataCategory,
 )
 from sentry.culprit import generate_culprit
+from sentry.db.models.fields.node import NodeData
 from sentry.eventstore.processing import event_processing_store
 from sentry.grouping.api import (
     BackgroundGroupingConfigLoader,
@@ -69,7 +71,7 @@ from sentry.plugins.base import plugins
 from sentry.reprocessing2 import (
     delete_old_primary_hash,
     is_reprocessed_event,
-    save_unprocessed_event,
+    save_unprocessed_event_many,
 )
 from sentry.signals import first_event_received, first_transaction_received, issue_unresolved
 from sentry.tasks.integrations import kick_off_status_syncs
@@ -333,200 +335,140 @@ class EventManager:
                 "organization", Organization.objects.get_from_cache(id=project.organization_id)
             )
 
-        job = {"data": self._data, "project_id": project_id, "raw": raw, "start_time": start_time}
-        jobs = [job]
-
-        is_reprocessed = is_reprocessed_event(job["data"])
-
-        with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
-            _pull_out_data(jobs, projects)
-
-        with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
-            _get_or_create_release_many(jobs, projects)
+        job = {
+            "data": self._data,
+            "project_id": project_id,
+            "raw": raw,
+            "start_time": start_time,
+            "cache_key": cache_key,
+        }
+        _save_error_events_impl([job], projects)
 
-        with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
-            _get_event_user_many(jobs, projects)
+        if job["discarded"] is not None:
+            raise job["discarded"]
 
-        job["project_key"] = None
-        if job["key_id"] is not None:
-            with metrics.timer("event_manager.load_project_key"):
-                try:
-                    job["project_key"] = ProjectKey.objects.get_from_cache(id=job["key_id"])
-                except ProjectKey.DoesNotExist:
-                    pass
+        self._data = job["event"].data.data
 
-        _derive_plugin_tags_many(jobs, projects)
-        _derive_interface_tags_many(jobs)
+        return job["event"]
 
-        do_background_grouping_before = options.get("store.background-grouping-before")
-        if do_background_grouping_before:
-            _run_background_grouping(project, job)
 
-        secondary_hashes = None
+@metrics.wraps("event_manager.save_error_events")
+def save_error_events(jobs, projects):
+    """
+    Save a batch of normalized error events. This is the multi-event
+    counterpart of `EventManager.save`: all steps are shared, but releases,
+    environments, release/group associations, tsdb increments and nodestore
+    writes are resolved once per batch instead of once per event.
+
+    Each job is a dict with ``data``, ``project_id`` and ``start_time``, and
+    optionally ``raw`` and ``cache_key``. ``projects`` maps project ids to
+    projects. Jobs whose hash got discarded are not raised for, instead the
+    ``HashDiscarded`` exception is stored in ``job["discarded"]`` and the job
+    is skipped in all later steps.
+
+    Returns the list of jobs that were saved.
+    """
+    with metrics.timer("event_manager.save_error_events.fetch_organizations"):
+        organization_ids = {project.organization_id for project in projects.values()}
+        organizations = {
+            o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)
+        }
 
+    for project in projects.values():
         try:
-            secondary_grouping_config = project.get_option("sentry:secondary_grouping_config")
-            secondary_grouping_expiry = project.get_option("sentry:secondary_grouping_expiry")
-            if secondary_grouping_config and (secondary_grouping_expiry or 0) >= time.time():
-                with metrics.timer("event_manager.secondary_grouping"):
-                    secondary_event = copy.deepcopy(job["event"])
-                    loader = SecondaryGroupingConfigLoader()
-                    secondary_grouping_config = loader.get_config_dict(project)
-                    secondary_hashes = _calculate_event_grouping(
-                        project, secondary_event, secondary_grouping_config
-                    )
-        except Exception:
-            sentry_sdk.capture_exception()
-
-        with metrics.timer("event_manager.load_grouping_config"):
-            # At this point we want to normalize the in_app values in case the
-            # clients did not set this appropriately so far.
-            grouping_config = get_grouping_config_dict_for_event_data(
-                job["event"].data.data, project
-            )
-
-        with sentry_sdk.start_span(op="event_manager.save.calculate_event_grouping"), metrics.timer(
-            "event_manager.calculate_event_grouping"
-        ):
-            hashes = _calculate_event_grouping(project, job["event"], grouping_config)
-
-        hashes = CalculatedHashes(
-            hashes=hashes.hashes + (secondary_hashes and secondary_hashes.hashes or []),
-            hierarchical_hashes=hashes.hierarchical_hashes,
-            tree_labels=hashes.tree_labels,
-        )
+            project.set_cached_field_value("organization", organizations[project.organization_id])
+        except KeyError:
+            continue
 
-        if not do_background_grouping_before:
-            _run_background_grouping(project, job)
+    return _save_error_events_impl(jobs, projects)
 
-        if hashes.tree_labels:
-            job["finest_tree_label"] = hashes.finest_tree_label
 
-        _materialize_metadata_many(jobs)
+def _save_error_events_impl(jobs, projects):
+    for job in jobs:
+        job.setdefault("raw", False)
+        job.setdefault("cache_key", None)
+        job["discarded"] = None
+        job["is_reprocessed"] = is_reprocessed_event(job["data"])
 
-        kwargs = {
-            "platform": job["platform"],
-            "message": job["event"].search_message,
-            "culprit": job["culprit"],
-            "logger": job["logger_name"],
-            "level": LOG_LEVELS_MAP.get(job["level"]),
-            "last_seen": job["event"].datetime,
-            "first_seen": job["event"].datetime,
-            "active_at": job["event"].datetime,
-        }
+    with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
+        _pull_out_data(jobs, projects)
 
-        if job["release"]:
-            kwargs["first_release"] = job["release"]
+    with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
+        _get_or_create_release_many(jobs, projects)
 
-        # Load attachments first, but persist them at the very last after
-        # posting to eventstream to make sure all counters and eventstream are
-        # incremented for sure. Also wait for grouping to remove attachments
-        # based on the group counter.
-        with metrics.timer("event_manager.get_attachments"):
-            with sentry_sdk.start_span(op="event_manager.save.get_attachments"):
-                attachments = get_attachments(cache_key, job)
+    with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
+        _get_event_user_many(jobs, projects)
 
-        try:
-            with sentry_sdk.start_span(op="event_manager.save.save_aggregate_fn"):
-                job["group"], job["is_new"], job["is_regression"] = _save_aggregate(
-                    event=job["event"],
-                    hashes=hashes,
-                    release=job["release"],
-                    metadata=dict(job["event_metadata"]),
-                    received_timestamp=job["received_timestamp"],
-                    **kwargs,
-                )
-        except HashDiscarded:
-            discard_event(job, attachments)
-            raise
+    _get_project_key_many(jobs)
 
-        job["event"].group = job["group"]
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
 
-        # store a reference to the group id to guarantee validation of isolation
-        # XXX(markus): No clue what this does
-        job["event"].data.bind_ref(job["event"])
+    _calculate_event_grouping_many(jobs, projects)
 
-        _get_or_create_environment_many(jobs, projects)
+    _materialize_metadata_many(jobs)
 
-        if job["group"]:
-            group_environment, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
-                group_id=job["group"].id,
-                environment_id=job["environment"].id,
-                defaults={"first_release": job["release"] or None},
-            )
-        else:
-            job["is_new_group_environment"] = False
+    # Load attachments first, but persist them at the very last after
+    # posting to eventstream to make sure all counters and eventstream are
+    # incremented for sure. Also wait for grouping to remove attachments
+    # based on the group counter.
+    with metrics.timer("event_manager.get_attachments"):
+        with sentry_sdk.start_span(op="event_manager.save.get_attachments"):
+            for job in jobs:
+                job["attachments"] = get_attachments(job["cache_key"], job)
 
-        _get_or_create_release_associated_models(jobs, projects)
+    jobs = _save_aggregate_many(jobs)
 
-        if job["release"] and job["group"]:
-            job["grouprelease"] = GroupRelease.get_or_create(
-                group=job["group"],
-                release=job["release"],
-                environment=job["environment"],
-                datetime=job["event"].datetime,
-            )
+    _get_or_create_environment_many(jobs, projects)
+    _get_or_create_group_environment_many(jobs)
+    _get_or_create_release_associated_models(jobs, projects)
+    _get_or_create_group_release_many(jobs)
 
-        _tsdb_record_all_metrics(jobs)
+    _tsdb_record_all_metrics(jobs)
 
+    for job in jobs:
         if job["group"]:
-            UserReport.objects.filter(project_id=project.id, event_id=job["event"].event_id).update(
-                group_id=job["group"].id, environment_id=job["environment"].id
-            )
+            UserReport.objects.filter(
+                project_id=job["project_id"], event_id=job["event"].event_id
+            ).update(group_id=job["group"].id, environment_id=job["environment"].id)
 
-        with metrics.timer("event_manager.filter_attachments_for_group"):
-            attachments = filter_attachments_for_group(attachments, job)
+    with metrics.timer("event_manager.filter_attachments_for_group"):
+        for job in jobs:
+            job["attachments"] = filter_attachments_for_group(job["attachments"], job)
 
-        # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
-        _materialize_event_metrics(jobs)
+    # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
+    _materialize_event_metrics(jobs)
 
-        for attachment in attachments:
+    for job in jobs:
+        for attachment in job["attachments"]:
             key = f"bytes.stored.{attachment.type}"
             old_bytes = job["event_metrics"].get(key) or 0
             job["event_metrics"][key] = old_bytes + attachment.size
 
-        _nodestore_save_many(jobs)
-        save_unprocessed_event(project, job["event"].event_id)
+    _nodestore_save_many(jobs)
+    _save_unprocessed_event_many(jobs)
 
-        if job["release"]:
-            if job["is_new"]:
-                buffer.incr(
-                    ReleaseProject,
-                    {"new_groups": 1},
-                    {"release_id": job["release"].id, "project_id": project.id},
-                )
-            if job["is_new_group_environment"]:
-                buffer.incr(
-                    ReleaseProjectEnvironment,
-                    {"new_issues_count": 1},
-                    {
-                        "project_id": project.id,
-                        "release_id": job["release"].id,
-                        "environment_id": job["environment"].id,
-                    },
-                )
-        if not raw:
-            if not project.first_event:
-                project.update(first_event=job["event"].datetime)
-                first_event_received.send_robust(
-                    project=project, event=job["event"], sender=Project
-                )
+    _increment_release_associated_counts_many(jobs)
+    _send_first_event_received_many(jobs, projects)
 
-        if is_reprocessed:
+    for job in jobs:
+        if job["is_reprocessed"]:
             safe_execute(delete_old_primary_hash, job["event"], _with_transaction=False)
 
-        _eventstream_insert_many(jobs)
+    _eventstream_insert_many(jobs)
 
-        # Do this last to ensure signals get emitted even if connection to the
-        # file store breaks temporarily.
-        #
-        # We do not need this for reprocessed events as for those we update the
-        # group_id on existing models in post_process_group, which already does
-        # this because of indiv. attachments.
-        if not is_reprocessed:
-            with metrics.timer("event_manager.save_attachments"):
-                save_attachments(cache_key, attachments, job)
+    # Do this last to ensure signals get emitted even if connection to the
+    # file store breaks temporarily.
+    #
+    # We do not need this for reprocessed events as for those we update the
+    # group_id on existing models in post_process_group, which already does
+    # this because of indiv. attachments.
+    with metrics.timer("event_manager.save_attachments"):
+        for job in jobs:
+            if not job["is_reprocessed"]:
+                save_attachments(job["cache_key"], job["attachments"], job)
 
+    for job in jobs:
         metric_tags = {"from_relay": "_relay_processed" in job["data"]}
 
         metrics.timing(
@@ -541,11 +483,9 @@ class EventManager:
             tags=metric_tags,
         )
 
-        _track_outcome_accepted_many(jobs)
-
-        self._data = job["event"].data.data
+    _track_outcome_accepted_many(jobs)
 
-        return job["event"]
+    return jobs
 
 
 @metrics.wraps("event_manager.background_grouping")
@@ -674,6 +614,19 @@ def _get_event_user_many(jobs, projects):
         job["user"] = user
 
 
+@metrics.wraps("save_event.get_project_key_many")
+def _get_project_key_many(jobs):
+    key_ids = {job["key_id"] for job in jobs if job["key_id"] is not None}
+
+    project_keys = {}
+    if key_ids:
+        with metrics.timer("event_manager.load_project_key"):
+            project_keys = {pk.id: pk for pk in ProjectKey.objects.get_many_from_cache(key_ids)}
+
+    for job in jobs:
+        job["project_key"] = project_keys.get(job["key_id"])
+
+
 @metrics.wraps("save_event.derive_plugin_tags_many")
 def _derive_plugin_tags_many(jobs, projects):
     # XXX: We ought to inline or remove this one for sure
@@ -704,6 +657,57 @@ def _derive_interface_tags_many(jobs):
                 data.pop(iface.path, None)
 
 
+@metrics.wraps("save_event.calculate_event_grouping_many")
+def _calculate_event_grouping_many(jobs, projects):
+    do_background_grouping_before = options.get("store.background-grouping-before")
+
+    for job in jobs:
+        project = projects[job["project_id"]]
+
+        if do_background_grouping_before:
+            _run_background_grouping(project, job)
+
+        secondary_hashes = None
+
+        try:
+            secondary_grouping_config = project.get_option("sentry:secondary_grouping_config")
+            secondary_grouping_expiry = project.get_option("sentry:secondary_grouping_expiry")
+            if secondary_grouping_config and (secondary_grouping_expiry or 0) >= time.time():
+                with metrics.timer("event_manager.secondary_grouping"):
+                    secondary_event = copy.deepcopy(job["event"])
+                    loader = SecondaryGroupingConfigLoader()
+                    secondary_grouping_config = loader.get_config_dict(project)
+                    secondary_hashes = _calculate_event_grouping(
+                        project, secondary_event, secondary_grouping_config
+                    )
+        except Exception:
+            sentry_sdk.capture_exception()
+
+        with metrics.timer("event_manager.load_grouping_config"):
+            # At this point we want to normalize the in_app values in case the
+            # clients did not set this appropriately so far.
+            grouping_config = get_grouping_config_dict_for_event_data(
+                job["event"].data.data, project
+            )
+
+        with sentry_sdk.start_span(op="event_manager.save.calculate_event_grouping"), metrics.timer(
+            "event_manager.calculate_event_grouping"
+        ):
+            hashes = _calculate_event_grouping(project, job["event"], grouping_config)
+
+        job["hashes"] = hashes = CalculatedHashes(
+            hashes=hashes.hashes + (secondary_hashes and secondary_hashes.hashes or []),
+            hierarchical_hashes=hashes.hierarchical_hashes,
+            tree_labels=hashes.tree_labels,
+        )
+
+        if not do_background_grouping_before:
+            _run_background_grouping(project, job)
+
+        if hashes.tree_labels:
+            job["finest_tree_label"] = hashes.finest_tree_label
+
+
 @metrics.wraps("save_event.materialize_metadata_many")
 def _materialize_metadata_many(jobs):
     for job in jobs:
@@ -732,11 +736,89 @@ def _materialize_metadata_many(jobs):
         job["culprit"] = data["culprit"]
 
 
+@metrics.wraps("save_event.save_aggregate_many")
+def _save_aggregate_many(jobs):
+    """
+    Assigns a group to every job. Jobs whose hashes are discarded are refunded
+    and dropped from the returned list.
+    """
+    saved_jobs = []
+
+    for job in jobs:
+        kwargs = {
+            "platform": job["platform"],
+            "message": job["event"].search_message,
+            "culprit": job["culprit"],
+            "logger": job["logger_name"],
+            "level": LOG_LEVELS_MAP.get(job["level"]),
+            "last_seen": job["event"].datetime,
+            "first_seen": job["event"].datetime,
+            "active_at": job["event"].datetime,
+        }
+
+        if job["release"]:
+            kwargs["first_release"] = job["release"]
+
+        try:
+            with sentry_sdk.start_span(op="event_manager.save.save_aggregate_fn"):
+                job["group"], job["is_new"], job["is_regression"] = _save_aggregate(
+                    event=job["event"],
+                    hashes=job["hashes"],
+                    release=job["release"],
+                    metadata=dict(job["event_metadata"]),
+                    received_timestamp=job["received_timestamp"],
+                    **kwargs,
+                )
+        except HashDiscarded as e:
+            discard_event(job, job["attachments"])
+            job["discarded"] = e
+            continue
+
+        job["event"].group = job["group"]
+
+        # store a reference to the group id to guarantee validation of isolation
+        # XXX(markus): No clue what this does
+        job["event"].data.bind_ref(job["event"])
+
+        saved_jobs.append(job)
+
+    return saved_jobs
+
+
 @metrics.wraps("save_event.get_or_create_environment_many")
 def _get_or_create_environment_many(jobs, projects):
+    environments = {}
+
+    for job in jobs:
+        environment_key = (job["project_id"], job["environment"])
+        if environment_key not in environments:
+            environments[environment_key] = Environment.get_or_create(
+                project=projects[job["project_id"]], name=job["environment"]
+            )
+
+        job["environment"] = environments[environment_key]
+
+
+@metrics.wraps("save_event.get_or_create_group_environment_many")
+def _get_or_create_group_environment_many(jobs):
+    seen_group_environments = set()
+
     for job in jobs:
-        job["environment"] = Environment.get_or_create(
-            project=projects[job["project_id"]], name=job["environment"]
+        job["is_new_group_environment"] = False
+
+        if not job["group"]:
+            continue
+
+        group_environment_key = (job["group"].id, job["environment"].id)
+        if group_environment_key in seen_group_environments:
+            # Only the first event of a batch can create the group environment.
+            continue
+        seen_group_environments.add(group_environment_key)
+
+        _, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
+            group_id=job["group"].id,
+            environment_id=job["environment"].id,
+            defaults={"first_release": job["release"] or None},
         )
 
 
@@ -745,14 +827,24 @@ def _get_or_create_release_associated_models(jobs, projects):
     # XXX: This is possibly unnecessarily detached from
     # _get_or_create_release_many, but we do not want to destroy order of
     # execution right now
+    release_environments = {}
+    release_environment_dates = {}
+
     for job in jobs:
         release = job["release"]
         if not release:
             continue
 
-        project = projects[job["project_id"]]
-        environment = job["environment"]
-        date = job["event"].datetime
+        release_environment_key = (job["project_id"], release.id, job["environment"].id)
+        release_environments[release_environment_key] = (release, job["environment"])
+        new_datetime = job["event"].datetime
+        old_datetime = release_environment_dates.get(release_environment_key)
+        if old_datetime is None or new_datetime > old_datetime:
+            release_environment_dates[release_environment_key] = new_datetime
+
+    for release_environment_key, (release, environment) in release_environments.items():
+        project = projects[release_environment_key[0]]
+        date = release_environment_dates[release_environment_key]
 
         ReleaseEnvironment.get_or_create(
             project=project, release=release, environment=environment, datetime=date
@@ -763,28 +855,71 @@ def _get_or_create_release_associated_models(jobs, projects):
         )
 
 
+@metrics.wraps("save_event.get_or_create_group_release_many")
+def _get_or_create_group_release_many(jobs):
+    group_release_dates = {}
+
+    for job in jobs:
+        if not job["release"] or not job["group"]:
+            continue
+
+        group_release_key = (job["group"].id, job["release"].id, job["environment"].id)
+        new_datetime = job["event"].datetime
+        old_datetime = group_release_dates.get(group_release_key)
+        if old_datetime is None or new_datetime > old_datetime:
+            group_release_dates[group_release_key] = new_datetime
+
+    group_releases = {}
+
+    for job in jobs:
+        if not job["release"] or not job["group"]:
+            continue
+
+        group_release_key = (job["group"].id, job["release"].id, job["environment"].id)
+        if group_release_key not in group_releases:
+            group_releases[group_release_key] = GroupRelease.get_or_create(
+                group=job["group"],
+                release=job["release"],
+                environment=job["environment"],
+                datetime=group_release_dates[group_release_key],
+            )
+
+        job["grouprelease"] = group_releases[group_release_key]
+
+
 @metrics.wraps("save_event.tsdb_record_all_metrics")
 def _tsdb_record_all_metrics(jobs):
     """
     Do all tsdb-related things for save_event in here s.t. we can potentially
     put everything in a single redis pipeline someday.
+
+    Counters carry their own timestamp and are therefore written with one call
+    per environment for the whole batch. Distinct counters and frequency
+    sketches take a single timestamp per call and are grouped by timestamp.
     """
 
     # XXX: validate whether anybody actually uses those metrics
 
-    for job in jobs:
-        incrs = []
-        frequencies = []
-        records = []
+    incrs_by_environment = defaultdict(list)
+    records_by_timestamp = defaultdict(list)
+    frequencies_by_timestamp = defaultdict(list)
+    counter_events = []
 
-        incrs.append((tsdb.models.project, job["project_id"]))
+    for job in jobs:
         event = job["event"]
         group = job["group"]
         release = job["release"]
         environment = job["environment"]
 
+        incrs = incrs_by_environment[environment.id]
+        records = records_by_timestamp[(event.datetime, environment.id)]
+        frequencies = frequencies_by_timestamp[event.datetime]
+        incr_options = {"timestamp": event.datetime}
+
+        incrs.append((tsdb.models.project, job["project_id"], incr_options))
+
         if group:
-            incrs.append((tsdb.models.group, group.id))
+            incrs.append((tsdb.models.group, group.id, incr_options))
             frequencies.append(
                 (tsdb.models.frequent_environments_by_group, {group.id: {environment.id: 1}})
             )
@@ -798,10 +933,20 @@ def _tsdb_record_all_metrics(jobs):
                 )
 
         if release:
-            incrs.append((tsdb.models.release, release.id))
+            incrs.append((tsdb.models.release, release.id, incr_options))
 
         user = job["user"]
 
+        if group:
+            counter_events.append(
+                {
+                    "group_id": group.id,
+                    "environment_id": environment.id,
+                    "timestamp": to_timestamp(event.datetime),
+                    "user": user.tag_value if user else None,
+                }
+            )
+
         if user:
             project_id = job["project_id"]
             records.append((tsdb.models.users_affected_by_project, project_id, (user.tag_value,)))
@@ -809,34 +954,101 @@ def _tsdb_record_all_metrics(jobs):
             if group:
                 records.append((tsdb.models.users_affected_by_group, group.id, (user.tag_value,)))
 
-        if incrs:
-            tsdb.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
+    for environment_id, incrs in incrs_by_environment.items():
+        tsdb.incr_multi(incrs, environment_id=environment_id)
 
+    for (timestamp, environment_id), records in records_by_timestamp.items():
         if records:
-            tsdb.record_multi(records, timestamp=event.datetime, environment_id=environment.id)
+            tsdb.record_multi(records, timestamp=timestamp, environment_id=environment_id)
 
+    for timestamp, frequencies in frequencies_by_timestamp.items():
         if frequencies:
-            tsdb.record_frequency_multi(frequencies, timestamp=event.datetime)
+            tsdb.record_frequency_multi(frequencies, timestamp=timestamp)
+
+    if counter_events:
+        from sentry.rules import counters
+
+        counters.record_events(counter_events)
 
 
 @metrics.wraps("save_event.nodestore_save_many")
 def _nodestore_save_many(jobs):
     inserted_time = datetime.utcnow().replace(tzinfo=UTC).timestamp()
-    for job in jobs:
-        # Write the event to Nodestore
-        subkeys = {}
 
+    unprocessed_cache_keys = {}
+    for job in jobs:
         if job["group"]:
             event = job["event"]
-            data = event_processing_store.get(
-                cache_key_for_event({"project": event.project_id, "event_id": event.event_id}),
-                unprocessed=True,
+            unprocessed_cache_keys[id(job)] = cache_key_for_event(
+                {"project": event.project_id, "event_id": event.event_id}
             )
-            if data is not None:
-                subkeys["unprocessed"] = data
+
+    unprocessed_events = {}
+    if unprocessed_cache_keys:
+        unprocessed_events = event_processing_store.get_many(
+            list(unprocessed_cache_keys.values()), unprocessed=True
+        )
+
+    nodes = []
+    for job in jobs:
+        # Write the event to Nodestore
+        subkeys = {}
+
+        job["unprocessed_data"] = data = unprocessed_events.get(unprocessed_cache_keys.get(id(job)))
+        if data is not None:
+            subkeys["unprocessed"] = data
 
         job["event"].data["nodestore_insert"] = inserted_time
-        job["event"].data.save(subkeys=subkeys)
+        nodes.append((job["event"].data, subkeys))
+
+    NodeData.save_many(nodes)
+
+
+@metrics.wraps("save_event.save_unprocessed_event_many")
+def _save_unprocessed_event_many(jobs):
+    save_unprocessed_event_many(
+        {
+            (job["project_id"], job["event"].event_id): job["unprocessed_data"]
+            for job in jobs
+            if job.get("unprocessed_data") is not None
+        }
+    )
+
+
+@metrics.wraps("save_event.increment_release_associated_counts_many")
+def _increment_release_associated_counts_many(jobs):
+    for job in jobs:
+        if not job["release"]:
+            continue
+
+        if job["is_new"]:
+            buffer.incr(
+                ReleaseProject,
+                {"new_groups": 1},
+                {"release_id": job["release"].id, "project_id": job["project_id"]},
+            )
+        if job["is_new_group_environment"]:
+            buffer.incr(
+                ReleaseProjectEnvironment,
+                {"new_issues_count": 1},
+                {
+                    "project_id": job["project_id"],
+                    "release_id": job["release"].id,
+                    "environment_id": job["environment"].id,
+                },
+            )
+
+
+@metrics.wraps("save_event.send_first_event_received_many")
+def _send_first_event_received_many(jobs, projects):
+    for job in jobs:
+        if job["raw"]:
+            continue
+
+        project = projects[job["project_id"]]
+        if not project.first_event:
+            project.update(first_event=job["event"].datetime)
+            first_event_received.send_robust(project=project, event=job["event"], sender=Project)
 
 
 @metrics.wraps("save_event.eventstream_insert_many")
@@ -987,9 +1199,24 @@ def get_culprit(data):
 def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwargs):
     project = event.project
 
-    flat_grouphashes = [
-        GroupHash.objects.get_or_create(project=project, hash=hash)[0] for hash in hashes.hashes
-    ]
+    group = _get_group_from_cached_grouphashes(project, hashes)
+    if group is not None:
+        kwargs["data"] = materialize_metadata(
+            event.data,
+            get_event_type(event.data),
+            metadata,
+        )
+        kwargs["data"]["last_received"] = received_timestamp
+
+        is_regression = _process_existing_aggregate(
+            group=group, event=event, data=kwargs, release=release
+        )
+
+        return group, False, is_regression
+
+    flat_grouphashes, hierarchical_grouphashes = _get_or_create_grouphashes_many(
+        project, hashes.hashes, hashes.hierarchical_hashes
+    )
 
     # The root_hierarchical_hash is the least specific hash within the tree, so
     # typically hierarchical_hashes[0], unless a hash `n` has been split in
@@ -998,13 +1225,18 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
     # when groups are created and also relieves contention by locking a more
     # specific hash than `hierarchical_hashes[0]`.
     existing_grouphash, root_hierarchical_hash = _find_existing_grouphash(
-        project, flat_grouphashes, hashes.hierarchical_hashes
+        project,
+        flat_grouphashes,
+        hashes.hierarchical_hashes,
+        hierarchical_grouphashes=hierarchical_grouphashes,
     )
 
     if root_hierarchical_hash is not None:
-        root_hierarchical_grouphash = GroupHash.objects.get_or_create(
-            project=project, hash=root_hierarchical_hash
-        )[0]
+        root_hierarchical_grouphash = hierarchical_grouphashes.get(root_hierarchical_hash)
+        if root_hierarchical_grouphash is None:
+            root_hierarchical_grouphash = GroupHash.objects.get_or_create(
+                project=project, hash=root_hierarchical_hash
+            )[0]
 
         metadata.update(
             hashes.group_metadata_from_hash(
@@ -1116,6 +1348,9 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
                     tags={"platform": event.platform or "unknown"},
                 )
 
+                if root_hierarchical_grouphash is None:
+                    _cache_grouphashes(project, hashes, flat_grouphashes, group.id)
+
                 return group, is_new, is_regression
 
     group = Group.objects.get(id=existing_grouphash.group_id)
@@ -1156,6 +1391,9 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
             state=GroupHash.State.LOCKED_IN_MIGRATION
         ).update(group=group)
 
+    if root_hierarchical_hash is None:
+        _cache_grouphashes(project, hashes, flat_grouphashes, group.id)
+
     is_regression = _process_existing_aggregate(
         group=group, event=event, data=kwargs, release=release
     )
@@ -1163,10 +1401,114 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
     return group, is_new, is_regression
 
 
+def _get_or_create_grouphashes_many(project, flat_hashes, hierarchical_hashes):
+    """
+    Bulk version of `GroupHash.objects.get_or_create`.
+
+    Looks up flat and hierarchical hashes with a single query, and creates
+    missing flat hashes with one `INSERT ... ON CONFLICT DO NOTHING` followed
+    by one query for the rows that were inserted (possibly by a concurrent
+    process). Hierarchical hashes are only looked up, as only the root
+    hierarchical hash ever gets created.
+
+    Returns the flat grouphashes in the order of `flat_hashes` and a mapping
+    of hash to grouphash for the hierarchical hashes that exist.
+    """
+    with metrics.timer("event_manager.get_or_create_grouphashes_many") as metric_tags:
+        grouphashes = {
+            gh.hash: gh
+            for gh in GroupHash.objects.filter(
+                project=project, hash__in=set(flat_hashes) | set(hierarchical_hashes or ())
+            )
+        }
+
+        missing_hashes = {hash for hash in flat_hashes if hash not in grouphashes}
+        metric_tags["created"] = "true" if missing_hashes else "false"
+
+        if missing_hashes:
+            GroupHash.objects.bulk_create(
+                [GroupHash(project=project, hash=hash) for hash in missing_hashes],
+                ignore_conflicts=True,
+            )
+            grouphashes.update(
+                (gh.hash, gh)
+                for gh in GroupHash.objects.filter(project=project, hash__in=missing_hashes)
+            )
+
+    flat_grouphashes = [grouphashes[hash] for hash in flat_hashes]
+    hierarchical_grouphashes = {
+        hash: grouphashes[hash] for hash in hierarchical_hashes or () if hash in grouphashes
+    }
+    return flat_grouphashes, hierarchical_grouphashes
+
+
+def _get_group_from_cached_grouphashes(project, hashes):
+    """
+    Resolves the group of an event from the hash to group id cache, without
+    touching `GroupHash` in Postgres.
+
+    Only events without hierarchical hashes are eligible, and only if every
+    flat hash is cached, which means all of them are already associated with
+    a group. Like `_find_existing_grouphash`, the first hash wins.
+    """
+    if hashes.hierarchical_hashes or not hashes.hashes:
+        return None
+
+    if not options.get("store.grouphash-cache-ttl"):
+        return None
+
+    cached_group_ids = GroupHash.get_group_ids_from_cache(project.id, hashes.hashes)
+    if len(cached_group_ids) < len(set(hashes.hashes)):
+        metrics.incr("event_manager.grouphash_cache", tags={"result": "miss"})
+        return None
+
+    try:
+        group = Group.objects.get(id=cached_group_ids[hashes.hashes[0]])
+    except Group.DoesNotExist:
+        group = None
+
+    if group is None or group.status in (
+        GroupStatus.PENDING_DELETION,
+        GroupStatus.DELETION_IN_PROGRESS,
+        GroupStatus.PENDING_MERGE,
+        GroupStatus.REPROCESSING,
+    ):
+        GroupHash.invalidate_cache(project.id, hashes.hashes)
+        metrics.incr("event_manager.grouphash_cache", tags={"result": "stale"})
+        return None
+
+    metrics.incr("event_manager.grouphash_cache", tags={"result": "hit"})
+    return group
+
+
+def _cache_grouphashes(project, hashes, flat_grouphashes, group_id):
+    """
+    Populates the hash to group id cache once all flat hashes of an event are
+    associated with `group_id`. Hashes locked by a running unmerge are not
+    associated and therefore prevent caching.
+    """
+    timeout = options.get("store.grouphash-cache-ttl")
+    if not timeout or hashes.hierarchical_hashes:
+        return
+
+    group_ids = {}
+    for grouphash in flat_grouphashes:
+        if grouphash.group_id is None and grouphash.state != GroupHash.State.LOCKED_IN_MIGRATION:
+            # Has just been associated by `_save_aggregate`.
+            group_ids[grouphash.hash] = group_id
+        elif grouphash.group_id is not None:
+            group_ids[grouphash.hash] = grouphash.group_id
+        else:
+            return
+
+    GroupHash.set_group_ids_in_cache(project.id, group_ids, timeout)
+
+
 def _find_existing_grouphash(
     project,
     flat_grouphashes,
     hierarchical_hashes,
+    hierarchical_grouphashes=None,
 ):
     all_grouphashes = []
     root_hierarchical_hash = None
@@ -1174,10 +1516,11 @@ def _find_existing_grouphash(
     found_split = False
 
     if hierarchical_hashes:
-        hierarchical_grouphashes = {
-            h.hash: h
-            for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
-        }
+        if hierarchical_grouphashes is None:
+            hierarchical_grouphashes = {
+                h.hash: h
+                for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
+            }
 
         for hash in reversed(hierarchical_hashes):
             group_hash = hierarchical_grouphashes.get(hash)
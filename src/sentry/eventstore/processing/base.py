@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Any, Optional
+from typing import Any, List, Mapping, Optional, Sequence
 
 import sentry_sdk
 
@@ -40,12 +40,41 @@ class EventProcessingStore:
             self.inner.set(key, event, self.timeout)
             return key
 
+    def store_many(self, events: Sequence[Event], unprocessed: bool = False) -> List[str]:
+        """
+        Store multiple event payloads at once. Returns the keys of the events
+        in the order they were passed in.
+        """
+        with sentry_sdk.start_span(op="eventstore.processing.store_many") as span:
+            span.set_data("num_events", len(events))
+            keys = [cache_key_for_event(event) for event in events]
+            if unprocessed:
+                keys = [self.__get_unprocessed_key(key) for key in keys]
+            self.inner.set_many(dict(zip(keys, events)), self.timeout)
+            return keys
+
     def get(self, key: str, unprocessed: bool = False) -> Optional[Event]:
         with sentry_sdk.start_span(op="eventstore.processing.get"):
             if unprocessed:
                 key = self.__get_unprocessed_key(key)
             return self.inner.get(key)
 
+    def get_many(self, keys: Sequence[str], unprocessed: bool = False) -> Mapping[str, Event]:
+        """
+        Fetch multiple event payloads at once. The returned mapping is keyed
+        by the keys that were passed in and only contains keys that were found.
+        """
+        with sentry_sdk.start_span(op="eventstore.processing.get_many") as span:
+            span.set_data("num_keys", len(keys))
+            if unprocessed:
+                inner_keys = {self.__get_unprocessed_key(key): key for key in keys}
+            else:
+                inner_keys = {key: key for key in keys}
+            return {
+                inner_keys[inner_key]: value
+                for inner_key, value in self.inner.get_many(list(inner_keys))
+            }
+
     def delete_by_key(self, key: str) -> None:
         with sentry_sdk.start_span(op="eventstore.processing.delete_by_key"):
             self.inner.delete(key)
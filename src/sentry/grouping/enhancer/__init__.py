@@ -1,4 +1,5 @@
 import base64
+import functools
 import os
 import zlib
 
@@ -70,6 +71,11 @@ _        = space*
 VERSIONS = [1, 2]
 LATEST_VERSION = VERSIONS[-1]
 
+# Number of deserialized enhancements kept per process. Enhancements are loaded
+# from their serialized form for every grouping config that is instantiated,
+# but only a handful of distinct configs are in use at any time.
+LOADS_CACHE_SIZE = 100
+
 
 class StacktraceState:
     def __init__(self):
@@ -96,6 +102,39 @@ class StacktraceState:
         return f"{hint} by stack trace rule ({description})"
 
 
+class MatchFrameIndex:
+    """Summarizes the match frames of a stacktrace so that rules which cannot
+    possibly match any frame are skipped without evaluating them frame by
+    frame.  Only values that actions never modify are indexed.
+    """
+
+    def __init__(self, match_frames):
+        self.match_frames = match_frames
+        self.families = frozenset(frame["family"] for frame in match_frames)
+        self._values = {}
+        self._results = {}
+
+    def _get_values(self, field):
+        rv = self._values.get(field)
+        if rv is None:
+            rv = self._values[field] = {
+                frame[field] for frame in self.match_frames if frame[field] is not None
+            }
+        return rv
+
+    def has_value(self, field, literal, is_exact):
+        key = (field, literal, is_exact)
+        rv = self._results.get(key)
+        if rv is None:
+            values = self._get_values(field)
+            if is_exact:
+                rv = literal in values
+            else:
+                rv = any(value.startswith(literal) for value in values)
+            self._results[key] = rv
+        return rv
+
+
 class Enhancements:
 
     # NOTE: You must add a version to ``VERSIONS`` any time attributes are added
@@ -116,6 +155,25 @@ class Enhancements:
         self._modifier_rules = [rule for rule in self.iter_rules() if rule.is_modifier]
         self._updater_rules = [rule for rule in self.iter_rules() if rule.is_updater]
 
+        # Rules applicable to a set of frame families, keyed by
+        # ``(is_modifier, families)``.  There are only a few families, so this
+        # stays small.
+        self._rules_by_families = {}
+
+    def _get_candidate_rules(self, is_modifier, match_frames):
+        """Returns the rules that could match the given frames, in order."""
+        index = MatchFrameIndex(match_frames)
+
+        key = (is_modifier, index.families)
+        rules = self._rules_by_families.get(key)
+        if rules is None:
+            all_rules = self._modifier_rules if is_modifier else self._updater_rules
+            rules = self._rules_by_families[key] = [
+                rule for rule in all_rules if rule.matches_families(index.families)
+            ]
+
+        return [rule for rule in rules if rule.could_match(index)]
+
     def apply_modifications_to_frame(self, frames, platform, exception_data):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
@@ -125,7 +183,7 @@ class Enhancements:
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
 
-        for rule in self._modifier_rules:
+        for rule in self._get_candidate_rules(True, match_frames):
             for idx, action in rule.get_matching_frame_actions(
                 match_frames, platform, exception_data, cache
             ):
@@ -139,7 +197,7 @@ class Enhancements:
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
+        for rule in self._get_candidate_rules(False, match_frames):
 
             for idx, action in rule.get_matching_frame_actions(
                 match_frames, platform, exception_data, cache
@@ -251,6 +309,10 @@ class Enhancements:
     def loads(cls, data):
         if isinstance(data, str):
             data = data.encode("ascii", "ignore")
+        return _load_enhancements(cls, data)
+
+    @classmethod
+    def _loads(cls, data):
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
             return cls._from_config_structure(
@@ -289,6 +351,13 @@ class Rule:
         self._is_updater = any(action.is_updater for action in actions)
         self._is_modifier = any(action.is_modifier for action in actions)
 
+        # Requirements on the stacktrace as a whole that every matching frame
+        # (or its caller or callee) implies.
+        self._families = [m.families for m in self._other_matchers if m.families is not None]
+        self._frame_filters = [
+            m.frame_filter for m in self._other_matchers if m.frame_filter is not None
+        ]
+
     @property
     def matcher_description(self):
         rv = " ".join(x.description for x in self.matchers)
@@ -306,6 +375,16 @@ class Rule:
         """Does this rule update grouping components?"""
         return self._is_updater
 
+    def matches_families(self, families):
+        """Can this rule match a stacktrace with frames of the given families?"""
+        return all(not families.isdisjoint(required) for required in self._families)
+
+    def could_match(self, index):
+        """Can this rule match any frame of the indexed stacktrace?  This is a
+        cheap check, rules passing it still need to be evaluated per frame.
+        """
+        return all(index.has_value(*frame_filter) for frame_filter in self._frame_filters)
+
     def as_dict(self):
         matchers = {}
         for matcher in self.matchers:
@@ -445,6 +524,11 @@ class EnhancmentsVisitor(NodeVisitor):
         return node.match.groups()[0].lstrip("!")
 
 
+@functools.lru_cache(maxsize=LOADS_CACHE_SIZE)
+def _load_enhancements(cls, data):
+    return cls._loads(data)
+
+
 def _load_configs():
     rv = {}
     base = os.path.join(os.path.abspath(os.path.dirname(__file__)), "enhancement-configs")
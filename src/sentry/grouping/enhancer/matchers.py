@@ -1,3 +1,5 @@
+import functools
+import re
 from typing import Optional
 
 from sentry.grouping.utils import get_rule_bool
@@ -25,6 +27,17 @@ SHORT_MATCH_KEYS = {v: k for k, v in MATCH_KEYS.items()}
 
 assert len(SHORT_MATCH_KEYS) == len(MATCH_KEYS)  # assert short key names are not reused
 
+# Frame fields that enhancement actions never modify. Only matchers on these
+# fields can be used to rule out rules before evaluating them frame by frame.
+IMMUTABLE_FRAME_FIELDS = ("function", "module")
+
+# Size of the process-wide cache of glob match results on frame fields. Frame
+# values such as function names and modules repeat heavily across events, so
+# most matches are answered without calling into ``glob_match``.
+MATCH_CACHE_SIZE = 50000
+
+_glob_special_chars_re = re.compile(rb"[*?\[\]{}\\]")
+
 FAMILIES = {"native": "N", "javascript": "J", "all": "a"}
 REVERSE_FAMILIES = {v: k for k, v in FAMILIES.items()}
 
@@ -81,9 +94,30 @@ def create_match_frame(frame_data: dict, platform: Optional[str]) -> dict:
     return match_frame
 
 
+def _get_literal_prefix(pattern: bytes):
+    """Returns the literal prefix of a glob pattern and whether the entire
+    pattern is literal."""
+    match = _glob_special_chars_re.search(pattern)
+    if match is None:
+        return pattern, True
+    return pattern[: match.start()], False
+
+
+@functools.lru_cache(maxsize=MATCH_CACHE_SIZE)
+def frame_glob_match(value, pattern):
+    return glob_match(value, pattern)
+
+
 class Match:
     description = None
 
+    # A frozenset of families this matcher requires a frame to have, if any
+    families = None
+
+    # A ``(field, literal, is_exact)`` tuple if this matcher requires an
+    # immutable frame field to start with (or equal) a literal value
+    frame_filter = None
+
     def matches_frame(self, frames, idx, platform, exception_data, cache):
         raise NotImplementedError()
 
@@ -156,6 +190,12 @@ class FrameMatch(Match):
         self._encoded_pattern = pattern.encode("utf-8")
         self.negated = negated
 
+        field = getattr(self, "field", None)
+        if not negated and field in IMMUTABLE_FRAME_FIELDS:
+            literal, is_exact = _get_literal_prefix(self._encoded_pattern)
+            if literal or is_exact:
+                self.frame_filter = (field, literal, is_exact)
+
     @property
     def description(self):
         return "{}:{}".format(
@@ -184,8 +224,8 @@ class FrameMatch(Match):
         return ("!" if self.negated else "") + MATCH_KEYS[self.key] + arg
 
 
+@functools.lru_cache(maxsize=MATCH_CACHE_SIZE)
 def path_like_match(pattern, value):
-    """Stand-alone function for use with ``cached``"""
     if glob_match(value, pattern, ignorecase=False, doublestar=True, path_normalize=True):
         return True
     if not value.startswith(b"/") and glob_match(
@@ -205,7 +245,7 @@ class PathLikeMatch(FrameMatch):
         if value is None:
             return False
 
-        return cached(cache, path_like_match, self._encoded_pattern, value)
+        return path_like_match(self._encoded_pattern, value)
 
 
 class PackageMatch(PathLikeMatch):
@@ -222,6 +262,8 @@ class FamilyMatch(FrameMatch):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._flags = set(self._encoded_pattern.split(b","))
+        if not self.negated and b"all" not in self._flags:
+            self.families = frozenset(self._flags)
 
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         if b"all" in self._flags:
@@ -241,9 +283,12 @@ class InAppMatch(FrameMatch):
 
 
 class FunctionMatch(FrameMatch):
+
+    field = "function"
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
 
-        return cached(cache, glob_match, match_frame["function"], self._encoded_pattern)
+        return frame_glob_match(match_frame["function"], self._encoded_pattern)
 
 
 class FrameFieldMatch(FrameMatch):
@@ -252,7 +297,7 @@ class FrameFieldMatch(FrameMatch):
         if field is None:
             return False
 
-        return cached(cache, glob_match, field, self._encoded_pattern)
+        return frame_glob_match(field, self._encoded_pattern)
 
 
 class ModuleMatch(FrameFieldMatch):
@@ -294,6 +339,14 @@ class CallerMatch(Match):
     def description(self):
         return f"[ {self.caller.description} ] |"
 
+    @property
+    def families(self):
+        return self.caller.families
+
+    @property
+    def frame_filter(self):
+        return self.caller.frame_filter
+
     def _to_config_structure(self, version):
         return f"[{self.caller._to_config_structure(version)}]|"
 
@@ -311,6 +364,14 @@ class CalleeMatch(Match):
     def description(self):
         return f"| [ {self.caller.description} ]"
 
+    @property
+    def families(self):
+        return self.caller.families
+
+    @property
+    def frame_filter(self):
+        return self.caller.frame_filter
+
     def _to_config_structure(self, version):
         return f"|[{self.caller._to_config_structure(version)}]"
 
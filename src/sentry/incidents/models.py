@@ -336,6 +336,45 @@ class AlertRuleManager(BaseManager):
 
         return alert_rule
 
+    def get_for_subscriptions(self, subscriptions):
+        """
+        Fetches the AlertRules associated with multiple Subscriptions, using one cache
+        lookup and at most one database query. Returns a dict of subscription id to
+        AlertRule, subscriptions without an AlertRule are omitted.
+        """
+        cache_keys = {
+            self.__build_subscription_cache_key(subscription.id): subscription
+            for subscription in subscriptions
+        }
+        rv = {
+            cache_keys[cache_key].id: alert_rule
+            for cache_key, alert_rule in cache.get_many(list(cache_keys)).items()
+            if alert_rule is not None
+        }
+        missing = [subscription for subscription in subscriptions if subscription.id not in rv]
+        if missing:
+            alert_rules = {
+                alert_rule.snuba_query_id: alert_rule
+                for alert_rule in AlertRule.objects.filter(
+                    snuba_query_id__in={subscription.snuba_query_id for subscription in missing}
+                )
+            }
+            fetched = {
+                subscription.id: alert_rules[subscription.snuba_query_id]
+                for subscription in missing
+                if subscription.snuba_query_id in alert_rules
+            }
+            cache.set_many(
+                {
+                    self.__build_subscription_cache_key(subscription_id): alert_rule
+                    for subscription_id, alert_rule in fetched.items()
+                },
+                3600,
+            )
+            rv.update(fetched)
+
+        return rv
+
     @classmethod
     def clear_subscription_cache(cls, instance, **kwargs):
         cache.delete(cls.__build_subscription_cache_key(instance.id))
@@ -486,6 +525,39 @@ class AlertRuleTriggerManager(BaseManager):
             cache.set(cache_key, triggers, 3600)
         return triggers
 
+    def get_for_alert_rules(self, alert_rules):
+        """
+        Fetches the AlertRuleTriggers associated with multiple AlertRules, using one
+        cache lookup and at most one database query. Returns a dict of alert rule id
+        to a list of AlertRuleTriggers.
+        """
+        cache_keys = {
+            self._build_trigger_cache_key(alert_rule.id): alert_rule.id
+            for alert_rule in alert_rules
+        }
+        rv = {
+            cache_keys[cache_key]: triggers
+            for cache_key, triggers in cache.get_many(list(cache_keys)).items()
+            if triggers is not None
+        }
+        missing = [
+            alert_rule_id for alert_rule_id in cache_keys.values() if alert_rule_id not in rv
+        ]
+        if missing:
+            fetched = {alert_rule_id: [] for alert_rule_id in missing}
+            for trigger in AlertRuleTrigger.objects.filter(alert_rule_id__in=missing):
+                fetched[trigger.alert_rule_id].append(trigger)
+            cache.set_many(
+                {
+                    self._build_trigger_cache_key(alert_rule_id): triggers
+                    for alert_rule_id, triggers in fetched.items()
+                },
+                3600,
+            )
+            rv.update(fetched)
+
+        return rv
+
     @classmethod
     def clear_trigger_cache(cls, instance, **kwargs):
         cache.delete(cls._build_trigger_cache_key(instance.alert_rule_id))
@@ -1,12 +1,13 @@
 import logging
 import operator
+from collections import namedtuple
 from copy import deepcopy
 from datetime import timedelta
 
 from django.conf import settings
 from django.db import transaction
 
-from sentry import features
+from sentry import features, options
 from sentry.incidents.logic import (
     CRITICAL_TRIGGER_LABEL,
     WARNING_TRIGGER_LABEL,
@@ -42,6 +43,9 @@ ALERT_RULE_BASE_STAT_KEY = "%s:%s"
 ALERT_RULE_STAT_KEYS = ("last_update",)
 ALERT_RULE_BASE_TRIGGER_STAT_KEY = "%s:trigger:%s:%s"
 ALERT_RULE_TRIGGER_STAT_KEYS = ("alert_triggered", "resolve_triggered")
+COMPARISON_VALUE_KEY = "{comparison_value:snuba_query:%s:%s}:%s"
+# How long a comparison value is kept after the update it will be compared with
+COMPARISON_VALUE_TTL_MARGIN = int(timedelta(hours=1).total_seconds())
 
 
 class SubscriptionProcessor:
@@ -52,27 +56,45 @@ class SubscriptionProcessor:
     incident if a resolve threshold is set and the threshold is triggered.
     """
 
+    # Returned by `query_comparison_value` if the comparison query fails
+    QUERY_FAILED = object()
+
     # Each entry is a tuple in format (<alert_operator>, <resolve_operator>)
     THRESHOLD_TYPE_OPERATORS = {
         AlertRuleThresholdType.ABOVE: (operator.gt, operator.lt),
         AlertRuleThresholdType.BELOW: (operator.lt, operator.gt),
     }
 
-    def __init__(self, subscription):
+    def __init__(self, subscription, prefetched=None):
+        """
+        :param prefetched: Optional `SubscriptionProcessorState` loaded in bulk by
+        `prefetch_subscription_processors`. When passed, the alert rule, triggers and
+        stats aren't fetched again.
+        """
         self.subscription = subscription
-        try:
-            self.alert_rule = AlertRule.objects.get_for_subscription(subscription)
-        except AlertRule.DoesNotExist:
-            return
+        if prefetched is not None:
+            if prefetched.alert_rule is None:
+                return
+            self.alert_rule = prefetched.alert_rule
+            self.triggers = list(prefetched.triggers)
+            stats = prefetched.stats
+        else:
+            try:
+                self.alert_rule = AlertRule.objects.get_for_subscription(subscription)
+            except AlertRule.DoesNotExist:
+                return
+            self.triggers = AlertRuleTrigger.objects.get_for_alert_rule(self.alert_rule)
+            stats = None
 
-        self.triggers = AlertRuleTrigger.objects.get_for_alert_rule(self.alert_rule)
         self.triggers.sort(key=lambda trigger: trigger.alert_threshold)
+        if stats is None:
+            stats = get_alert_rule_stats(self.alert_rule, self.subscription, self.triggers)
 
         (
             self.last_update,
             self.trigger_alert_counts,
             self.trigger_resolve_counts,
-        ) = get_alert_rule_stats(self.alert_rule, self.subscription, self.triggers)
+        ) = stats
         self.orig_trigger_alert_counts = deepcopy(self.trigger_alert_counts)
         self.orig_trigger_resolve_counts = deepcopy(self.trigger_resolve_counts)
 
@@ -170,6 +192,68 @@ class SubscriptionProcessor:
         snuba_query = self.subscription.snuba_query
         start = end - timedelta(seconds=snuba_query.time_window)
 
+        comparison_aggregate = None
+        if options.get("incidents.comparison-value-cache"):
+            comparison_aggregate = self.get_cached_comparison_value(
+                subscription_update["timestamp"], end, aggregation_value
+            )
+
+        if comparison_aggregate is None:
+            comparison_aggregate = self.query_comparison_value(snuba_query, start, end)
+            if comparison_aggregate is self.QUERY_FAILED:
+                return
+
+        if not comparison_aggregate:
+            metrics.incr("incidents.alert_rules.skipping_update_comparison_value_invalid")
+            return
+
+        return (aggregation_value / comparison_aggregate) * 100
+
+    def get_cached_comparison_value(self, timestamp, comparison_end, aggregation_value):
+        """
+        Records the aggregate of the current update as the comparison value of the update
+        `comparison_delta` from now, and fetches the value the update `comparison_delta`
+        ago recorded for this one, in a single round trip. Windows in the past don't
+        change, so that aggregate matches what a comparison query would return apart from
+        events that arrived after the window was evaluated.
+
+        Values are keyed by the snuba query, the Snuba subscription and the end of the
+        window. The Snuba subscription is recreated whenever the query changes, so values
+        recorded for an older version of the query are never used.
+        :return: The comparison value, or None if it isn't cached.
+        """
+        pipeline = get_redis_client().pipeline()
+        pipeline.get(self.build_comparison_value_key(comparison_end))
+        pipeline.set(
+            self.build_comparison_value_key(timestamp),
+            aggregation_value,
+            ex=self.alert_rule.comparison_delta + COMPARISON_VALUE_TTL_MARGIN,
+        )
+        try:
+            comparison_aggregate = pipeline.execute()[0]
+        except Exception:
+            logger.exception("Failed to fetch cached comparison value")
+            comparison_aggregate = None
+
+        if comparison_aggregate is None:
+            metrics.incr("incidents.alert_rules.comparison_value_cache", tags={"result": "miss"})
+            return None
+
+        metrics.incr("incidents.alert_rules.comparison_value_cache", tags={"result": "hit"})
+        return float(comparison_aggregate)
+
+    def build_comparison_value_key(self, window_end):
+        return COMPARISON_VALUE_KEY % (
+            self.subscription.snuba_query_id,
+            self.subscription.subscription_id,
+            int(to_timestamp(window_end)),
+        )
+
+    def query_comparison_value(self, snuba_query, start, end):
+        """
+        Runs the comparison query over the window ending at `end`.
+        :return: The aggregate, or `QUERY_FAILED` if the query failed.
+        """
         try:
             snuba_filter = build_snuba_filter(
                 QueryDatasets(snuba_query.dataset),
@@ -194,16 +278,10 @@ class SubscriptionProcessor:
                 limit=1,
                 referrer="subscription_processor.comparison_query",
             )
-            comparison_aggregate = results["data"][0]["count"]
+            return results["data"][0]["count"]
         except Exception:
             logger.exception("Failed to run comparison query")
-            return
-
-        if not comparison_aggregate:
-            metrics.incr("incidents.alert_rules.skipping_update_comparison_value_invalid")
-            return
-
-        return (aggregation_value / comparison_aggregate) * 100
+            return self.QUERY_FAILED
 
     def get_aggregation_value(self, subscription_update):
         aggregation_value = list(subscription_update["values"]["data"][0].values())[0]
@@ -552,6 +630,37 @@ def get_alert_rule_stats(alert_rule, subscription, triggers):
     alert_rule_keys = build_alert_rule_stat_keys(alert_rule, subscription)
     trigger_keys = build_trigger_stat_keys(alert_rule, subscription, triggers)
     results = get_redis_client().mget(alert_rule_keys + trigger_keys)
+    return parse_alert_rule_stats(triggers, results)
+
+
+def get_alert_rule_stats_many(items):
+    """
+    Fetches stats about multiple alert rules in a single round trip. Keys of different
+    alert rules live in different slots, so each rule is fetched with its own `MGET`
+    in one pipeline.
+    :param items: A list of (alert_rule, subscription, triggers) tuples
+    :return: A list of stats in the same format as `get_alert_rule_stats`, in the
+    same order as `items`
+    """
+    if not items:
+        return []
+
+    pipeline = get_redis_client().pipeline(transaction=False)
+    for alert_rule, subscription, triggers in items:
+        pipeline.mget(
+            build_alert_rule_stat_keys(alert_rule, subscription)
+            + build_trigger_stat_keys(alert_rule, subscription, triggers)
+        )
+    return [
+        parse_alert_rule_stats(triggers, results)
+        for (_, _, triggers), results in zip(items, pipeline.execute())
+    ]
+
+
+def parse_alert_rule_stats(triggers, results):
+    """
+    Parses the values of the alert rule and trigger stat keys, as returned by `MGET`
+    """
     results = tuple(0 if result is None else int(result) for result in results)
     last_update = to_datetime(results[0])
     trigger_results = results[1:]
@@ -566,6 +675,50 @@ def get_alert_rule_stats(alert_rule, subscription, triggers):
     return last_update, trigger_alert_counts, trigger_resolve_counts
 
 
+class SubscriptionProcessorState(
+    namedtuple("SubscriptionProcessorState", ("alert_rule", "triggers", "stats"))
+):
+    """
+    The alert rule, triggers and stats of a subscription as loaded by
+    `prefetch_subscription_processors`. `alert_rule` is None if the subscription has
+    no alert rule.
+    """
+
+    __slots__ = ()
+
+
+def prefetch_subscription_processors(subscriptions):
+    """
+    Loads the state `SubscriptionProcessor` needs for multiple subscriptions at once:
+    one cache lookup for alert rules and triggers, falling back to a single query
+    each, and one Redis round trip for the stats.
+    :return: A dict of subscription id to `SubscriptionProcessorState`
+    """
+    alert_rules = AlertRule.objects.get_for_subscriptions(subscriptions)
+    triggers = AlertRuleTrigger.objects.get_for_alert_rules(
+        list({alert_rule.id: alert_rule for alert_rule in alert_rules.values()}.values())
+    )
+
+    items = []
+    for subscription in subscriptions:
+        alert_rule = alert_rules.get(subscription.id)
+        if alert_rule is not None:
+            rule_triggers = sorted(
+                triggers.get(alert_rule.id, []), key=lambda trigger: trigger.alert_threshold
+            )
+            items.append((alert_rule, subscription, rule_triggers))
+
+    rv = {
+        subscription.id: SubscriptionProcessorState(None, [], None)
+        for subscription in subscriptions
+    }
+    for (alert_rule, subscription, rule_triggers), stats in zip(
+        items, get_alert_rule_stats_many(items)
+    ):
+        rv[subscription.id] = SubscriptionProcessorState(alert_rule, rule_triggers, stats)
+    return rv
+
+
 def update_alert_rule_stats(alert_rule, subscription, last_update, alert_counts, resolve_counts):
     """
     Updates stats about the alert rule, subscription and triggers if they've changed.
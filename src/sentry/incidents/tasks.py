@@ -20,7 +20,10 @@ from sentry.incidents.models import (
     PendingIncidentSnapshot,
 )
 from sentry.models import Project
-from sentry.snuba.query_subscription_consumer import register_subscriber
+from sentry.snuba.query_subscription_consumer import (
+    register_subscriber,
+    register_subscriber_prefetch,
+)
 from sentry.tasks.base import instrumented_task
 from sentry.utils import metrics
 from sentry.utils.email import MessageBuilder
@@ -105,18 +108,32 @@ def build_activity_context(activity, user):
 
 
 @register_subscriber(INCIDENTS_SNUBA_SUBSCRIPTION_TYPE)
-def handle_snuba_query_update(subscription_update, subscription):
+def handle_snuba_query_update(subscription_update, subscription, prefetched=None):
     """
     Handles a subscription update for a `QuerySubscription`.
     :param subscription_update: dict formatted according to schemas in
     sentry.snuba.json_schemas.SUBSCRIPTION_PAYLOAD_VERSIONS
     :param subscription: The `QuerySubscription` that this update is for
+    :param prefetched: Optional state returned by `prefetch_snuba_query_updates`
     """
     from sentry.incidents.subscription_processor import SubscriptionProcessor
 
     # noinspection SpellCheckingInspection
     with metrics.timer("incidents.subscription_procesor.process_update"):
-        SubscriptionProcessor(subscription).process_update(subscription_update)
+        SubscriptionProcessor(subscription, prefetched=prefetched).process_update(
+            subscription_update
+        )
+
+
+@register_subscriber_prefetch(INCIDENTS_SNUBA_SUBSCRIPTION_TYPE)
+def prefetch_snuba_query_updates(subscriptions):
+    """
+    Loads the alert rules, triggers and stats for a batch of `QuerySubscription`s.
+    """
+    from sentry.incidents.subscription_processor import prefetch_subscription_processors
+
+    with metrics.timer("incidents.subscription_procesor.prefetch"):
+        return prefetch_subscription_processors(subscriptions)
 
 
 @instrumented_task(
@@ -2,13 +2,16 @@ import functools
 import logging
 import random
 import time
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from threading import Lock
 from typing import (
     Any,
     Callable,
     Mapping,
     MutableMapping,
     MutableSequence,
+    MutableSet,
     NamedTuple,
     Optional,
     Sequence,
@@ -22,7 +25,7 @@ import sentry_sdk
 from django.conf import settings
 from django.core.cache import cache
 
-from sentry import eventstore, features
+from sentry import eventstore, features, options
 from sentry.attachments import CachedAttachment, attachment_cache
 from sentry.event_manager import save_attachment
 from sentry.eventstore.processing import event_processing_store
@@ -31,7 +34,13 @@ from sentry.ingest.userreport import Conflict, save_userreport
 from sentry.killswitches import killswitch_matches_context
 from sentry.models import Project
 from sentry.signals import event_accepted
-from sentry.tasks.store import preprocess_event
+from sentry.tasks.store import (
+    SaveEventBatch,
+    batch_save_events,
+    get_save_event_batch,
+    join_save_event_batch,
+    preprocess_event,
+)
 from sentry.utils import json, metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
@@ -56,10 +65,59 @@ class AsyncResult(NamedTuple):  # TODO: Use Generic[T] with 3.7+
 Message = Any
 
 
+def get_deduplication_key(project_id: int, event_id: str) -> str:
+    return f"ev:{project_id}:{event_id}"
+
+
+class EventDeduplicator:
+    """
+    Batches the deduplication cache reads and writes for the events of one
+    consumer batch: keys are fetched with one ``get_many`` up front and
+    processed events are remembered with one ``set_many`` at the end.
+    """
+
+    def __init__(self) -> None:
+        self._seen: MutableSet[str] = set()
+        self._processed: MutableSequence[str] = []
+        self._lock = Lock()
+
+    def prefetch(self, keys: Sequence[str]) -> None:
+        if keys:
+            self._seen.update(cache.get_many(keys))
+
+    def is_duplicate(self, key: str) -> bool:
+        # Claim the key, so that duplicates within the same batch are dropped
+        # as well.
+        with self._lock:
+            if key in self._seen:
+                return True
+            self._seen.add(key)
+            return False
+
+    def mark_processed(self, key: str) -> None:
+        with self._lock:
+            self._processed.append(key)
+
+    def flush(self) -> None:
+        with self._lock:
+            processed, self._processed = self._processed, []
+
+        if processed:
+            cache.set_many({key: "" for key in processed}, CACHE_TIMEOUT)
+
+
 class IngestConsumerWorker(AbstractBatchWorker):
-    def __init__(self, process_event_executor: Optional[ThreadPoolExecutor] = None) -> None:
+    def __init__(
+        self,
+        process_event_executor: Optional[ThreadPoolExecutor] = None,
+        pipeline_executor: Optional[ThreadPoolExecutor] = None,
+    ) -> None:
         self.__process_event_executor = process_event_executor
-        if self.__process_event_executor is None:
+        self.__pipeline_executor = pipeline_executor
+        if self.__process_event_executor is None or self.__pipeline_executor is not None:
+            # When pipelining, events are processed start to finish on a
+            # pipeline worker; handing off their storage to another executor
+            # would only add latency.
             self.__process_event = process_event
         else:
             self.__process_event = functools.partial(
@@ -73,6 +131,13 @@ class IngestConsumerWorker(AbstractBatchWorker):
     def flush_batch(self, batch):
         mark_scope_as_unsafe()
         with metrics.timer("ingest_consumer.flush_batch"):
+            sample_rate = options.get("store.save-event-many-sample-rate")
+            if sample_rate and random.random() <= sample_rate:
+                # Events that need no further processing are saved with one
+                # save_event_many task per project instead of one task each.
+                with batch_save_events():
+                    return self._flush_batch(batch)
+
             return self._flush_batch(batch)
 
     def _flush_batch(self, batch: Sequence[Message]):
@@ -96,13 +161,20 @@ class IngestConsumerWorker(AbstractBatchWorker):
 
         projects_to_fetch = set()
 
+        deduplicator = EventDeduplicator()
+        deduplication_keys = []
+        process_event_func = functools.partial(self.__process_event, deduplicator=deduplicator)
+
         with metrics.timer("ingest_consumer.prepare_messages"):
             for message in batch:
                 message_type = message["type"]
                 projects_to_fetch.add(message["project_id"])
 
                 if message_type == "event":
-                    other_messages.append((self.__process_event, message))
+                    other_messages.append((process_event_func, message))
+                    deduplication_keys.append(
+                        get_deduplication_key(message["project_id"], message["event_id"])
+                    )
                 elif message_type == "attachment_chunk":
                     attachment_chunks.append(message)
                 elif message_type == "attachment":
@@ -118,11 +190,33 @@ class IngestConsumerWorker(AbstractBatchWorker):
         with metrics.timer("ingest_consumer.fetch_projects"):
             projects = {p.id: p for p in Project.objects.get_many_from_cache(projects_to_fetch)}
 
+        with metrics.timer("ingest_consumer.fetch_deduplication_keys"):
+            deduplicator.prefetch(deduplication_keys)
+
         if attachment_chunks:
             # attachment_chunk messages need to be processed before attachment/event messages.
             with metrics.timer("ingest_consumer.process_attachment_chunk_batch"):
-                for attachment_chunk in attachment_chunks:
-                    process_attachment_chunk(attachment_chunk, projects=projects)
+                process_attachment_chunks(attachment_chunks, projects=projects)
+
+        try:
+            self._process_other_messages(other_messages, projects)
+        finally:
+            # Remember dispatched events even if the batch failed halfway, as
+            # it is going to be retried.
+            with metrics.timer("ingest_consumer.set_deduplication_keys"):
+                deduplicator.flush()
+
+    def _process_other_messages(
+        self,
+        other_messages: Sequence[
+            Tuple[Callable[[Message, Mapping[int, Project]], Union[Any, AsyncResult]], Message]
+        ],
+        projects: Mapping[int, Project],
+    ) -> None:
+        if self.__pipeline_executor is not None:
+            if other_messages:
+                self._run_pipeline_stage("other_messages", other_messages, projects)
+            return
 
         if other_messages:
             with metrics.timer("ingest_consumer.process_other_messages_batch"):
@@ -148,9 +242,72 @@ class IngestConsumerWorker(AbstractBatchWorker):
                     (time.monotonic() - other_messages_flush_start) / len(other_messages),
                 )
 
+    def _run_pipeline_stage(
+        self,
+        stage: str,
+        messages: Sequence[Tuple[Callable[[Message, Mapping[int, Project]], Any], Message]],
+        projects: Mapping[int, Project],
+    ) -> None:
+        """
+        Process messages on the pipeline executor, partitioned by
+        ``(project_id, event_id)``. Partitions are processed concurrently,
+        while the messages of one partition are processed in order so that
+        messages belonging to the same event are never reordered.
+        """
+        partitions = defaultdict(list)
+        for processing_func, message in messages:
+            partitions[(message["project_id"], message.get("event_id"))].append(
+                (processing_func, message)
+            )
+
+        metrics.timing(
+            "ingest_consumer.pipeline.queue_depth", len(partitions), tags={"stage": stage}
+        )
+        # Events saved by the pipeline workers are collected in the batch of
+        # this thread, which is submitted once all partitions are done.
+        save_event_batch = get_save_event_batch()
+        with metrics.timer("ingest_consumer.pipeline.stage", tags={"stage": stage}):
+            futures = [
+                self.__pipeline_executor.submit(
+                    _process_partition,
+                    stage,
+                    time.monotonic(),
+                    partition,
+                    projects,
+                    save_event_batch,
+                )
+                for partition in partitions.values()
+            ]
+            wait(futures)
+
+        # Raise the first error only once all partitions are done.
+        for future in futures:
+            future.result()
+
     def shutdown(self):
         if self.__process_event_executor is not None:
             self.__process_event_executor.shutdown()
+        if self.__pipeline_executor is not None:
+            self.__pipeline_executor.shutdown()
+
+
+def _process_partition(
+    stage: str,
+    submitted_at: float,
+    messages: Sequence[Tuple[Callable[[Message, Mapping[int, Project]], Any], Message]],
+    projects: Mapping[int, Project],
+    save_event_batch: Optional[SaveEventBatch] = None,
+) -> None:
+    metrics.timing(
+        "ingest_consumer.pipeline.queue_wait",
+        time.monotonic() - submitted_at,
+        tags={"stage": stage},
+    )
+    with join_save_event_batch(save_event_batch):
+        for processing_func, message in messages:
+            result = processing_func(message, projects)
+            if isinstance(result, AsyncResult):
+                result.callback(result.future)
 
 
 def trace_func(**span_kwargs):
@@ -169,8 +326,12 @@ def trace_func(**span_kwargs):
 
 
 @metrics.wraps("ingest_consumer.process_event")
-def _do_process_event(message: Message, projects: Mapping[int, Project]) -> None:
-    result = _load_event(message, projects)
+def _do_process_event(
+    message: Message,
+    projects: Mapping[int, Project],
+    deduplicator: Optional[EventDeduplicator] = None,
+) -> None:
+    result = _load_event(message, projects, deduplicator)
     if result is None:
         return
 
@@ -179,7 +340,9 @@ def _do_process_event(message: Message, projects: Mapping[int, Project]) -> None
 
 
 def _load_event(
-    message: Message, projects: Mapping[int, Project]
+    message: Message,
+    projects: Mapping[int, Project],
+    deduplicator: Optional[EventDeduplicator] = None,
 ) -> Optional[Tuple[Any, Callable[[str], None]]]:
     """
     Perform some initial filtering and deserialize the message payload. If the
@@ -215,8 +378,12 @@ def _load_event(
     # This code has been ripped from the old python store endpoint. We're
     # keeping it around because it does provide some protection against
     # reprocessing good events if a single consumer is in a restart loop.
-    deduplication_key = f"ev:{project_id}:{event_id}"
-    if cache.get(deduplication_key) is not None:
+    deduplication_key = get_deduplication_key(project_id, event_id)
+    if deduplicator is not None:
+        is_duplicate = deduplicator.is_duplicate(deduplication_key)
+    else:
+        is_duplicate = cache.get(deduplication_key) is not None
+    if is_duplicate:
         logger.warning(
             "pre-process-forwarder detected a duplicated event" " with id:%s for project:%s.",
             event_id,
@@ -292,7 +459,10 @@ def _load_event(
             )
 
         # remember for an 1 hour that we saved this event (deduplication protection)
-        cache.set(deduplication_key, "", CACHE_TIMEOUT)
+        if deduplicator is not None:
+            deduplicator.mark_processed(deduplication_key)
+        else:
+            cache.set(deduplication_key, "", CACHE_TIMEOUT)
 
         # emit event_accepted once everything is done
         event_accepted.send_robust(ip=remote_addr, data=data, project=project, sender=process_event)
@@ -305,14 +475,21 @@ def _store_event(data) -> str:
 
 
 @trace_func(name="ingest_consumer.process_event")
-def process_event(message: Message, projects: Mapping[int, Project]) -> None:
-    return _do_process_event(message, projects)
+def process_event(
+    message: Message,
+    projects: Mapping[int, Project],
+    deduplicator: Optional[EventDeduplicator] = None,
+) -> None:
+    return _do_process_event(message, projects, deduplicator)
 
 
 def process_event_async(
-    executor: ThreadPoolExecutor, message: Message, projects: Mapping[int, Project]
+    executor: ThreadPoolExecutor,
+    message: Message,
+    projects: Mapping[int, Project],
+    deduplicator: Optional[EventDeduplicator] = None,
 ) -> Optional["AsyncResult[str]"]:
-    result = _load_event(message, projects)
+    result = _load_event(message, projects, deduplicator)
     if result is None:
         return None
 
@@ -337,6 +514,28 @@ def process_attachment_chunk(message, projects):
     )
 
 
+@trace_func(name="ingest_consumer.process_attachment_chunks")
+@metrics.wraps("ingest_consumer.process_attachment_chunks")
+def process_attachment_chunks(messages, projects):
+    """
+    Write the chunks of a batch with a single pipelined cache operation.
+    """
+    attachment_cache.set_chunks(
+        [
+            (
+                cache_key_for_event(
+                    {"event_id": message["event_id"], "project": message["project_id"]}
+                ),
+                message["id"],
+                message["chunk_index"],
+                message["payload"],
+            )
+            for message in messages
+        ],
+        timeout=CACHE_TIMEOUT,
+    )
+
+
 @trace_func(name="ingest_consumer.process_individual_attachment")
 @metrics.wraps("ingest_consumer.process_individual_attachment")
 def process_individual_attachment(message, projects) -> None:
@@ -411,7 +610,11 @@ def process_userreport(message, projects) -> None:
 
 
 def get_ingest_consumer(
-    consumer_types, once=False, executor: Optional[ThreadPoolExecutor] = None, **options
+    consumer_types,
+    once=False,
+    executor: Optional[ThreadPoolExecutor] = None,
+    pipeline_executor: Optional[ThreadPoolExecutor] = None,
+    **options,
 ):
     """
     Handles events coming via a kafka queue.
@@ -420,5 +623,7 @@ def get_ingest_consumer(
     """
     topic_names = {ConsumerType.get_topic_name(consumer_type) for consumer_type in consumer_types}
     return create_batching_kafka_consumer(
-        topic_names=topic_names, worker=IngestConsumerWorker(executor), **options
+        topic_names=topic_names,
+        worker=IngestConsumerWorker(executor, pipeline_executor=pipeline_executor),
+        **options,
     )
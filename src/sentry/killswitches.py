@@ -8,8 +8,12 @@ features and more performant.
 """
 
 import copy
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+from django.conf import settings
 
 from sentry import options
 from sentry.utils import metrics
@@ -134,11 +138,117 @@ def normalize_value(
     return rv
 
 
+class CompiledKillswitch:
+    """
+    The normalized conditions of a killswitch, indexed by the value of the
+    first field each condition sets. Matching a context only has to look at
+    the conditions that share at least that value with it.
+    """
+
+    def __init__(self, killswitch_name: str, raw_option_value: LegacyKillswitchConfig) -> None:
+        # `normalize_value` fills in missing fields of the conditions it is
+        # given, so keep our own copy to compare against later option values.
+        self.raw_option_value = copy.deepcopy(raw_option_value)
+        self.index: Dict[str, Dict[str, KillswitchConfig]] = {}
+        for condition in normalize_value(killswitch_name, copy.deepcopy(raw_option_value)):
+            field = next(iter(condition))
+            self.index.setdefault(field, {}).setdefault(condition[field], []).append(condition)
+
+    def matches(self, context: Context) -> bool:
+        for field, conditions_by_value in self.index.items():
+            value = context.get(field)
+            if value is None:
+                continue
+
+            for condition in conditions_by_value.get(str(value), ()):
+                for condition_field, matching_value in condition.items():
+                    context_value = context.get(condition_field)
+                    if context_value is None or str(context_value) != matching_value:
+                        break
+                else:
+                    return True
+
+        return False
+
+
+class KillswitchSnapshot:
+    """
+    The compiled conditions of all killswitches at a point in time.
+    """
+
+    def __init__(self, killswitches: Mapping[str, CompiledKillswitch]) -> None:
+        self.killswitches = killswitches
+        self.refreshed_at = time.time()
+
+
+#: The last compiled value of every killswitch, reused while the option is unchanged
+_compiled_killswitches: Dict[str, CompiledKillswitch] = {}
+
+_snapshot: Optional[KillswitchSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def compile_killswitch(
+    killswitch_name: str, raw_option_value: LegacyKillswitchConfig
+) -> CompiledKillswitch:
+    compiled = _compiled_killswitches.get(killswitch_name)
+    if compiled is None or compiled.raw_option_value != raw_option_value:
+        compiled = CompiledKillswitch(killswitch_name, raw_option_value)
+        _compiled_killswitches[killswitch_name] = compiled
+    return compiled
+
+
+def _refresh_snapshot(stale: Optional[KillswitchSnapshot]) -> KillswitchSnapshot:
+    global _snapshot
+
+    # Only one thread refreshes the snapshot, all others keep reading the
+    # stale one in the meantime instead of waiting for it.
+    if stale is None:
+        _snapshot_lock.acquire()
+    elif not _snapshot_lock.acquire(blocking=False):
+        return stale
+
+    try:
+        snapshot = _snapshot
+        if snapshot is not None and snapshot is not stale:
+            return snapshot
+
+        _snapshot = KillswitchSnapshot(
+            {
+                killswitch_name: compile_killswitch(killswitch_name, options.get(killswitch_name))
+                for killswitch_name in ALL_KILLSWITCH_OPTIONS
+            }
+        )
+        if stale is not None:
+            metrics.timing("killswitches.snapshot.lag", _snapshot.refreshed_at - stale.refreshed_at)
+        return _snapshot
+    finally:
+        _snapshot_lock.release()
+
+
+def get_compiled_killswitch(killswitch_name: str) -> CompiledKillswitch:
+    """
+    Returns the compiled conditions of a killswitch.
+
+    With ``SENTRY_KILLSWITCH_SNAPSHOT_INTERVAL`` set, the conditions of all
+    killswitches are read from a per-process snapshot that is refreshed at
+    most that many seconds apart, rather than looking up the option on every
+    call.
+    """
+    interval = settings.SENTRY_KILLSWITCH_SNAPSHOT_INTERVAL
+    if not interval:
+        return compile_killswitch(killswitch_name, options.get(killswitch_name))
+
+    snapshot = _snapshot
+    if snapshot is None or time.time() - snapshot.refreshed_at >= interval:
+        snapshot = _refresh_snapshot(snapshot)
+    return snapshot.killswitches[killswitch_name]
+
+
 def killswitch_matches_context(killswitch_name: str, context: Context) -> bool:
     assert killswitch_name in ALL_KILLSWITCH_OPTIONS
     assert set(ALL_KILLSWITCH_OPTIONS[killswitch_name].fields) == set(context)
-    option_value = options.get(killswitch_name)
-    rv = _value_matches(killswitch_name, option_value, context)
+    rv = get_compiled_killswitch(killswitch_name).matches(context)
     metrics.incr(
         "killswitches.run",
         tags={"killswitch_name": killswitch_name, "decision": "matched" if rv else "passed"},
@@ -150,23 +260,7 @@ def killswitch_matches_context(killswitch_name: str, context: Context) -> bool:
 def _value_matches(
     killswitch_name: str, raw_option_value: LegacyKillswitchConfig, context: Context
 ) -> bool:
-    option_value = normalize_value(killswitch_name, raw_option_value)
-
-    for condition in option_value:
-        for field, matching_value in condition.items():
-            if matching_value is None:
-                continue
-
-            value = context.get(field)
-            if value is None:
-                break
-
-            if str(value) != matching_value:
-                break
-        else:
-            return True
-
-    return False
+    return CompiledKillswitch(killswitch_name, raw_option_value).matches(context)
 
 
 def print_conditions(killswitch_name: str, raw_option_value: LegacyKillswitchConfig) -> str:
@@ -1,8 +1,12 @@
+import threading
+from collections import OrderedDict
+
 from symbolic import SourceView
 
+from sentry.utils import metrics
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "ParsedArtifactCache", "make_source_view"]
 
 
 def is_utf8(codec):
@@ -10,6 +14,20 @@ def is_utf8(codec):
     return name in ("utf-8", "ascii")
 
 
+def make_source_view(source, encoding=None):
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    # If an encoding is provided and it's not utf-8 compatible
+    # we try to re-encoding the source and create a source view
+    # from it.
+    elif encoding is not None and not is_utf8(encoding):
+        try:
+            source = source.decode(encoding).encode("utf-8")
+        except UnicodeError:
+            pass
+    return SourceView.from_bytes(source)
+
+
 class SourceCache:
     def __init__(self):
         self._cache = {}
@@ -40,17 +58,7 @@ class SourceCache:
         url = self._get_canonical_url(url)
 
         if not isinstance(source, SourceView):
-            if isinstance(source, str):
-                source = source.encode("utf-8")
-            # If an encoding is provided and it's not utf-8 compatible
-            # we try to re-encoding the source and create a source view
-            # from it.
-            elif encoding is not None and not is_utf8(encoding):
-                try:
-                    source = source.decode(encoding).encode("utf-8")
-                except UnicodeError:
-                    pass
-            source = SourceView.from_bytes(source)
+            source = make_source_view(source, encoding)
         self._cache[url] = source
 
     def add_error(self, url, error):
@@ -90,3 +98,74 @@ class SourceMapCache:
             sourcemap = self.get(sourcemap_url)
             return (sourcemap_url, sourcemap)
         return (None, None)
+
+
+class ParsedArtifactCache:
+    """
+    A process-wide LRU of parsed source views and source map views, so that
+    artifacts used by many events are not parsed again for every event.
+
+    The cache is bounded by the approximate size of the parsed objects,
+    which is estimated from the size of the artifacts they were parsed from.
+    Parsed views are never mutated, so they can be shared between processors
+    and threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get_or_parse(self, key, size, parse_fn, max_size, kind):
+        """
+        Returns the cached view for `key`, or parses it with `parse_fn` and
+        caches it.  `size` is the approximate size of the view in bytes and
+        `max_size` the size the cache is bounded to, 0 disables it.
+        """
+        if not max_size:
+            return parse_fn()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            metrics.incr("sourcemaps.parsed_cache", tags={"kind": kind, "result": "hit"})
+            return entry[0]
+
+        metrics.incr("sourcemaps.parsed_cache", tags={"kind": kind, "result": "miss"})
+        view = parse_fn()
+
+        # Artifacts larger than the entire cache would only evict everything
+        # else without ever being hit.
+        if size > max_size:
+            return view
+
+        evicted = 0
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (view, size)
+                self._size += size
+
+            while self._size > max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                evicted += 1
+
+        if evicted:
+            metrics.incr("sourcemaps.parsed_cache.evicted", amount=evicted, tags={"kind": kind})
+
+        return view
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
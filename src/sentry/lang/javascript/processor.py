@@ -5,6 +5,8 @@ import re
 import sys
 import time
 import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from io import BytesIO
 from os.path import splitext
@@ -13,9 +15,11 @@ from urllib.parse import urlsplit
 
 import sentry_sdk
 from django.conf import settings
+from django.db import connections
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 from requests.utils import get_encoding_from_headers
+from sentry_sdk import Hub
 from symbolic import SourceMapView
 
 from sentry import http, options
@@ -30,13 +34,13 @@ from sentry.utils import json, metrics
 # database or from the internet
 from sentry.utils.cache import cache
 from sentry.utils.files import compress_file
-from sentry.utils.hashlib import md5_text
+from sentry.utils.hashlib import md5_text, sha1_text
 from sentry.utils.http import is_valid_origin
 from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import get_path
 from sentry.utils.urls import non_standard_url_join
 
-from .cache import SourceCache, SourceMapCache
+from .cache import ParsedArtifactCache, SourceCache, SourceMapCache, make_source_view
 
 __all__ = ["JavaScriptStacktraceProcessor"]
 
@@ -69,11 +73,34 @@ CACHE_CONTROL_MIN = 60
 # the maximum number of remote resources (i.e. source files) that should be
 # fetched
 MAX_RESOURCE_FETCHES = 100
+# the maximum number of resources fetched concurrently, see the
+# `processing.js-fetch-concurrency` option
+MAX_FETCH_CONCURRENCY = 8
 
 CACHE_MAX_VALUE_SIZE = settings.SENTRY_CACHE_MAX_VALUE_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Shared by all processors so that threads, and the connections they hold,
+# are reused across events.
+_fetch_thread_pool = ThreadPoolExecutor(max_workers=MAX_FETCH_CONCURRENCY)
+
+
+def _run_fetch_in_thread(hub, fetch, *args):
+    # Worker threads do not inherit the hub, so spans and errors of the
+    # fetch would otherwise not be attributed to the event being processed.
+    try:
+        with Hub(hub):
+            return fetch(*args)
+    finally:
+        # Threads of the pool outlive tasks, which usually close connections.
+        connections.close_all()
+
+
+# Parsed views of release artifacts, shared by all processors, see
+# `get_parsed_artifact`
+parsed_artifact_cache = ParsedArtifactCache()
+
 
 class UnparseableSourcemap(http.BadSource):
     error_type = EventError.JS_INVALID_SOURCEMAP
@@ -717,6 +744,35 @@ def get_max_age(headers):
     return min(max_age, CACHE_CONTROL_MAX)
 
 
+def get_parsed_artifact(kind, body, parse_fn, release=None, dist=None, extra=None):
+    """
+    Parses an artifact with `parse_fn` unless the same artifact of the same
+    release was parsed by this process before.
+
+    Artifacts are identified by the checksum of their contents, so the same
+    URL pointing to different contents never yields a stale view.
+    """
+    max_size = options.get("processing.js-parsed-artifact-cache-size")
+    # Skip hashing the body of artifacts that are not going to be cached.
+    if len(body) > max_size:
+        return parse_fn()
+
+    key = (
+        kind,
+        release.id if release else None,
+        dist.id if dist else None,
+        sha1_text(body).hexdigest(),
+        extra,
+    )
+    return parsed_artifact_cache.get_or_parse(
+        key,
+        len(body),
+        parse_fn,
+        max_size=max_size,
+        kind=kind,
+    )
+
+
 def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=True):
     if is_data_uri(url):
         try:
@@ -737,7 +793,13 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
         )
         body = result.body
     try:
-        return SourceMapView.from_json_bytes(body)
+        return get_parsed_artifact(
+            "sourcemap",
+            body,
+            lambda: SourceMapView.from_json_bytes(body),
+            release=release,
+            dist=dist,
+        )
     except Exception as exc:
         # This is in debug because the product shows an error already.
         logger.debug(str(exc), exc_info=True)
@@ -1115,79 +1177,122 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         map (if any).
         """
 
-        sourcemaps = self.sourcemaps
-        cache = self.cache
-
-        self.fetch_count += 1
-
-        if self.fetch_count > self.max_fetches:
-            cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
+        if not self._count_fetch(filename):
             return
 
         # TODO: respect cache-control/max-age headers to some extent
         logger.debug("Attempting to cache source %r", filename)
         try:
             # this both looks in the database and tries to scrape the internet
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
-            ) as span:
-                span.set_data("filename", filename)
-                result = fetch_file(
-                    filename,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
+            result = self._fetch_file(filename)
         except http.BadSource as exc:
-            # most people don't upload release artifacts for their third-party libraries,
-            # so ignore missing node_modules files
-            if exc.data["type"] == EventError.JS_MISSING_SOURCE and "node_modules" in filename:
-                pass
-            else:
-                cache.add_error(filename, exc.data)
+            self._add_fetch_file_error(filename, exc)
+            return
 
-            # either way, there's no more for us to do here, since we don't have
-            # a valid file to cache
+        sourcemap_url = self._cache_file(filename, result)
+        if sourcemap_url is None:
             return
-        cache.add(filename, result.body, result.encoding)
+
+        # pull down sourcemap
+        try:
+            sourcemap_view = self._fetch_sourcemap(sourcemap_url)
+        except http.BadSource as exc:
+            self._add_fetch_sourcemap_error(filename, exc)
+            return
+
+        self._cache_sourcemap(sourcemap_url, sourcemap_view)
+
+    def _count_fetch(self, filename):
+        """
+        Counts a fetch of the given file and returns whether it may happen.
+        """
+        self.fetch_count += 1
+
+        if self.fetch_count > self.max_fetches:
+            self.cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
+            return False
+        return True
+
+    def _fetch_file(self, filename):
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
+        ) as span:
+            span.set_data("filename", filename)
+            return fetch_file(
+                filename,
+                project=self.project,
+                release=self.release,
+                dist=self.dist,
+                allow_scraping=self.allow_scraping,
+            )
+
+    def _add_fetch_file_error(self, filename, exc):
+        # most people don't upload release artifacts for their third-party libraries,
+        # so ignore missing node_modules files
+        if exc.data["type"] == EventError.JS_MISSING_SOURCE and "node_modules" in filename:
+            pass
+        else:
+            self.cache.add_error(filename, exc.data)
+
+        # either way, there's no more for us to do here, since we don't have
+        # a valid file to cache
+
+    def _cache_file(self, filename, result):
+        """
+        Caches a fetched source file and returns the URL of its sourcemap if
+        that still needs to be fetched.
+        """
+        sourcemaps = self.sourcemaps
+        cache = self.cache
+
+        source_view = get_parsed_artifact(
+            "source",
+            result.body,
+            lambda: make_source_view(result.body, result.encoding),
+            release=self.release,
+            dist=self.dist,
+            extra=result.encoding,
+        )
+        cache.add(filename, source_view)
         cache.alias(result.url, filename)
 
         sourcemap_url = discover_sourcemap(result)
         if not sourcemap_url:
-            return
+            return None
 
         logger.debug(
             "Found sourcemap URL %r for minified script %r", sourcemap_url[:256], result.url
         )
         sourcemaps.link(filename, sourcemap_url)
         if sourcemap_url in sourcemaps:
-            return
+            return None
 
-        # pull down sourcemap
-        try:
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
-            ) as span:
-                span.set_data("sourcemap_url", sourcemap_url)
-                sourcemap_view = fetch_sourcemap(
-                    sourcemap_url,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
-        except http.BadSource as exc:
-            # we don't perform the same check here as above, because if someone has
-            # uploaded a node_modules file, which has a sourceMappingURL, they
-            # presumably would like it mapped (and would like to know why it's not
-            # working, if that's the case). If they're not looking for it to be
-            # mapped, then they shouldn't be uploading the source file in the
-            # first place.
-            cache.add_error(filename, exc.data)
-            return
+        return sourcemap_url
+
+    def _fetch_sourcemap(self, sourcemap_url):
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
+        ) as span:
+            span.set_data("sourcemap_url", sourcemap_url)
+            return fetch_sourcemap(
+                sourcemap_url,
+                project=self.project,
+                release=self.release,
+                dist=self.dist,
+                allow_scraping=self.allow_scraping,
+            )
+
+    def _add_fetch_sourcemap_error(self, filename, exc):
+        # we don't perform the same check here as above, because if someone has
+        # uploaded a node_modules file, which has a sourceMappingURL, they
+        # presumably would like it mapped (and would like to know why it's not
+        # working, if that's the case). If they're not looking for it to be
+        # mapped, then they shouldn't be uploading the source file in the
+        # first place.
+        self.cache.add_error(filename, exc.data)
 
-        sourcemaps.add(sourcemap_url, sourcemap_view)
+    def _cache_sourcemap(self, sourcemap_url, sourcemap_view):
+        self.sourcemaps.add(sourcemap_url, sourcemap_view)
 
         # cache any inlined sources
         for src_id, source_name in sourcemap_view.iter_sources():
@@ -1195,6 +1300,74 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             if source_view is not None:
                 self.cache.add(non_standard_url_join(sourcemap_url, source_name), source_view)
 
+    def cache_sources_concurrently(self, filenames, concurrency):
+        """
+        Like `cache_source` for many files, but fetches up to `concurrency`
+        source files and sourcemaps at once.
+
+        Only the fetches run in worker threads, the caches are updated on the
+        calling thread.  Sourcemaps are fetched as soon as the source file
+        referencing them has been fetched, ahead of remaining source files.
+        """
+        # queue of (filename, sourcemap_url) to fetch, sourcemap_url is None
+        # for source files
+        queue = deque((filename, None) for filename in filenames)
+        pending = {}
+        # filenames waiting for a sourcemap by its URL
+        sourcemap_filenames = {}
+        hub = Hub.current
+
+        while queue or pending:
+            while queue and len(pending) < concurrency:
+                filename, sourcemap_url = queue.popleft()
+                if sourcemap_url is not None:
+                    future = _fetch_thread_pool.submit(
+                        _run_fetch_in_thread, hub, self._fetch_sourcemap, sourcemap_url
+                    )
+                elif self._count_fetch(filename):
+                    logger.debug("Attempting to cache source %r", filename)
+                    future = _fetch_thread_pool.submit(
+                        _run_fetch_in_thread, hub, self._fetch_file, filename
+                    )
+                else:
+                    continue
+                pending[future] = (filename, sourcemap_url)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                filename, sourcemap_url = pending.pop(future)
+
+                if sourcemap_url is None:
+                    try:
+                        result = future.result()
+                    except http.BadSource as exc:
+                        self._add_fetch_file_error(filename, exc)
+                        continue
+
+                    sourcemap_url = self._cache_file(filename, result)
+                    if sourcemap_url is None:
+                        continue
+
+                    if sourcemap_url in sourcemap_filenames:
+                        sourcemap_filenames[sourcemap_url].append(filename)
+                    else:
+                        sourcemap_filenames[sourcemap_url] = [filename]
+                        queue.appendleft((filename, sourcemap_url))
+                    continue
+
+                try:
+                    sourcemap_view = future.result()
+                except http.BadSource as exc:
+                    for filename in sourcemap_filenames.pop(sourcemap_url):
+                        self._add_fetch_sourcemap_error(filename, exc)
+                    continue
+
+                del sourcemap_filenames[sourcemap_url]
+                self._cache_sourcemap(sourcemap_url, sourcemap_view)
+
     def populate_source_cache(self, frames):
         """
         Fetch all sources that we know are required (being referenced directly
@@ -1216,12 +1389,29 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
-        for idx, filename in enumerate(pending_file_list):
+        concurrency = min(options.get("processing.js-fetch-concurrency"), MAX_FETCH_CONCURRENCY)
+        concurrent = concurrency > 1 and len(pending_file_list) > 1
+
+        start = time.time()
+        if concurrent:
             with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.populate_source_cache.cache_source"
-            ) as span:
-                span.set_data("filename", filename)
-                self.cache_source(filename=filename)
+                op="JavaScriptStacktraceProcessor.populate_source_cache.cache_sources_concurrently"
+            ):
+                self.cache_sources_concurrently(pending_file_list, concurrency)
+        else:
+            for idx, filename in enumerate(pending_file_list):
+                with sentry_sdk.start_span(
+                    op="JavaScriptStacktraceProcessor.populate_source_cache.cache_source"
+                ) as span:
+                    span.set_data("filename", filename)
+                    self.cache_source(filename=filename)
+
+        metrics.timing(
+            "sourcemaps.populate_source_cache.duration",
+            time.time() - start,
+            tags={"concurrent": concurrent},
+        )
+        metrics.timing("sourcemaps.populate_source_cache.files", len(pending_file_list))
 
     def close(self):
         StacktraceProcessor.close(self)
@@ -63,6 +63,7 @@ from .integrationfeature import *  # NOQA
 from .latestappconnectbuildscheck import *  # NOQA
 from .latestreporeleaseenvironment import *  # NOQA
 from .lostpasswordhash import *  # NOQA
+from .metricskeyindexer import *  # NOQA
 from .monitor import *  # NOQA
 from .monitorcheckin import *  # NOQA
 from .monitorlocation import *  # NOQA
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
 from sentry.db.models import BoundedPositiveIntegerField, FlexibleForeignKey, Model
+from sentry.utils.cache import cache
 
 
 class GroupHash(Model):
@@ -28,3 +29,53 @@ class GroupHash(Model):
         app_label = "sentry"
         db_table = "sentry_grouphash"
         unique_together = (("project", "hash"),)
+
+    @classmethod
+    def _get_cache_key(cls, project_id, hash):
+        return f"grouphash:group:1:{project_id}:{hash}"
+
+    @classmethod
+    def get_group_ids_from_cache(cls, project_id, hashes):
+        """
+        Returns a mapping of hash to group id for the hashes whose group
+        association is cached. Hashes that are not cached are omitted.
+        """
+        cache_keys = {cls._get_cache_key(project_id, hash): hash for hash in hashes}
+        return {
+            cache_keys[cache_key]: group_id
+            for cache_key, group_id in cache.get_many(list(cache_keys)).items()
+        }
+
+    @classmethod
+    def set_group_ids_in_cache(cls, project_id, group_ids, timeout):
+        """
+        Caches the group association of hashes, `group_ids` is a mapping of
+        hash to group id.
+        """
+        cache.set_many(
+            {
+                cls._get_cache_key(project_id, hash): group_id
+                for hash, group_id in group_ids.items()
+            },
+            timeout,
+        )
+
+    @classmethod
+    def invalidate_cache(cls, project_id, hashes):
+        """
+        Must be called whenever hashes are moved between groups, detached
+        from their group or tombstoned.
+        """
+        if hashes:
+            cache.delete_many([cls._get_cache_key(project_id, hash) for hash in hashes])
+
+    @classmethod
+    def invalidate_cache_for_groups(cls, project_id, group_ids):
+        cls.invalidate_cache(
+            project_id,
+            list(
+                cls.objects.filter(project_id=project_id, group_id__in=group_ids).values_list(
+                    "hash", flat=True
+                )
+            ),
+        )
@@ -0,0 +1,17 @@
+from django.db import models
+from django.utils import timezone
+
+from sentry.db.models import BoundedBigIntegerField, Model
+
+
+class MetricsKeyIndexer(Model):
+    __include_in_export__ = False
+
+    organization_id = BoundedBigIntegerField()
+    string = models.CharField(max_length=200)
+    date_added = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        app_label = "sentry"
+        db_table = "sentry_metricskeyindexer"
+        unique_together = (("organization_id", "string"),)
@@ -135,10 +135,15 @@ class ProjectCodeOwners(DefaultFieldsModel):
         """
         Merge list of code_owners into a single code_owners object concatenating
         all the rules. We assume schema version is constant.
+
+        The merged object's `schema_version` identifies the merged schema
+        without hashing it, see `ProjectOwnership.get_schema_version`.
         """
         merged_code_owners = None
+        schema_version = []
         for code_owners in code_owners_list:
             if code_owners.schema:
+                schema_version.append((code_owners.id, code_owners.date_updated))
                 if merged_code_owners is None:
                     merged_code_owners = code_owners
                     continue
@@ -147,6 +152,8 @@ class ProjectCodeOwners(DefaultFieldsModel):
                     *code_owners.schema["rules"],
                 ]
 
+        if merged_code_owners is not None:
+            merged_code_owners.schema_version = tuple(schema_version)
         return merged_code_owners
 
     def update_schema(self):
@@ -1,4 +1,6 @@
-from typing import Any, Mapping, Optional, Sequence, Tuple, Union
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Hashable, Mapping, Optional, Sequence, Tuple, Union
 
 from django.db import models
 from django.db.models.signals import post_delete, post_save
@@ -7,12 +9,22 @@ from django.utils import timezone
 from sentry.db.models import Model, sane_repr
 from sentry.db.models.fields import FlexibleForeignKey, JSONField
 from sentry.models import ActorTuple
-from sentry.ownership.grammar import Rule, load_schema, resolve_actors
-from sentry.utils import metrics
+from sentry.ownership.grammar import CompiledRules, Rule, load_schema, resolve_actors
+from sentry.utils import json, metrics
 from sentry.utils.cache import cache
+from sentry.utils.hashlib import md5_text
+
+if TYPE_CHECKING:
+    from sentry.models import ProjectCodeOwners
 
 READ_CACHE_DURATION = 3600
 
+# Number of compiled rule sets kept per process, see `get_compiled_rules`
+COMPILED_RULES_CACHE_SIZE = 1000
+
+_compiled_rules_cache = OrderedDict()
+_compiled_rules_cache_lock = Lock()
+
 
 class ProjectOwnership(Model):
     __include_in_export__ = True
@@ -35,6 +47,11 @@ class ProjectOwnership(Model):
 
     __repr__ = sane_repr("project_id", "is_active")
 
+    def save(self, *args, **kwargs):
+        # Compiled rules are cached by `last_updated`, see `get_schema_version`
+        self.last_updated = timezone.now()
+        return super().save(*args, **kwargs)
+
     @classmethod
     def get_cache_key(self, project_id):
         return f"projectownership_project_id:1:{project_id}"
@@ -100,7 +117,9 @@ class ProjectOwnership(Model):
         codeowners = ProjectCodeOwners.get_codeowners_cached(project_id)
         ownership.schema = cls.get_combined_schema(ownership, codeowners)
 
-        rules = cls._matching_ownership_rules(ownership, project_id, data)
+        rules = cls._matching_ownership_rules(
+            ownership, project_id, data, cls.get_schema_version(ownership, codeowners)
+        )
 
         if not rules:
             return cls.Everyone if ownership.fallthrough else [], None
@@ -152,9 +171,15 @@ class ProjectOwnership(Model):
             if not ownership:
                 ownership = cls(project_id=project_id)
 
-            ownership_rules = cls._matching_ownership_rules(ownership, project_id, data)
+            ownership_rules = cls._matching_ownership_rules(
+                ownership, project_id, data, cls.get_schema_version(ownership=ownership)
+            )
             codeowners_rules = (
-                cls._matching_ownership_rules(codeowners, project_id, data) if codeowners else []
+                cls._matching_ownership_rules(
+                    codeowners, project_id, data, cls.get_schema_version(codeowners=codeowners)
+                )
+                if codeowners
+                else []
             )
 
             if not (codeowners_rules or ownership_rules):
@@ -184,17 +209,75 @@ class ProjectOwnership(Model):
                 assigned_by_codeowners,
             )
 
+    @classmethod
+    def get_schema_version(cls, ownership=None, codeowners=None) -> Optional[Hashable]:
+        """
+        Returns a cheap identifier of the schema of `ownership` combined with
+        the schema of `codeowners`, which changes whenever either of them is
+        saved. Returns `None` if there is none.
+        """
+        if ownership is not None and ownership.id is not None:
+            ownership_version = (ownership.id, ownership.last_updated)
+        else:
+            # Unsaved ownership has no schema of its own
+            ownership_version = None
+
+        if codeowners is None:
+            return ("ownership", ownership_version)
+
+        codeowners_version = getattr(codeowners, "schema_version", None)
+        if codeowners_version is None:
+            return None
+        return ("combined", ownership_version, codeowners_version)
+
+    @classmethod
+    def get_compiled_rules(
+        cls, project_id: int, schema: Mapping[str, Any], version: Optional[Hashable] = None
+    ) -> CompiledRules:
+        """
+        Process-local cached access to the compiled rules of a schema.
+
+        Loading a schema and compiling its codeowners patterns is expensive
+        for projects with many rules, while schemas rarely change. Entries
+        are keyed by `version`, see `get_schema_version`, or by the hash of
+        the schema if no version is given.
+        """
+        if version is None:
+            version = md5_text(json.dumps(schema, sort_keys=True)).hexdigest()
+        key = (project_id, version)
+
+        with _compiled_rules_cache_lock:
+            compiled = _compiled_rules_cache.get(key)
+            if compiled is not None:
+                _compiled_rules_cache.move_to_end(key)
+
+        if compiled is not None:
+            metrics.incr("projectownership.compiled_rules_cache", tags={"result": "hit"})
+            return compiled
+
+        metrics.incr("projectownership.compiled_rules_cache", tags={"result": "miss"})
+        compiled = CompiledRules(load_schema(schema))
+
+        with _compiled_rules_cache_lock:
+            _compiled_rules_cache[key] = compiled
+            _compiled_rules_cache.move_to_end(key)
+            while len(_compiled_rules_cache) > COMPILED_RULES_CACHE_SIZE:
+                _compiled_rules_cache.popitem(last=False)
+
+        return compiled
+
     @classmethod
     def _matching_ownership_rules(
-        cls, ownership: "ProjectOwnership", project_id: int, data: Mapping[str, Any]
+        cls,
+        ownership: Union["ProjectOwnership", "ProjectCodeOwners"],
+        project_id: int,
+        data: Mapping[str, Any],
+        version: Optional[Hashable] = None,
     ) -> Sequence["Rule"]:
-        rules = []
-        if ownership.schema is not None:
-            for rule in load_schema(ownership.schema):
-                if rule.test(data):
-                    rules.append(rule)
+        if ownership.schema is None:
+            return []
 
-        return rules
+        return cls.get_compiled_rules(project_id, ownership.schema, version).test(data)
 
 
 # Signals update the cached reads used in post_processing
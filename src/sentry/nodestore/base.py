@@ -1,9 +1,12 @@
-from threading import local
+import time
+from collections import OrderedDict
+from threading import Lock, local
 
 import sentry_sdk
 from django.core.cache import InvalidCacheBackendError, caches
 
-from sentry.utils import json
+from sentry import options
+from sentry.utils import json, metrics
 from sentry.utils.cache import memoize
 from sentry.utils.services import Service
 
@@ -22,6 +25,69 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json._default_decoder.decode
 
+# Seconds a payload is served from the process-local cache. This bounds how
+# long a write from another process can go unnoticed.
+LOCAL_CACHE_TTL = 60
+
+
+class LocalBytesCache:
+    """
+    A process-local LRU of raw node payloads, bounded by the total size of
+    the payloads in bytes.
+    """
+
+    def __init__(self, ttl=LOCAL_CACHE_TTL):
+        self.ttl = ttl
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, id):
+        with self._lock:
+            try:
+                expires, value = self._items[id]
+            except KeyError:
+                return None
+
+            if expires < time.time():
+                self._remove(id)
+                return None
+
+            self._items.move_to_end(id)
+            return value
+
+    def set(self, id, value, max_size):
+        with self._lock:
+            self._remove(id)
+            if len(value) > max_size:
+                return
+
+            self._items[id] = (time.time() + self.ttl, value)
+            self.size += len(value)
+            while self.size > max_size:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def delete(self, id):
+        with self._lock:
+            self._remove(id)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def _remove(self, id):
+        item = self._items.pop(id, None)
+        if item is not None:
+            self.size -= len(item[1])
+
+
+local_bytes_cache = LocalBytesCache()
+
 
 class NodeStorage(local, Service):
     """
@@ -56,6 +122,13 @@ class NodeStorage(local, Service):
 
     This is used in reprocessing to store a snapshot of the event from multiple
     stages of the pipeline.
+
+    Reads are served from up to two caches in front of the backend:
+
+    * a process-local LRU of raw payloads (``nodestore.local-cache-size``),
+    * the shared ``nodedata`` cache, holding either decoded nodes or, with
+      ``nodestore.cache-bytes``, raw payloads. Caching raw payloads allows
+      subkeys to be served from the cache as well.
     """
 
     __all__ = (
@@ -64,7 +137,9 @@ class NodeStorage(local, Service):
         "get",
         "get_multi",
         "set",
+        "set_multi",
         "set_subkeys",
+        "set_subkeys_multi",
         "cleanup",
         "validate",
         "bootstrap",
@@ -89,28 +164,33 @@ class NodeStorage(local, Service):
             self.delete(id)
 
     def _decode(self, value, subkey):
-        if value is None:
+        if not value:
             return None
 
-        lines_iter = iter(value.splitlines())
-        try:
-            if subkey is not None:
-                # Those keys should be statically known identifiers in the app, such as
-                # "unprocessed_event". There is really no reason to allow anything but
-                # ASCII here.
-                subkey = subkey.encode("ascii")
+        # Payloads are JSON-encoded with escaped newlines, so lines can be
+        # located without splitting the whole value. Only the requested line is
+        # sliced out and parsed.
+        if subkey is None:
+            return json_loads(value.partition(b"\n")[0])
 
-                next(lines_iter)
+        # Those keys should be statically known identifiers in the app, such as
+        # "unprocessed_event". There is really no reason to allow anything but
+        # ASCII here.
+        subkey = subkey.encode("ascii")
 
-                for line in lines_iter:
-                    if line.strip() == subkey:
-                        break
+        pos = value.find(b"\n")
+        while pos != -1:
+            key_end = value.find(b"\n", pos + 1)
+            if key_end == -1:
+                return None
 
-                    next(lines_iter)
+            end = value.find(b"\n", key_end + 1)
+            if value[pos + 1 : key_end].strip() == subkey:
+                return json_loads(value[key_end + 1 : end] if end != -1 else value[key_end + 1 :])
 
-            return json_loads(next(lines_iter))
-        except StopIteration:
-            return None
+            pos = end
+
+        return None
 
     def _get_bytes(self, id):
         """
@@ -126,7 +206,8 @@ class NodeStorage(local, Service):
         """
         with sentry_sdk.start_span(op="nodestore.get") as span:
             span.set_tag("node_id", id)
-            if subkey is None:
+            cache_bytes = options.get("nodestore.cache-bytes")
+            if subkey is None and not cache_bytes:
                 item_from_cache = self._get_cache_item(id)
                 if item_from_cache:
                     span.set_tag("origin", "from_cache")
@@ -134,13 +215,19 @@ class NodeStorage(local, Service):
                     return item_from_cache
 
             span.set_tag("subkey", str(subkey))
-            bytes_data = self._get_bytes(id)
+            bytes_data = self._get_cached_bytes([id]).get(id)
+            from_service = bytes_data is None
+            if from_service:
+                bytes_data = self._get_bytes(id)
+
             rv = self._decode(bytes_data, subkey=subkey)
-            if subkey is None:
-                # set cache item only after we know decoding did not fail
+            # set cache items only after we know decoding did not fail
+            if from_service and bytes_data is not None:
+                self._set_cached_bytes({id: bytes_data})
+            if subkey is None and not cache_bytes:
                 self._set_cache_item(id, rv)
 
-            span.set_tag("result", "from_service")
+            span.set_tag("result", "from_service" if from_service else "from_bytes_cache")
             if bytes_data:
                 span.set_tag("bytes.size", len(bytes_data))
             span.set_tag("found", bool(rv))
@@ -169,7 +256,8 @@ class NodeStorage(local, Service):
             span.set_tag("subkey", str(subkey))
             span.set_tag("num_ids", len(id_list))
 
-            if subkey is None:
+            cache_bytes = options.get("nodestore.cache-bytes")
+            if subkey is None and not cache_bytes:
                 cache_items = self._get_cache_items(id_list)
                 if len(cache_items) == len(id_list):
                     span.set_tag("result", "from_cache")
@@ -177,13 +265,25 @@ class NodeStorage(local, Service):
 
                 uncached_ids = [id for id in id_list if id not in cache_items]
             else:
+                cache_items = {}
                 uncached_ids = id_list
 
+            bytes_items = self._get_cached_bytes(uncached_ids)
+            if len(bytes_items) < len(uncached_ids):
+                service_items = self._get_bytes_multi(
+                    [id for id in uncached_ids if id not in bytes_items]
+                )
+            else:
+                service_items = {}
+
             items = {
                 id: self._decode(value, subkey=subkey)
-                for id, value in self._get_bytes_multi(uncached_ids).items()
+                for id, value in [*bytes_items.items(), *service_items.items()]
             }
-            if subkey is None:
+            self._set_cached_bytes(
+                {id: value for id, value in service_items.items() if value is not None}
+            )
+            if subkey is None and not cache_bytes:
                 self._set_cache_items(items)
                 items.update(cache_items)
 
@@ -244,7 +344,51 @@ class NodeStorage(local, Service):
             bytes_data = self._encode(data)
             self._set_bytes(id, bytes_data, ttl=ttl)
             # set cache only after encoding and write to nodestore has succeeded
-            self._set_cache_item(id, cache_item)
+            self._set_cached_bytes({id: bytes_data})
+            if not options.get("nodestore.cache-bytes"):
+                self._set_cache_item(id, cache_item)
+
+    def _set_bytes_multi(self, items, ttl=None):
+        """
+        >>> nodestore._set_bytes_multi({'key1': b"{'foo': 'bar'}"})
+        """
+        for id, data in items.items():
+            self._set_bytes(id, data, ttl=ttl)
+
+    def set_multi(self, items, ttl=None):
+        """
+        Set values for multiple ids at once. Like `set`, this deletes existing
+        subkeys.
+
+        >>> nodestore.set_multi({'key1': {'foo': 'bar'}, 'key2': {'foo': 'baz'}})
+        """
+        return self.set_subkeys_multi({id: {None: data} for id, data in items.items()}, ttl=ttl)
+
+    def set_subkeys_multi(self, items, ttl=None):
+        """
+        Set values and subkeys for multiple ids at once. Backends can override
+        `_set_bytes_multi` to write all nodes in one round trip.
+
+        >>> nodestore.set_subkeys_multi({
+        ...    'key1': {None: {'foo': 'bar'}, "unprocessed": {'foo': 'bam'}},
+        ...    'key2': {None: {'foo': 'baz'}},
+        ... })
+        """
+        with sentry_sdk.start_span(op="nodestore.set_subkeys_multi") as span:
+            span.set_data("num_ids", len(items))
+            cache_items = {}
+            bytes_items = {}
+            for id, data in items.items():
+                cache_item = data.get(None)
+                if cache_item:
+                    cache_items[id] = cache_item
+                bytes_items[id] = self._encode(data)
+
+            self._set_bytes_multi(bytes_items, ttl=ttl)
+            # set cache only after encoding and write to nodestore has succeeded
+            self._set_cached_bytes(bytes_items)
+            if cache_items and not options.get("nodestore.cache-bytes"):
+                self._set_cache_items(cache_items)
 
     def cleanup(self, cutoff_timestamp):
         raise NotImplementedError
@@ -252,6 +396,52 @@ class NodeStorage(local, Service):
     def bootstrap(self):
         raise NotImplementedError
 
+    def _get_bytes_cache_key(self, id):
+        return f"nodestore:bytes:{id}"
+
+    def _get_cached_bytes(self, id_list):
+        """
+        Look up raw payloads in the process-local cache, then in the shared
+        cache if it holds raw payloads. Hits from the shared cache are copied
+        into the local cache.
+        """
+        rv = {}
+
+        local_cache_size = options.get("nodestore.local-cache-size")
+        if local_cache_size:
+            for id in id_list:
+                value = local_bytes_cache.get(id)
+                if value is not None:
+                    rv[id] = value
+
+            metrics.incr("nodestore.bytes_cache.hit", amount=len(rv), tags={"tier": "local"})
+
+        if self.cache and options.get("nodestore.cache-bytes") and len(rv) < len(id_list):
+            keys = {self._get_bytes_cache_key(id): id for id in id_list if id not in rv}
+            shared = {keys[key]: value for key, value in self.cache.get_many(list(keys)).items()}
+            metrics.incr("nodestore.bytes_cache.hit", amount=len(shared), tags={"tier": "shared"})
+
+            if local_cache_size:
+                for id, value in shared.items():
+                    local_bytes_cache.set(id, value, local_cache_size)
+            rv.update(shared)
+
+        return rv
+
+    def _set_cached_bytes(self, items):
+        if not items:
+            return
+
+        local_cache_size = options.get("nodestore.local-cache-size")
+        if local_cache_size:
+            for id, value in items.items():
+                local_bytes_cache.set(id, value, local_cache_size)
+
+        if self.cache and options.get("nodestore.cache-bytes"):
+            self.cache.set_many(
+                {self._get_bytes_cache_key(id): value for id, value in items.items()}
+            )
+
     def _get_cache_item(self, id):
         if self.cache:
             return self.cache.get(id)
@@ -270,12 +460,19 @@ class NodeStorage(local, Service):
             self.cache.set_many(items)
 
     def _delete_cache_item(self, id):
+        local_bytes_cache.delete(id)
         if self.cache:
             self.cache.delete(id)
+            if options.get("nodestore.cache-bytes"):
+                self.cache.delete(self._get_bytes_cache_key(id))
 
     def _delete_cache_items(self, id_list):
+        for id in id_list:
+            local_bytes_cache.delete(id)
         if self.cache:
             self.cache.delete_many([id for id in id_list])
+            if options.get("nodestore.cache-bytes"):
+                self.cache.delete_many([self._get_bytes_cache_key(id) for id in id_list])
 
     @memoize
     def cache(self):
@@ -2,6 +2,7 @@ import logging
 import math
 import pickle
 
+from django.db import router, transaction
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
@@ -51,6 +52,20 @@ class DjangoNodeStorage(NodeStorage):
     def _set_bytes(self, id, data, ttl=None):
         create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
 
+    def _set_bytes_multi(self, items, ttl=None):
+        # Updates existing nodes and inserts the others with a fixed number of
+        # queries. A node inserted concurrently in between is kept as is.
+        now = timezone.now()
+        nodes = [Node(id=id, data=compress(data), timestamp=now) for id, data in items.items()]
+        with transaction.atomic(using=router.db_for_write(Node)):
+            existing = set(Node.objects.filter(id__in=list(items)).values_list("id", flat=True))
+            Node.objects.bulk_update(
+                [node for node in nodes if node.id in existing], ["data", "timestamp"]
+            )
+            Node.objects.bulk_create(
+                [node for node in nodes if node.id not in existing], ignore_conflicts=True
+            )
+
     def cleanup(self, cutoff_timestamp):
         from sentry.db.deletion import BulkDeleteQuery
 
@@ -280,6 +280,10 @@ register("outcomes.tsdb-in-consumer-sample-rate", default=0.0)  # unused
 # Node data save rate
 register("nodedata.cache-sample-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 register("nodedata.cache-on-save", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Byte budget of the process-local cache of raw nodestore payloads, 0 disables it
+register("nodestore.local-cache-size", default=0)
+# Store raw payloads instead of decoded nodes in the shared `nodedata` cache
+register("nodestore.cache-bytes", default=False)
 
 # Use nodestore for eventstore.get_events
 register("eventstore.use-nodestore", default=False, flags=FLAG_PRIORITIZE_DISK)
@@ -317,8 +321,16 @@ register("store.nodestore-stats-sample-rate", default=0.0)  # unused
 # Killswitch to stop storing any reprocessing payloads.
 register("store.reprocessing-force-disable", default=False)
 
+# Fetch the payloads and attachments of all events of a reprocess_group chunk
+# at once, instead of one event after another.
+register("reprocessing2.bulk-fetch-events", default=False)
+
 register("store.race-free-group-creation-force-disable", default=False)
 
+# Seconds to cache the group id of fully associated hashes in save_event, so
+# events of existing issues skip the GroupHash lookup. 0 disables the cache.
+register("store.grouphash-cache-ttl", default=0)
+
 
 # ## sentry.killswitches
 #
@@ -344,6 +356,10 @@ register("store.background-grouping-sample-rate", default=0.0)
 # True if background grouping should run before secondary and primary grouping
 register("store.background-grouping-before", default=False)
 
+# Fraction of ingest consumer batches in which events that are ready to be
+# saved are submitted as one save_event_many task per project
+register("store.save-event-many-sample-rate", default=0.0)
+
 # Store release files bundled as zip files
 register("processing.save-release-archives", default=False)  # unused
 
@@ -354,21 +370,60 @@ register("processing.release-archive-min-files", default=10)
 # Try to read release artifacts from zip archives
 register("processing.use-release-archives-sample-rate", default=0.0)  # unused
 
+# Number of source files and sourcemaps the JavaScript stacktrace processor
+# fetches concurrently per event. 1 fetches them one after another.
+register("processing.js-fetch-concurrency", default=1)
+
+# Maximum size in bytes of the source files and sourcemaps, parsed views of
+# which each JavaScript processing worker keeps in memory. 0 disables it.
+register("processing.js-parsed-artifact-cache-size", default=0)
+
 # All Relay options (statically authenticated Relays can be registered here)
 register("relay.static_auth", default={}, flags=FLAG_NOSTORE)
 
 # Write new kafka headers in eventstream
 register("eventstream:kafka-headers", default=False)
 
+# Process batches of buffer keys with one round trip per Redis host and bulk
+# updates per model instead of one key at a time
+register("buffer.process-batched", default=False)
+
+# Write buffer filters and extra values as msgpack instead of pickle. Readers
+# understand both formats.
+register("buffer.write-msgpack", default=False)
+
 # Post process forwarder options
 # Gets data from Kafka headers
 register("post-process-forwarder:kafka-headers", default=False)
 # Number of threads to use for post processing
 register("post-process-forwarder:concurrency", default=1)
 
+# Delete rows in primary key order and in sets instead of one model instance at a time,
+# for models that don't override `delete`
+register("deletions.set-based", default=False)
+
+# Export Discover queries without aggregates by paginating on timestamp and event id,
+# split into this many time range shards exported in parallel. 0 disables it.
+register("dataexport.discover-keyset-shards", default=0)
+
 # Subscription queries sampling rate
 register("subscriptions-query.sample-rate", default=0.01)
 
+# Remember the aggregates of comparison alert rules in Redis and use them as the
+# comparison value of later updates instead of querying Snuba
+register("incidents.comparison-value-cache", default=False)
+
+# Fetch the independent attributes of group serializers, such as stats and inbox details,
+# concurrently on a thread pool
+register("api.group-serializer.concurrent-attrs", default=False)
+
+# Count the events and users of every group in sliding window counters in Redis, and read
+# them in frequency conditions of intervals up to an hour instead of querying TSDB
+register("rules.frequency-counters.write", default=False)
+register("rules.frequency-counters.read", default=False)
+# Rate of counter reads that are compared with the TSDB query results
+register("rules.frequency-counters.check-rate", default=0.0)
+
 # The ratio of symbolication requests for which metrics will be submitted to redis.
 #
 # This is to allow gradual rollout of metrics collection for symbolication requests and can be
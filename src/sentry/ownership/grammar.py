@@ -1,7 +1,7 @@
 import operator
 import re
 from collections import namedtuple
-from functools import reduce
+from functools import lru_cache, reduce
 from typing import Iterable, List, Mapping, Pattern, Tuple
 
 from django.db.models import Q
@@ -13,7 +13,7 @@ from sentry.models import ActorTuple
 from sentry.utils.glob import glob_match
 from sentry.utils.safe import get_path
 
-__all__ = ("parse_rules", "dump_schema", "load_schema")
+__all__ = ("parse_rules", "dump_schema", "load_schema", "CompiledRules")
 
 VERSION = 1
 
@@ -22,6 +22,12 @@ PATH = "path"
 MODULE = "module"
 CODEOWNERS = "codeowners"
 
+# Frame attributes that path-like matchers test, in order of preference
+PATH_KEYS = ("filename", "abs_path")
+MODULE_KEYS = ("module",)
+
+CODEOWNERS_REGEX_CACHE_SIZE = 10000
+
 # Grammar is defined in EBNF syntax.
 ownership_grammar = Grammar(
     fr"""
@@ -102,9 +108,9 @@ class Matcher(namedtuple("Matcher", "type pattern")):
         if self.type == URL:
             return self.test_url(data)
         elif self.type == PATH:
-            return self.test_frames(data, ["filename", "abs_path"])
+            return self.test_frames(data, PATH_KEYS)
         elif self.type == MODULE:
-            return self.test_frames(data, ["module"])
+            return self.test_frames(data, MODULE_KEYS)
         elif self.type.startswith("tags."):
             return self.test_tag(data)
         elif self.type == CODEOWNERS:
@@ -119,12 +125,10 @@ class Matcher(namedtuple("Matcher", "type pattern")):
         return url and glob_match(url, self.pattern, ignorecase=True)
 
     def test_frames(self, data, keys):
-        for frame in _iter_frames(data):
-            value = next((frame.get(key) for key in keys if frame.get(key)), None)
-
-            if not value:
-                continue
+        return self.test_frame_values(_get_frame_values(data, keys))
 
+    def test_frame_values(self, values):
+        for value in values:
             if glob_match(value, self.pattern, ignorecase=True, path_normalize=True):
                 return True
 
@@ -144,14 +148,12 @@ class Matcher(namedtuple("Matcher", "type pattern")):
         See syntax documentation here:
         https://docs.github.com/en/github/creating-cloning-and-archiving-repositories/creating-a-repository-on-github/about-code-owners
         """
-        spec = _path_to_regex(self.pattern)
-        keys = ["filename", "abs_path"]
-        for frame in _iter_frames(data):
-            value = next((frame.get(key) for key in keys if frame.get(key)), None)
-
-            if not value:
-                continue
+        return self.test_codeowners_values(_get_frame_values(data, PATH_KEYS))
 
+    def test_codeowners_values(self, values, spec=None):
+        if spec is None:
+            spec = _path_to_regex(self.pattern)
+        for value in values:
             if spec.search(value):
                 return True
 
@@ -233,6 +235,7 @@ class OwnershipVisitor(NodeVisitor):
         return children or node
 
 
+@lru_cache(maxsize=CODEOWNERS_REGEX_CACHE_SIZE)
 def _path_to_regex(pattern: str) -> Pattern[str]:
     """
     ported from https://github.com/hmarr/codeowners/blob/d0452091447bd2a29ee508eebc5a79874fb5d4ff/match.go#L33
@@ -339,6 +342,68 @@ def _iter_frames(data):
             continue
 
 
+def _get_frame_values(data, keys):
+    """
+    Returns the distinct values of the first present key of every frame,
+    in order of appearance.
+    """
+    return _collect_frame_values(data, {tuple(keys)})[tuple(keys)]
+
+
+def _collect_frame_values(data, keysets):
+    """
+    Collects the values of `_get_frame_values` for several sets of keys
+    in a single pass over the frames of an event.
+    """
+    rv = {keys: {} for keys in keysets}
+    for frame in _iter_frames(data):
+        for keys, values in rv.items():
+            value = next((frame.get(key) for key in keys if frame.get(key)), None)
+            if value:
+                values[value] = None
+
+    return {keys: list(values) for keys, values in rv.items()}
+
+
+class CompiledRules:
+    """
+    A list of Rules prepared to be tested against many events.
+
+    The frames of an event are only walked once and distinct frame values
+    are only tested once per rule, regardless of the number of rules.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._specs = [
+            _path_to_regex(rule.matcher.pattern) if rule.matcher.type == CODEOWNERS else None
+            for rule in rules
+        ]
+
+    def test(self, data):
+        """Returns the rules matching the event data, in order."""
+        frame_values = _collect_frame_values(data, {PATH_KEYS, MODULE_KEYS})
+        path_values = frame_values[PATH_KEYS]
+        module_values = frame_values[MODULE_KEYS]
+
+        rv = []
+        for rule, spec in zip(self.rules, self._specs):
+            matcher = rule.matcher
+            if matcher.type == PATH:
+                matched = matcher.test_frame_values(path_values)
+            elif matcher.type == MODULE:
+                matched = matcher.test_frame_values(module_values)
+            elif matcher.type == CODEOWNERS:
+                matched = matcher.test_codeowners_values(path_values, spec)
+            else:
+                matched = matcher.test(data)
+
+            if matched:
+                rv.append(rule)
+
+        return rv
+
+
 def parse_rules(data):
     """Convert a raw text input into a Rule tree"""
     tree = ownership_grammar.parse(data)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pytz import utc
 from sentry_sdk import Hub
@@ -18,6 +18,7 @@ from sentry.ingest.inbound_filters import (
 from sentry.interfaces.security import DEFAULT_DISALLOWED_SOURCES
 from sentry.models import Project, ProjectKeyStatus
 from sentry.relay.utils import to_camel_case_name
+from sentry.utils.cache import memoize
 from sentry.utils.http import get_origins
 from sentry.utils.sdk import configure_scope
 
@@ -27,12 +28,45 @@ EXPOSABLE_FEATURES = [
 ]
 
 
-def get_exposed_features(project: Project) -> List[str]:
+class OrganizationConfigContext:
+    """
+    The organization-level parts of project configs. When configs are built
+    for many projects of an organization, sharing one context computes these
+    only once.
+    """
+
+    def __init__(self, organization):
+        self.organization = organization
+        self._features = {}
+
+    def has_feature(self, feature: str) -> bool:
+        try:
+            return self._features[feature]
+        except KeyError:
+            rv = self._features[feature] = features.has(feature, self.organization)
+            return rv
+
+    @memoize
+    def trusted_relays(self):
+        return [
+            r["public_key"] for r in self.organization.get_option("sentry:trusted-relays", []) if r
+        ]
+
+    @memoize
+    def event_retention(self):
+        return quotas.get_event_retention(self.organization)
+
+
+def get_exposed_features(
+    project: Project, organization_context: Optional[OrganizationConfigContext] = None
+) -> List[str]:
+    if organization_context is None:
+        organization_context = OrganizationConfigContext(project.organization)
 
     active_features = []
     for feature in EXPOSABLE_FEATURES:
         if feature.startswith("organizations:"):
-            if features.has(feature, project.organization):
+            if organization_context.has_feature(feature):
                 active_features.append(feature)
 
         elif feature.startswith("projects:"):
@@ -105,7 +139,7 @@ def get_quotas(project, keys=None):
     return [quota.to_json() for quota in quotas.get_quotas(project, keys=keys)]
 
 
-def get_project_config(project, full_config=True, project_keys=None):
+def get_project_config(project, full_config=True, project_keys=None, organization_context=None):
     """
     Constructs the ProjectConfig information.
 
@@ -119,6 +153,8 @@ def get_project_config(project, full_config=True, project_keys=None):
         no project keys are provided it is assumed that the config does not
         need to contain auth information (this is the case when used in
         python's StoreView)
+    :param organization_context: An ``OrganizationConfigContext`` to share
+        organization-level lookups between the configs of multiple projects.
 
     :return: a ProjectConfig object for the given project
     """
@@ -128,6 +164,9 @@ def get_project_config(project, full_config=True, project_keys=None):
     if project.status != ObjectStatus.VISIBLE:
         return ProjectConfig(project, disabled=True)
 
+    if organization_context is None:
+        organization_context = OrganizationConfigContext(project.organization)
+
     public_keys = get_public_key_configs(project, full_config, project_keys=project_keys)
 
     with Hub.current.start_span(op="get_public_config"):
@@ -141,22 +180,15 @@ def get_project_config(project, full_config=True, project_keys=None):
             "publicKeys": public_keys,
             "config": {
                 "allowedDomains": list(get_origins(project)),
-                "trustedRelays": [
-                    r["public_key"]
-                    for r in project.organization.get_option("sentry:trusted-relays", [])
-                    if r
-                ],
+                "trustedRelays": organization_context.trusted_relays,
                 "piiConfig": get_pii_config(project),
                 "datascrubbingSettings": get_datascrubbing_settings(project),
-                "features": get_exposed_features(project),
+                "features": get_exposed_features(project, organization_context),
             },
             "organizationId": project.organization_id,
             "projectId": project.id,  # XXX: Unused by Relay, required by Python store
         }
-    allow_dynamic_sampling = features.has(
-        "organizations:filters-and-sampling",
-        project.organization,
-    )
+    allow_dynamic_sampling = organization_context.has_feature("organizations:filters-and-sampling")
     if allow_dynamic_sampling:
         dynamic_sampling = project.get_option("sentry:dynamic_sampling")
         if dynamic_sampling is not None:
@@ -166,22 +198,50 @@ def get_project_config(project, full_config=True, project_keys=None):
         # This is all we need for external Relay processors
         return ProjectConfig(project, **cfg)
 
-    if features.has("organizations:performance-ops-breakdown", project.organization):
+    if organization_context.has_feature("organizations:performance-ops-breakdown"):
         cfg["config"]["breakdownsV2"] = project.get_option("sentry:breakdowns")
-    if features.has("organizations:performance-suspect-spans-ingestion", project.organization):
+    if organization_context.has_feature("organizations:performance-suspect-spans-ingestion"):
         cfg["config"]["spanAttributes"] = project.get_option("sentry:span_attributes")
     with Hub.current.start_span(op="get_filter_settings"):
         cfg["config"]["filterSettings"] = get_filter_settings(project)
     with Hub.current.start_span(op="get_grouping_config_dict_for_project"):
         cfg["config"]["groupingConfig"] = get_grouping_config_dict_for_project(project)
     with Hub.current.start_span(op="get_event_retention"):
-        cfg["config"]["eventRetention"] = quotas.get_event_retention(project.organization)
+        cfg["config"]["eventRetention"] = organization_context.event_retention
     with Hub.current.start_span(op="get_all_quotas"):
         cfg["config"]["quotas"] = get_quotas(project, keys=project_keys)
 
     return ProjectConfig(project, **cfg)
 
 
+def get_project_config_for_key(project, project_config, project_key):
+    """
+    Derives the config of a single project key from a config of its project
+    that was built with all project keys. The result is equivalent to
+    ``get_project_config(project, project_keys=[project_key])``, but only the
+    key-specific parts are computed.
+
+    :param project: The project of the key.
+    :param project_config: The ProjectConfig of ``project``.
+    :param project_key: The key to derive the config for.
+
+    :return: a ProjectConfig object for the given project key
+    """
+    cfg = project_config.to_dict()
+    if cfg.get("disabled"):
+        return ProjectConfig(project, **cfg)
+
+    cfg["publicKeys"] = [
+        key for key in cfg["publicKeys"] if key["publicKey"] == project_key.public_key
+    ]
+    if "quotas" in cfg["config"]:
+        cfg["config"] = dict(cfg["config"])
+        with Hub.current.start_span(op="get_all_quotas"):
+            cfg["config"]["quotas"] = get_quotas(project, keys=[project_key])
+
+    return ProjectConfig(project, **cfg)
+
+
 class _ConfigBase:
     """
     Base class for configuration objects
@@ -2,12 +2,16 @@ from sentry.utils.services import Service
 
 
 class ProjectConfigCache(Service):
-    __all__ = ("set_many", "delete_many", "get")
+    __all__ = ("set_many", "delete_many", "get", "get_many")
 
     def __init__(self, **options):
         pass
 
-    def set_many(self, configs):
+    def set_many(self, configs, unchanged_keys=()):
+        """
+        Caches the given configs. The configs of ``unchanged_keys`` are kept
+        as they are, but expire as if they had been written again.
+        """
         pass
 
     def delete_many(self, project_ids):
@@ -15,3 +19,9 @@ class ProjectConfigCache(Service):
 
     def get(self, project_id):
         raise NotImplementedError()
+
+    def get_many(self, project_ids):
+        """
+        Returns a mapping of key to config for all keys that are cached.
+        """
+        return {}
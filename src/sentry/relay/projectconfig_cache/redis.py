@@ -24,17 +24,24 @@ class RedisProjectConfigCache(ProjectConfigCache):
         else:
             return self.cluster.get_local_client_for_key(routing_key)
 
-    def set_many(self, configs):
-        for project_id, config in configs.items():
-            # XXX(markus): Figure out how to do pipelining here. We may have
-            # multiple routing keys (-> multiple clients).
-            #
-            # We cannot route by org, because Relay does not know the org when
-            # fetching.
+    def set_many(self, configs, unchanged_keys=()):
+        # Keys may have multiple routing keys, which the cluster pipeline and
+        # the rb mapping client both take care of.
+        def write(client):
+            for project_id, config in configs.items():
+                client.setex(
+                    self.__get_redis_key(project_id), REDIS_CACHE_TIMEOUT, json.dumps(config)
+                )
+            for project_id in unchanged_keys:
+                client.expire(self.__get_redis_key(project_id), REDIS_CACHE_TIMEOUT)
 
-            key = self.__get_redis_key(project_id)
-            client = self.__get_redis_client(key)
-            client.setex(key, REDIS_CACHE_TIMEOUT, json.dumps(config))
+        if self.is_redis_cluster:
+            with self.cluster.pipeline(transaction=False) as pipe:
+                write(pipe)
+                pipe.execute()
+        else:
+            with self.cluster.map() as client:
+                write(client)
 
     def delete_many(self, project_ids):
         for project_id in project_ids:
@@ -55,3 +62,22 @@ class RedisProjectConfigCache(ProjectConfigCache):
         if rv is not None:
             return json.loads(rv)
         return None
+
+    def get_many(self, project_ids):
+        project_ids = list(project_ids)
+        keys = [self.__get_redis_key(project_id) for project_id in project_ids]
+        if self.is_redis_cluster:
+            with self.cluster.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(key)
+                values = pipe.execute()
+        else:
+            with self.cluster.map() as client:
+                promises = [client.get(key) for key in keys]
+            values = [promise.value for promise in promises]
+
+        return {
+            project_id: json.loads(value)
+            for project_id, value in zip(project_ids, values)
+            if value is not None
+        }
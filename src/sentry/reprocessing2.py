@@ -79,6 +79,7 @@ instead of group deletion is:
 
 import hashlib
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Dict, List, Union
 
@@ -161,6 +162,24 @@ def save_unprocessed_event(project, event_id):
         nodestore.set(node_id, data)
 
 
+def save_unprocessed_event_many(events):
+    """
+    Batch version of `save_unprocessed_event`. Takes a mapping of
+    `(project_id, event_id)` to the unprocessed payload already read from
+    event_processing_store and writes all of them to nodestore at once.
+    """
+    items = {
+        _generate_unprocessed_event_node_id(project_id=project_id, event_id=event_id): data
+        for (project_id, event_id), data in events.items()
+        if data is not None
+    }
+    if not items:
+        return
+
+    with sentry_sdk.start_span(op="sentry.reprocessing2.save_unprocessed_event_many.set_nodestore"):
+        nodestore.set_multi(items)
+
+
 def backup_unprocessed_event(project, data):
     """
     Backup unprocessed event payload into redis. Only call if event should be
@@ -214,6 +233,93 @@ def pull_event_data(project_id, event_id) -> ReprocessableEvent:
     return ReprocessableEvent(event=event, data=data, attachments=attachments)
 
 
+def pull_event_data_many(
+    project_id, events
+) -> Dict[str, Union[ReprocessableEvent, CannotReprocess]]:
+    """
+    Batch version of `pull_event_data` for events that were already fetched
+    from eventstore, such as a chunk of `reprocess_group`. The unprocessed
+    payloads and the attachments of all events are fetched at once.
+
+    Returns a mapping of event ID to either the `ReprocessableEvent` or the
+    `CannotReprocess` error of every event.
+    """
+    from sentry.lang.native.processing import get_required_attachment_types
+
+    with sentry_sdk.start_span(op="reprocess_events.nodestore.get_multi"):
+        node_ids = {
+            Event.generate_node_id(project_id, event.event_id): event.event_id for event in events
+        }
+        payloads = {
+            node_ids[node_id]: data
+            for node_id, data in nodestore.get_multi(list(node_ids), subkey="unprocessed").items()
+            if data is not None
+        }
+
+        node_ids = {
+            _generate_unprocessed_event_node_id(
+                project_id=project_id, event_id=event.event_id
+            ): event.event_id
+            for event in events
+            if event.event_id not in payloads
+        }
+        if node_ids:
+            payloads.update(
+                (node_ids[node_id], data)
+                for node_id, data in nodestore.get_multi(list(node_ids)).items()
+                if data is not None
+            )
+
+    required_attachment_types = {
+        event_id: get_required_attachment_types(data) for event_id, data in payloads.items()
+    }
+    attachments = defaultdict(list)
+    event_ids = [event_id for event_id, types in required_attachment_types.items() if types]
+    if event_ids:
+        for attachment in models.EventAttachment.objects.filter(
+            project_id=project_id,
+            event_id__in=event_ids,
+            type__in=list(set().union(*required_attachment_types.values())),
+        ):
+            if attachment.type in required_attachment_types[attachment.event_id]:
+                attachments[attachment.event_id].append(attachment)
+
+    rv: Dict[str, Union[ReprocessableEvent, CannotReprocess]] = {}
+    for event in events:
+        data = payloads.get(event.event_id)
+        if data is None:
+            rv[event.event_id] = CannotReprocess("unprocessed_event.not_found")
+            continue
+
+        event_attachments = attachments.get(event.event_id, [])
+        missing_attachment_types = required_attachment_types[event.event_id] - {
+            ea.type for ea in event_attachments
+        }
+        if missing_attachment_types:
+            rv[event.event_id] = CannotReprocess("attachment.not_found")
+            continue
+
+        rv[event.event_id] = ReprocessableEvent(
+            event=event, data=data, attachments=event_attachments
+        )
+
+    return rv
+
+
+def _prepare_event_data(reprocessable_event):
+    """
+    Fix up the event payload for reprocessing before it is put in
+    event_processing_store.
+    """
+    data = reprocessable_event.data
+    event = reprocessable_event.event
+    set_path(data, "contexts", "reprocessing", "original_issue_id", value=event.group_id)
+    set_path(
+        data, "contexts", "reprocessing", "original_primary_hash", value=event.get_primary_hash()
+    )
+    return data
+
+
 def reprocess_event(project_id, event_id, start_time):
 
     from sentry.ingest.ingest_consumer import CACHE_TIMEOUT
@@ -221,24 +327,88 @@ def reprocess_event(project_id, event_id, start_time):
 
     reprocessable_event = pull_event_data(project_id, event_id)
 
-    data = reprocessable_event.data
-    event = reprocessable_event.event
     attachments = reprocessable_event.attachments
 
     # Step 1: Fix up the event payload for reprocessing and put it in event
     # cache/event_processing_store
-    set_path(data, "contexts", "reprocessing", "original_issue_id", value=event.group_id)
-    set_path(
-        data, "contexts", "reprocessing", "original_primary_hash", value=event.get_primary_hash()
-    )
+    data = _prepare_event_data(reprocessable_event)
     cache_key = event_processing_store.store(data)
 
     # Step 2: Copy attachments into attachment cache. Note that we can only
     # consider minidumps because filestore just stays as-is after reprocessing
     # (we simply update group_id on the EventAttachment models in post_process)
-    attachment_objects = []
-
     files = {f.id: f for f in models.File.objects.filter(id__in=[ea.file_id for ea in attachments])}
+    _copy_attachments_into_cache(attachments, files, cache_key, CACHE_TIMEOUT)
+
+    preprocess_event_from_reprocessing(
+        cache_key=cache_key,
+        start_time=start_time,
+        event_id=event_id,
+        data=data,
+    )
+
+
+def reprocess_events(project_id, events, start_time) -> Dict[str, Exception]:
+    """
+    Batch version of `reprocess_event` for events that were already fetched
+    from eventstore. Payloads, attachments and files of all events are
+    fetched at once and all payloads are put in event_processing_store with
+    a single write, before the events are passed to preprocess_event one by
+    one.
+
+    Returns a mapping of event ID to the error of every event that could not
+    be reprocessed.
+    """
+    from sentry.ingest.ingest_consumer import CACHE_TIMEOUT
+    from sentry.tasks.store import preprocess_event_from_reprocessing
+
+    errors: Dict[str, Exception] = {}
+    reprocessable_events: List[ReprocessableEvent] = []
+    for event_id, result in pull_event_data_many(project_id, events).items():
+        if isinstance(result, CannotReprocess):
+            errors[event_id] = result
+        else:
+            reprocessable_events.append(result)
+
+    if not reprocessable_events:
+        return errors
+
+    cache_keys = event_processing_store.store_many(
+        [_prepare_event_data(reprocessable_event) for reprocessable_event in reprocessable_events]
+    )
+
+    files = {
+        f.id: f
+        for f in models.File.objects.filter(
+            id__in=[
+                ea.file_id
+                for reprocessable_event in reprocessable_events
+                for ea in reprocessable_event.attachments
+            ]
+        )
+    }
+
+    for reprocessable_event, cache_key in zip(reprocessable_events, cache_keys):
+        event_id = reprocessable_event.event.event_id
+        with sentry_sdk.start_span(op="reprocess_event"):
+            try:
+                _copy_attachments_into_cache(
+                    reprocessable_event.attachments, files, cache_key, CACHE_TIMEOUT
+                )
+                preprocess_event_from_reprocessing(
+                    cache_key=cache_key,
+                    start_time=start_time,
+                    event_id=event_id,
+                    data=reprocessable_event.data,
+                )
+            except Exception as e:
+                errors[event_id] = e
+
+    return errors
+
+
+def _copy_attachments_into_cache(attachments, files, cache_key, cache_timeout):
+    attachment_objects = []
 
     for attachment_id, attachment in enumerate(attachments):
         with sentry_sdk.start_span(op="reprocess_event._copy_attachment_into_cache") as span:
@@ -249,20 +419,13 @@ def reprocess_event(project_id, event_id, start_time):
                     attachment=attachment,
                     file=files[attachment.file_id],
                     cache_key=cache_key,
-                    cache_timeout=CACHE_TIMEOUT,
+                    cache_timeout=cache_timeout,
                 )
             )
 
     if attachment_objects:
         with sentry_sdk.start_span(op="reprocess_event.set_attachment_meta"):
-            attachment_cache.set(cache_key, attachments=attachment_objects, timeout=CACHE_TIMEOUT)
-
-    preprocess_event_from_reprocessing(
-        cache_key=cache_key,
-        start_time=start_time,
-        event_id=event_id,
-        data=data,
-    )
+            attachment_cache.set(cache_key, attachments=attachment_objects, timeout=cache_timeout)
 
 
 def delete_old_primary_hash(event):
@@ -415,6 +578,10 @@ def start_group_reprocessing(
         for model in GROUP_MODELS_TO_MIGRATE:
             model.objects.filter(group_id=group_id).update(group_id=new_group.id)
 
+    # The hashes now point to the new group, events must not end up in the
+    # cached old one.
+    models.GroupHash.invalidate_cache_for_groups(project_id, [new_group.id])
+
     # Get event counts of issue (for all environments etc). This was copypasted
     # and simplified from groupserializer.
     event_count = snuba.aliased_query(
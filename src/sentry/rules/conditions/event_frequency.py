@@ -1,4 +1,5 @@
 import logging
+import random
 import re
 from datetime import timedelta
 
@@ -6,8 +7,9 @@ from django import forms
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import tsdb
+from sentry import options, tsdb
 from sentry.receivers.rules import DEFAULT_RULE_LABEL
+from sentry.rules import counters
 from sentry.rules.conditions.base import EventCondition
 from sentry.utils import metrics
 from sentry.utils.snuba import Dataset, options_override, raw_query
@@ -77,13 +79,28 @@ class EventFrequencyForm(forms.Form):
             return
 
 
+class FrequencyQueryCache:
+    """
+    Results of the queries of all frequency conditions evaluated for one
+    event. Intervals of all conditions end at the same time, so rules with
+    the same interval and environment share their queries.
+    """
+
+    def __init__(self):
+        self.now = timezone.now()
+        self.results = {}
+
+
 class BaseEventFrequencyCondition(EventCondition):
     intervals = standard_intervals
     form_cls = EventFrequencyForm
     label = NotImplemented  # subclass must implement
+    #: The type of the sliding window counters of the group to read, if any
+    counter_type = None
 
     def __init__(self, *args, **kwargs):
         self.tsdb = kwargs.pop("tsdb", tsdb)
+        self.query_cache = kwargs.pop("query_cache", None)
         self.form_fields = {
             "value": {"type": "number", "placeholder": 100},
             "interval": {
@@ -114,23 +131,56 @@ class BaseEventFrequencyCondition(EventCondition):
         return current_value > value
 
     def query(self, event, start, end, environment_id):
-        query_result = self.query_hook(event, start, end, environment_id)
-        metrics.incr(
-            "rules.conditions.queried_snuba",
-            tags={
-                "condition": re.sub("(?!^)([A-Z]+)", r"_\1", self.__class__.__name__).lower(),
-                "is_created_on_project_creation": self.is_guessed_to_be_created_on_project_creation,
-            },
-        )
+        if self.query_cache is not None:
+            cache_key = (self.id, start, end, environment_id)
+            if cache_key in self.query_cache.results:
+                return self.query_cache.results[cache_key]
+
+        query_result = self.query_counter(event, start, end, environment_id)
+        if query_result is None:
+            query_result = self.query_hook(event, start, end, environment_id)
+            metrics.incr(
+                "rules.conditions.queried_snuba",
+                tags={
+                    "condition": re.sub("(?!^)([A-Z]+)", r"_\1", self.__class__.__name__).lower(),
+                    "is_created_on_project_creation": self.is_guessed_to_be_created_on_project_creation,
+                },
+            )
+
+        if self.query_cache is not None:
+            self.query_cache.results[cache_key] = query_result
         return query_result
 
+    def query_counter(self, event, start, end, environment_id):
+        """
+        Reads the result from the sliding window counters of the group, if
+        the condition has a counter and it covers the interval.
+        """
+        if self.counter_type is None:
+            return None
+
+        result = counters.get_window_count(
+            self.counter_type, event.group_id, environment_id, start, end
+        )
+        if result is not None and random.random() < options.get(
+            "rules.frequency-counters.check-rate"
+        ):
+            # Track how far the counters drift from the actual numbers
+            expected = self.query_hook(event, start, end, environment_id)
+            metrics.timing(
+                "rules.frequency_counters.drift",
+                abs(result - expected),
+                tags={"counter_type": self.counter_type},
+            )
+        return result
+
     def query_hook(self, event, start, end, environment_id):
         """ """
         raise NotImplementedError  # subclass must implement
 
     def get_rate(self, event, interval, environment_id):
         _, duration = self.intervals[interval]
-        end = timezone.now()
+        end = self.query_cache.now if self.query_cache is not None else timezone.now()
         result = self.query(event, end - duration, end, environment_id=environment_id)
         comparison_type = self.get_option("comparisonType", COMPARISON_TYPE_COUNT)
         if comparison_type == COMPARISON_TYPE_PERCENT:
@@ -164,6 +214,7 @@ class BaseEventFrequencyCondition(EventCondition):
 
 class EventFrequencyCondition(BaseEventFrequencyCondition):
     label = "The issue is seen more than {value} times in {interval}"
+    counter_type = counters.COUNTER_TYPE_EVENTS
 
     def query_hook(self, event, start, end, environment_id):
         return self.tsdb.get_sums(
@@ -178,6 +229,7 @@ class EventFrequencyCondition(BaseEventFrequencyCondition):
 
 class EventUniqueUserFrequencyCondition(BaseEventFrequencyCondition):
     label = "The issue is seen by more than {value} users in {interval}"
+    counter_type = counters.COUNTER_TYPE_USERS
 
     def query_hook(self, event, start, end, environment_id):
         return self.tsdb.get_distinct_counts_totals(
@@ -0,0 +1,147 @@
+"""
+Sliding window counters of the events and users of every group, used by
+frequency conditions to avoid querying TSDB for short intervals.
+
+Events are counted per group, environment and minute, users are counted
+with a HyperLogLog per group, environment and minute. Every group also has
+a counter for all environments combined. All keys of a group share a hash
+tag, so a window of up to an hour is read with a single command.
+
+Counters are only read for windows that start after the group's first
+recorded event, as anything before that was never counted.
+"""
+
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from django.conf import settings
+
+from sentry import options
+from sentry.utils import metrics, redis
+from sentry.utils.dates import to_timestamp
+
+#: Size of the buckets of all counters
+BUCKET_SIZE = 60
+
+#: Longest window that can be read from the counters
+MAX_WINDOW = timedelta(hours=1)
+
+#: Seconds the counters of a bucket are kept for
+COUNTER_TTL = int(MAX_WINDOW.total_seconds()) + 2 * BUCKET_SIZE
+
+COUNTER_TYPE_EVENTS = "events"
+COUNTER_TYPE_USERS = "users"
+
+
+def get_redis_client():
+    return redis.redis_clusters.get(settings.SENTRY_RULE_FREQUENCY_COUNTERS_REDIS_CLUSTER)
+
+
+def _get_key(group_id: int, suffix: str) -> str:
+    return f"r.fc:{{{group_id}}}:{suffix}"
+
+
+def _get_counter_key(
+    counter_type: str, group_id: int, environment_id: Optional[int], bucket: int
+) -> str:
+    return _get_key(group_id, f"{counter_type}:{environment_id or ''}:{bucket}")
+
+
+def _get_since_key(group_id: int) -> str:
+    return _get_key(group_id, "since")
+
+
+def _get_bucket(timestamp: float) -> int:
+    return int(timestamp // BUCKET_SIZE)
+
+
+def record_events(events: Iterable[Mapping[str, Any]]) -> None:
+    """
+    Counts events in the counters of their groups.
+
+    :param events: Mappings with the ``group_id``, ``environment_id``,
+        POSIX ``timestamp`` and an optional ``user`` identifier of each event.
+    """
+    if not options.get("rules.frequency-counters.write"):
+        return
+
+    now = time.time()
+    min_timestamp = now - COUNTER_TTL
+    client = get_redis_client()
+    pipeline = client.pipeline(transaction=False)
+    recorded = 0
+    for event in events:
+        # Events are often received and saved late, but those that are too
+        # old to be ever read are skipped.
+        if event["timestamp"] < min_timestamp:
+            continue
+
+        group_id = event["group_id"]
+        bucket = _get_bucket(event["timestamp"])
+        for environment_id in {None, event["environment_id"]}:
+            key = _get_counter_key(COUNTER_TYPE_EVENTS, group_id, environment_id, bucket)
+            pipeline.incr(key)
+            pipeline.expire(key, COUNTER_TTL)
+
+            if event.get("user"):
+                key = _get_counter_key(COUNTER_TYPE_USERS, group_id, environment_id, bucket)
+                pipeline.pfadd(key, event["user"])
+                pipeline.expire(key, COUNTER_TTL)
+
+        # The counters of the group are complete from this point in time
+        # for as long as the group keeps receiving events.
+        key = _get_since_key(group_id)
+        pipeline.set(key, int(now), nx=True)
+        pipeline.expire(key, COUNTER_TTL)
+        recorded += 1
+
+    if recorded:
+        pipeline.execute()
+    metrics.incr("rules.frequency_counters.recorded", amount=recorded)
+
+
+def get_window_count(
+    counter_type: str,
+    group_id: int,
+    environment_id: Optional[int],
+    start: datetime,
+    end: datetime,
+) -> Optional[int]:
+    """
+    Returns the number of events or users of a group between ``start`` and
+    ``end``, or ``None`` if the window can't be read from the counters.
+
+    Windows are aligned to whole buckets: the bucket containing ``start`` is
+    excluded and the bucket containing ``end`` is included.
+    """
+    if not options.get("rules.frequency-counters.read") or end - start > MAX_WINDOW:
+        return None
+
+    start_timestamp = to_timestamp(start)
+    end_timestamp = to_timestamp(end)
+    # Counters of older buckets might have expired already
+    if start_timestamp < time.time() - COUNTER_TTL + BUCKET_SIZE:
+        return None
+
+    client = get_redis_client()
+    since = client.get(_get_since_key(group_id))
+    if since is None or int(since) > math.floor(start_timestamp):
+        metrics.incr("rules.frequency_counters.read", tags={"result": "incomplete"})
+        return None
+
+    keys: Sequence[str] = [
+        _get_counter_key(counter_type, group_id, environment_id, bucket)
+        for bucket in range(_get_bucket(start_timestamp) + 1, _get_bucket(end_timestamp) + 1)
+    ]
+    if not keys:
+        return 0
+
+    if counter_type == COUNTER_TYPE_USERS:
+        count = client.pfcount(*keys)
+    else:
+        count = sum(int(value) for value in client.mget(keys) if value is not None)
+
+    metrics.incr("rules.frequency_counters.read", tags={"result": "hit"})
+    return count
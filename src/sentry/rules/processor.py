@@ -10,6 +10,10 @@ from django.utils import timezone
 from sentry import analytics
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, rules
+from sentry.rules.conditions.event_frequency import (
+    BaseEventFrequencyCondition,
+    FrequencyQueryCache,
+)
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
@@ -30,6 +34,7 @@ class RuleProcessor:
         self.has_reappeared = has_reappeared
 
         self.grouped_futures = {}
+        self.frequency_query_cache = FrequencyQueryCache()
 
     def get_rules(self):
         """
@@ -106,7 +111,11 @@ class RuleProcessor:
             self.logger.warning("Unregistered condition %r", condition["id"])
             return
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
+        kwargs = {}
+        if issubclass(condition_cls, BaseEventFrequencyCondition):
+            kwargs["query_cache"] = self.frequency_query_cache
+
+        condition_inst = condition_cls(self.project, data=condition, rule=rule, **kwargs)
         return safe_execute(condition_inst.passes, self.event, state, _with_transaction=False)
 
     def get_rule_type(self, condition):
@@ -243,6 +252,7 @@ class RuleProcessor:
             return {}.values()
 
         self.grouped_futures.clear()
+        self.frequency_query_cache = FrequencyQueryCache()
         rules = self.get_rules()
         rule_statuses = self.bulk_get_rule_status(rules)
         for rule in rules:
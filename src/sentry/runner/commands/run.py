@@ -365,17 +365,36 @@ def post_process_forwarder(**options):
     type=click.Choice(["earliest", "latest"]),
     help="Force subscriptions to start from a particular offset",
 )
+@click.option(
+    "--max-batch-size",
+    default=None,
+    type=int,
+    help="Process updates in batches of up to this many messages, committing offsets once per batch.",
+)
+@click.option(
+    "--batch-workers",
+    default=None,
+    type=int,
+    help="Process the updates of a batch on a thread pool of this size, partitioned by subscription.",
+)
 @log_options()
 @configuration
 def query_subscription_consumer(**options):
     from sentry.snuba.query_subscription_consumer import QuerySubscriptionConsumer
 
+    if options["batch_workers"] is not None:
+        executor = ThreadPoolExecutor(options["batch_workers"])
+    else:
+        executor = None
+
     subscriber = QuerySubscriptionConsumer(
         group_id=options["group"],
         topic=options["topic"],
         commit_batch_size=options["commit_batch_size"],
         initial_offset_reset=options["initial_offset_reset"],
         force_offset_reset=options["force_offset_reset"],
+        max_batch_size=options["max_batch_size"],
+        executor=executor,
     )
 
     def handler(signum, frame):
@@ -471,6 +490,12 @@ def batching_kafka_options(group):
     default=None,
     help="Thread pool size (only utilitized for message types that support concurrent processing)",
 )
+@click.option(
+    "--pipeline-workers",
+    type=int,
+    default=None,
+    help="Process all messages of a batch on a thread pool of this size, partitioned by project and event.",
+)
 @configuration
 def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
@@ -499,7 +524,18 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
     else:
         executor = None
 
+    pipeline_workers = options.pop("pipeline_workers", None)
+    if pipeline_workers is not None:
+        pipeline_executor = ThreadPoolExecutor(pipeline_workers)
+    else:
+        pipeline_executor = None
+
     with metrics.global_tags(
         ingest_consumer_types=",".join(sorted(consumer_types)), _all_threads=True
     ):
-        get_ingest_consumer(consumer_types=consumer_types, executor=executor, **options).run()
+        get_ingest_consumer(
+            consumer_types=consumer_types,
+            executor=executor,
+            pipeline_executor=pipeline_executor,
+            **options,
+        ).run()
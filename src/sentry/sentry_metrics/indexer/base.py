@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional, Sequence
 
 from sentry.models import Organization
 from sentry.utils.services import Service
@@ -17,7 +17,25 @@ class StringIndexer(Service):  # type: ignore
     and the corresponding reverse lookup.
     """
 
-    __all__ = ("record", "resolve", "reverse_resolve")
+    __all__ = ("record", "resolve", "reverse_resolve", "bulk_record", "bulk_resolve")
+
+    def bulk_record(
+        self, organization: Organization, use_case: UseCase, strings: Sequence[str]
+    ) -> Dict[str, int]:
+        """Store multiple strings and return a mapping of string to the
+        integer ID generated for it.
+        """
+        return {string: self.record(organization, use_case, string) for string in strings}
+
+    def bulk_resolve(
+        self, organization: Organization, use_case: UseCase, strings: Sequence[str]
+    ) -> Dict[str, Optional[int]]:
+        """Lookup the integer IDs for multiple strings.
+
+        Returns a mapping of string to ID, which is None for entries that
+        cannot be found.
+        """
+        return {string: self.resolve(organization, use_case, string) for string in strings}
 
     def record(self, organization: Organization, use_case: UseCase, string: str) -> int:
         """Store a string and return the integer ID generated for it
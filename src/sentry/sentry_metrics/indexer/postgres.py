@@ -0,0 +1,207 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from sentry.cache.redis import RedisClusterCache
+from sentry.models import MetricsKeyIndexer, Organization
+from sentry.utils import metrics
+from sentry.utils.hashlib import md5_text
+
+from .base import StringIndexer, UseCase
+
+#: Marker for strings that are missing from the local cache
+_MISSING = object()
+
+
+class _LRUCache:
+    """
+    A bounded, thread-safe mapping that evicts the least recently used items.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: MutableMapping[Any, Any] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return _MISSING
+            return self._items[key]
+
+    def set_many(self, items: Mapping[Any, Any]) -> None:
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            for key, value in items.items():
+                self._items[key] = value
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class PostgresIndexer(StringIndexer):
+    """
+    Provides integer IDs for metric names, tag keys and tag values, stored in
+    Postgres. IDs are unique per organization and shared by all use cases.
+
+    Lookups go through a per-process LRU of known IDs and a shared Redis
+    cache, which also remembers strings that could not be resolved for
+    ``negative_cache_ttl`` seconds. Recording a string replaces such an entry.
+
+    :param cluster: The Redis cluster of the shared cache.
+    :param local_cache_size: Number of strings and IDs kept in each of the
+        per-process caches, 0 disables them.
+    :param cache_ttl: Seconds an ID is kept in the shared cache.
+    :param negative_cache_ttl: Seconds a missing string is kept in the
+        shared cache.
+    """
+
+    def __init__(
+        self,
+        cluster: str = "default",
+        local_cache_size: int = 10000,
+        cache_ttl: int = 3600,
+        negative_cache_ttl: int = 60,
+    ) -> None:
+        self.cache = RedisClusterCache(cluster)
+        self.cache_ttl = cache_ttl
+        self.negative_cache_ttl = negative_cache_ttl
+        self._ids = _LRUCache(local_cache_size)
+        self._strings = _LRUCache(local_cache_size)
+
+    def _get_cache_key(self, organization_id: int, string: str) -> str:
+        return f"indexer:{organization_id}:{md5_text(string).hexdigest()}"
+
+    def _get_cached(
+        self, organization_id: int, strings: Sequence[str]
+    ) -> Tuple[Dict[str, Optional[int]], Sequence[str]]:
+        """
+        Looks up strings in the local and shared caches. Returns the cached
+        results, which are ``None`` for strings known to be missing, and the
+        strings that are not cached at all.
+        """
+        rv: Dict[str, Optional[int]] = {}
+        remaining = []
+        for string in strings:
+            id = self._ids.get((organization_id, string))
+            if id is _MISSING:
+                remaining.append(string)
+            else:
+                rv[string] = id
+
+        metrics.incr("sentry_metrics.indexer.cache", amount=len(rv), tags={"tier": "local"})
+        if not remaining:
+            return rv, remaining
+
+        keys = {self._get_cache_key(organization_id, string): string for string in remaining}
+        cached = {keys[key]: id for key, id in self.cache.get_many(list(keys)).items()}
+        metrics.incr("sentry_metrics.indexer.cache", amount=len(cached), tags={"tier": "shared"})
+
+        self._ids.set_many(
+            {(organization_id, string): id for string, id in cached.items() if id is not None}
+        )
+        rv.update(cached)
+        return rv, [string for string in remaining if string not in cached]
+
+    def _set_cached(self, organization_id: int, ids: Mapping[str, Optional[int]]) -> None:
+        found = {string: id for string, id in ids.items() if id is not None}
+        if found:
+            self._ids.set_many({(organization_id, string): id for string, id in found.items()})
+            self._strings.set_many({(organization_id, id): string for string, id in found.items()})
+            self.cache.set_many(
+                {self._get_cache_key(organization_id, string): id for string, id in found.items()},
+                self.cache_ttl,
+            )
+
+        missing = [string for string, id in ids.items() if id is None]
+        if missing and self.negative_cache_ttl:
+            self.cache.set_many(
+                {self._get_cache_key(organization_id, string): None for string in missing},
+                self.negative_cache_ttl,
+            )
+
+    def _fetch(self, organization_id: int, strings: Sequence[str]) -> Dict[str, int]:
+        return dict(
+            MetricsKeyIndexer.objects.filter(
+                organization_id=organization_id, string__in=strings
+            ).values_list("string", "id")
+        )
+
+    def bulk_record(
+        self, organization: Organization, use_case: UseCase, strings: Sequence[str]
+    ) -> Dict[str, int]:
+        """
+        Store multiple strings and return the IDs generated for them. New
+        strings are written with a single insert, ignoring conflicts with
+        concurrent writers, and read back with a single select.
+        """
+        strings = list(dict.fromkeys(strings))
+        cached, remaining = self._get_cached(organization.id, strings)
+        rv = {string: id for string, id in cached.items() if id is not None}
+        remaining.extend(string for string, id in cached.items() if id is None)
+
+        if remaining:
+            MetricsKeyIndexer.objects.bulk_create(
+                [
+                    MetricsKeyIndexer(organization_id=organization.id, string=string)
+                    for string in remaining
+                ],
+                ignore_conflicts=True,
+            )
+            recorded = self._fetch(organization.id, remaining)
+            self._set_cached(organization.id, recorded)
+            rv.update(recorded)
+
+        metrics.incr("sentry_metrics.indexer.record", amount=len(strings))
+        return rv
+
+    def bulk_resolve(
+        self, organization: Organization, use_case: UseCase, strings: Sequence[str]
+    ) -> Dict[str, Optional[int]]:
+        """
+        Lookup the IDs for multiple strings. Strings that cannot be found map
+        to ``None``.
+        """
+        strings = list(dict.fromkeys(strings))
+        rv, remaining = self._get_cached(organization.id, strings)
+
+        if remaining:
+            fetched = self._fetch(organization.id, remaining)
+            resolved = {string: fetched.get(string) for string in remaining}
+            self._set_cached(organization.id, resolved)
+            rv.update(resolved)
+
+        metrics.incr("sentry_metrics.indexer.resolve", amount=len(strings))
+        return rv
+
+    def record(self, organization: Organization, use_case: UseCase, string: str) -> int:
+        return self.bulk_record(organization, use_case, [string])[string]
+
+    def resolve(self, organization: Organization, use_case: UseCase, string: str) -> Optional[int]:
+        return self.bulk_resolve(organization, use_case, [string])[string]
+
+    def reverse_resolve(
+        self, organization: Organization, use_case: UseCase, id: int
+    ) -> Optional[str]:
+        string = self._strings.get((organization.id, id))
+        if string is not _MISSING:
+            return string
+
+        try:
+            string = MetricsKeyIndexer.objects.get(organization_id=organization.id, id=id).string
+        except MetricsKeyIndexer.DoesNotExist:
+            return None
+
+        self._strings.set_many({(organization.id, id): string})
+        return string
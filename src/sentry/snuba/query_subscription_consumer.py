@@ -1,6 +1,8 @@
 import logging
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
 from random import random
-from typing import Any, Callable, Dict, Iterable, List, Optional, cast
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, cast
 
 import jsonschema
 import pytz
@@ -9,6 +11,7 @@ from confluent_kafka import OFFSET_INVALID, Consumer, KafkaException, Message, T
 from confluent_kafka.admin import AdminClient
 from dateutil.parser import parse as parse_date
 from django.conf import settings
+from django.db import connections
 
 from sentry import options
 from sentry.snuba.json_schemas import SUBSCRIPTION_PAYLOAD_VERSIONS, SUBSCRIPTION_WRAPPER_SCHEMA
@@ -19,9 +22,11 @@ from sentry.utils.batching_kafka_consumer import wait_for_topics
 
 logger = logging.getLogger(__name__)
 
-TQuerySubscriptionCallable = Callable[[Dict[str, Any], QuerySubscription], None]
+TQuerySubscriptionCallable = Callable[..., None]
+TQuerySubscriptionPrefetchCallable = Callable[[Sequence[QuerySubscription]], Mapping[int, Any]]
 
 subscriber_registry: Dict[str, TQuerySubscriptionCallable] = {}
+subscriber_prefetch_registry: Dict[str, TQuerySubscriptionPrefetchCallable] = {}
 
 
 def register_subscriber(
@@ -36,6 +41,25 @@ def register_subscriber(
     return inner
 
 
+def register_subscriber_prefetch(
+    subscriber_key: str,
+) -> Callable[[TQuerySubscriptionPrefetchCallable], TQuerySubscriptionPrefetchCallable]:
+    """
+    Registers a function that loads whatever the subscriber callback needs for a batch of
+    subscriptions at once. It returns a mapping of subscription id to prefetched state,
+    which is passed to the callback as the `prefetched` keyword argument when the
+    consumer runs in batching mode.
+    """
+
+    def inner(func: TQuerySubscriptionPrefetchCallable) -> TQuerySubscriptionPrefetchCallable:
+        if subscriber_key in subscriber_prefetch_registry:
+            raise Exception("Prefetch already registered for %s" % subscriber_key)
+        subscriber_prefetch_registry[subscriber_key] = func
+        return func
+
+    return inner
+
+
 class InvalidMessageError(Exception):
     pass
 
@@ -49,6 +73,12 @@ class QuerySubscriptionConsumer:
     A Kafka consumer that processes query subscription update messages. Each message has
     a related subscription id and the latest values related to the subscribed query.
     These values are passed along to a callback associated with the subscription.
+
+    If `max_batch_size` is set, messages are consumed in batches instead. Subscriptions
+    and any state registered via `register_subscriber_prefetch` are loaded for the whole
+    batch at once, updates for different subscriptions run concurrently on `executor`
+    while updates of the same subscription keep their order, and offsets are committed
+    once per batch.
     """
 
     topic_to_dataset: Dict[str, QueryDatasets] = {
@@ -63,6 +93,8 @@ class QuerySubscriptionConsumer:
         commit_batch_size: int = 100,
         initial_offset_reset: str = "earliest",
         force_offset_reset: Optional[str] = None,
+        max_batch_size: Optional[int] = None,
+        executor: Optional[Executor] = None,
     ):
         self.group_id = group_id
         if not topic:
@@ -72,6 +104,8 @@ class QuerySubscriptionConsumer:
         self.topic = topic
         cluster_name: str = settings.KAFKA_TOPICS[topic]["cluster"]
         self.commit_batch_size = commit_batch_size
+        self.max_batch_size = max_batch_size
+        self.executor = executor
         self.initial_offset_reset = initial_offset_reset
         self.offsets: Dict[int, Optional[int]] = {}
         self.consumer: Consumer = None
@@ -162,6 +196,10 @@ class QuerySubscriptionConsumer:
 
         i = 0
         while not self.__shutdown_requested:
+            if self.max_batch_size:
+                self.run_batch()
+                continue
+
             message = self.consumer.poll(0.1)
             if message is None:
                 continue
@@ -189,6 +227,34 @@ class QuerySubscriptionConsumer:
         logger.debug("Committing offsets and closing consumer")
         self.commit_offsets()
         self.consumer.close()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def run_batch(self) -> None:
+        """
+        Consumes up to `max_batch_size` messages, handles them and commits their offsets.
+        """
+        messages = self.consumer.consume(num_messages=self.max_batch_size, timeout=0.1)
+        if not messages:
+            return
+
+        for message in messages:
+            error = message.error()
+            if error is not None:
+                raise KafkaException(error)
+
+        with sentry_sdk.start_transaction(
+            op="handle_batch",
+            name="query_subscription_consumer_process_batch",
+            sampled=random() <= options.get("subscriptions-query.sample-rate"),
+        ), metrics.timer("snuba_query_subscriber.handle_batch"):
+            self.handle_batch(messages)
+
+        for message in messages:
+            self.offsets[message.partition()] = message.offset() + 1
+
+        logger.debug("Committing offsets")
+        self.commit_offsets()
 
     def commit_offsets(self, partitions: Optional[Iterable[int]] = None) -> None:
         logger.info(
@@ -221,78 +287,219 @@ class QuerySubscriptionConsumer:
         :return:
         """
         with sentry_sdk.push_scope() as scope:
-            try:
-                with metrics.timer("snuba_query_subscriber.parse_message_value"):
-                    contents = self.parse_message_value(message.value())
-            except InvalidMessageError:
-                # If the message is in an invalid format, just log the error
-                # and continue
-                logger.exception(
-                    "Subscription update could not be parsed",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
-                )
+            contents = self._parse_message(message)
+            if contents is None:
                 return
             scope.set_tag("query_subscription_id", contents["subscription_id"])
 
+            subscription: Optional[QuerySubscription]
             try:
                 with metrics.timer("snuba_query_subscriber.fetch_subscription"):
-                    subscription: QuerySubscription = QuerySubscription.objects.get_from_cache(
+                    subscription = QuerySubscription.objects.get_from_cache(
                         subscription_id=contents["subscription_id"]
                     )
-                    if subscription.status != QuerySubscription.Status.ACTIVE.value:
-                        metrics.incr("snuba_query_subscriber.subscription_inactive")
-                        return
             except QuerySubscription.DoesNotExist:
-                metrics.incr("snuba_query_subscriber.subscription_doesnt_exist")
-                logger.error(
-                    "Received subscription update, but subscription does not exist",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
-                )
-                try:
-                    _delete_from_snuba(
-                        self.topic_to_dataset[message.topic()], contents["subscription_id"]
-                    )
-                except Exception:
-                    logger.exception("Failed to delete unused subscription from snuba.")
-                return
+                subscription = None
+
+            subscription = self._check_subscription(message, contents, subscription)
+            if subscription is not None:
+                self._run_callback(message, contents, subscription)
 
-            if subscription.type not in subscriber_registry:
-                metrics.incr("snuba_query_subscriber.subscription_type_not_registered")
-                logger.error(
-                    "Received subscription update, but no subscription handler registered",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
+    def handle_batch(self, messages: Sequence[Message]) -> None:
+        """
+        Handles a batch of messages like `handle_message`, but fetches the subscriptions and
+        their prefetched state for all messages at once. Updates are partitioned by
+        subscription, each partition is processed in order and partitions run concurrently
+        on `executor` if one is set. If any update fails, the first error is raised once
+        all partitions finished, so that the batch's offsets are not committed.
+        """
+        parsed: List[Tuple[Message, Dict[str, Any]]] = []
+        for message in messages:
+            contents = self._parse_message(message)
+            if contents is not None:
+                parsed.append((message, contents))
+        if not parsed:
+            return
+
+        with metrics.timer("snuba_query_subscriber.fetch_subscriptions"):
+            subscriptions = {
+                subscription.subscription_id: subscription
+                for subscription in QuerySubscription.objects.get_many_from_cache(
+                    list({contents["subscription_id"] for _, contents in parsed}),
+                    key="subscription_id",
                 )
-                return
+            }
 
-            sentry_sdk.set_tag("project_id", subscription.project_id)
-            sentry_sdk.set_tag("query_subscription_id", contents["subscription_id"])
+        partitions: Dict[int, List[Tuple[Message, Dict[str, Any]]]] = OrderedDict()
+        subscriptions_by_type: Dict[str, List[QuerySubscription]] = {}
+        for message, contents in parsed:
+            subscription = self._check_subscription(
+                message, contents, subscriptions.get(contents["subscription_id"])
+            )
+            if subscription is None:
+                continue
+            if subscription.id not in partitions:
+                partitions[subscription.id] = []
+                subscriptions_by_type.setdefault(subscription.type, []).append(subscription)
+            partitions[subscription.id].append((message, contents))
+        if not partitions:
+            return
+
+        prefetched: Dict[int, Any] = {}
+        for subscription_type, typed_subscriptions in subscriptions_by_type.items():
+            prefetch = subscriber_prefetch_registry.get(subscription_type)
+            if prefetch is not None:
+                with metrics.timer(
+                    "snuba_query_subscriber.prefetch.duration", instance=subscription_type
+                ):
+                    prefetched.update(prefetch(typed_subscriptions))
+
+        metrics.timing("snuba_query_subscriber.batch.size", len(parsed))
+        metrics.timing("snuba_query_subscriber.batch.partitions", len(partitions))
+
+        jobs = [
+            (
+                subscriptions[updates[0][1]["subscription_id"]],
+                updates,
+                prefetched.get(subscription_id),
+            )
+            for subscription_id, updates in partitions.items()
+        ]
+        if self.executor is None:
+            for job in jobs:
+                self._process_partition(*job)
+            return
+
+        hub = sentry_sdk.Hub.current
+        futures: List[Future] = [
+            self.executor.submit(self._process_partition_in_thread, hub, *job) for job in jobs
+        ]
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
 
-            callback = subscriber_registry[subscription.type]
-            with sentry_sdk.start_span(op="process_message") as span, metrics.timer(
-                "snuba_query_subscriber.callback.duration", instance=subscription.type
+    def _process_partition_in_thread(
+        self,
+        hub: sentry_sdk.Hub,
+        subscription: QuerySubscription,
+        updates: Sequence[Tuple[Message, Dict[str, Any]]],
+        prefetched: Any,
+    ) -> None:
+        try:
+            with sentry_sdk.Hub(hub):
+                self._process_partition(subscription, updates, prefetched)
+        finally:
+            # Threads of the executor outlive batches, nothing else closes their connections.
+            connections.close_all()
+
+    def _process_partition(
+        self,
+        subscription: QuerySubscription,
+        updates: Sequence[Tuple[Message, Dict[str, Any]]],
+        prefetched: Any,
+    ) -> None:
+        # Prefetched state reflects the start of the batch, so only the first update of
+        # a subscription can use it. Later updates load the state the previous ones left.
+        for message, contents in updates:
+            with sentry_sdk.push_scope() as scope, metrics.timer(
+                "snuba_query_subscriber.handle_message"
             ):
-                span.set_data("payload", contents)
-                span.set_data("subscription_dataset", subscription.snuba_query.dataset)
-                span.set_data("subscription_query", subscription.snuba_query.query)
-                span.set_data("subscription_aggregation", subscription.snuba_query.aggregate)
-                span.set_data("subscription_time_window", subscription.snuba_query.time_window)
-                span.set_data("subscription_resolution", subscription.snuba_query.resolution)
-                span.set_data("message_offset", message.offset())
-                span.set_data("message_partition", message.partition())
-                span.set_data("message_value", message.value())
+                scope.set_tag("query_subscription_id", contents["subscription_id"])
+                self._run_callback(message, contents, subscription, prefetched)
+            prefetched = None
+
+    def _parse_message(self, message: Message) -> Optional[Dict[str, Any]]:
+        try:
+            with metrics.timer("snuba_query_subscriber.parse_message_value"):
+                return self.parse_message_value(message.value())
+        except InvalidMessageError:
+            # If the message is in an invalid format, just log the error
+            # and continue
+            logger.exception(
+                "Subscription update could not be parsed",
+                extra={
+                    "offset": message.offset(),
+                    "partition": message.partition(),
+                    "value": message.value(),
+                },
+            )
+            return None
 
+    def _check_subscription(
+        self,
+        message: Message,
+        contents: Dict[str, Any],
+        subscription: Optional[QuerySubscription],
+    ) -> Optional[QuerySubscription]:
+        """
+        Returns the subscription if the update should be passed on to its callback. Logs
+        metrics/errors otherwise and returns None, deleting subscriptions that no longer
+        exist from snuba.
+        """
+        if subscription is None:
+            metrics.incr("snuba_query_subscriber.subscription_doesnt_exist")
+            logger.error(
+                "Received subscription update, but subscription does not exist",
+                extra={
+                    "offset": message.offset(),
+                    "partition": message.partition(),
+                    "value": message.value(),
+                },
+            )
+            try:
+                _delete_from_snuba(
+                    self.topic_to_dataset[message.topic()], contents["subscription_id"]
+                )
+            except Exception:
+                logger.exception("Failed to delete unused subscription from snuba.")
+            return None
+
+        if subscription.status != QuerySubscription.Status.ACTIVE.value:
+            metrics.incr("snuba_query_subscriber.subscription_inactive")
+            return None
+
+        if subscription.type not in subscriber_registry:
+            metrics.incr("snuba_query_subscriber.subscription_type_not_registered")
+            logger.error(
+                "Received subscription update, but no subscription handler registered",
+                extra={
+                    "offset": message.offset(),
+                    "partition": message.partition(),
+                    "value": message.value(),
+                },
+            )
+            return None
+
+        return subscription
+
+    def _run_callback(
+        self,
+        message: Message,
+        contents: Dict[str, Any],
+        subscription: QuerySubscription,
+        prefetched: Any = None,
+    ) -> None:
+        sentry_sdk.set_tag("project_id", subscription.project_id)
+        sentry_sdk.set_tag("query_subscription_id", contents["subscription_id"])
+
+        callback = subscriber_registry[subscription.type]
+        with sentry_sdk.start_span(op="process_message") as span, metrics.timer(
+            "snuba_query_subscriber.callback.duration", instance=subscription.type
+        ):
+            span.set_data("payload", contents)
+            span.set_data("subscription_dataset", subscription.snuba_query.dataset)
+            span.set_data("subscription_query", subscription.snuba_query.query)
+            span.set_data("subscription_aggregation", subscription.snuba_query.aggregate)
+            span.set_data("subscription_time_window", subscription.snuba_query.time_window)
+            span.set_data("subscription_resolution", subscription.snuba_query.resolution)
+            span.set_data("message_offset", message.offset())
+            span.set_data("message_partition", message.partition())
+            span.set_data("message_value", message.value())
+
+            if prefetched is not None:
+                callback(contents, subscription, prefetched=prefetched)
+            else:
                 callback(contents, subscription)
 
     def parse_message_value(self, value: str) -> Dict[str, Any]:
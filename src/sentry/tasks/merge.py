@@ -101,10 +101,14 @@ def merge_groups(
             GroupMeta,
         )
 
+        hashes = list(GroupHash.objects.filter(group_id=group.id).values_list("hash", flat=True))
+
         has_more = merge_objects(
             model_list, group, new_group, logger=logger, transaction_id=transaction_id
         )
 
+        GroupHash.invalidate_cache(group.project_id, hashes)
+
         if not has_more:
             # There are no more objects to merge for *this* "from" group, remove it
             # from the list of "from" groups that are being merged, and finish the
@@ -5,11 +5,37 @@ from django.conf import settings
 
 from sentry.relay import projectconfig_debounce_cache
 from sentry.tasks.base import instrumented_task
-from sentry.utils import metrics
+from sentry.utils import json, metrics
 from sentry.utils.sdk import set_current_event_project
 
 logger = logging.getLogger(__name__)
 
+# Fields of a project config that change on every build or with every
+# option change, without changing the configuration itself.
+VOLATILE_CONFIG_FIELDS = ("lastFetch", "lastChange", "rev")
+
+
+def _normalize_config(config):
+    config = json.loads(json.dumps(config))
+    for field in VOLATILE_CONFIG_FIELDS:
+        config.pop(field, None)
+    return config
+
+
+def _get_changed_configs(configs):
+    """
+    Returns the subset of ``configs`` that differs from the cached configs.
+    """
+    from sentry.relay import projectconfig_cache
+
+    cached_configs = projectconfig_cache.get_many(list(configs))
+    return {
+        key: config
+        for key, config in configs.items()
+        if key not in cached_configs
+        or _normalize_config(config) != _normalize_config(cached_configs[key])
+    }
+
 
 @instrumented_task(name="sentry.tasks.relay.update_config_cache", queue="relay_config")
 def update_config_cache(generate, organization_id=None, project_id=None, update_reason=None):
@@ -28,7 +54,11 @@ def update_config_cache(generate, organization_id=None, project_id=None, update_
 
     from sentry.models import Project, ProjectKey, ProjectKeyStatus
     from sentry.relay import projectconfig_cache
-    from sentry.relay.config import get_project_config
+    from sentry.relay.config import (
+        OrganizationConfigContext,
+        get_project_config,
+        get_project_config_for_key,
+    )
 
     if project_id:
         set_current_event_project(project_id)
@@ -54,31 +84,45 @@ def update_config_cache(generate, organization_id=None, project_id=None, update_
     elif organization_id:
         # XXX(markus): I feel like we should be able to cache this but I don't
         # want to add another method to src/sentry/db/models/manager.py
-        projects = Project.objects.filter(organization_id=organization_id)
+        projects = Project.objects.filter(organization_id=organization_id).select_related(
+            "organization"
+        )
 
     project_keys = {}
     for key in ProjectKey.objects.filter(project_id__in=[project.id for project in projects]):
         project_keys.setdefault(key.project_id, []).append(key)
 
     if generate:
+        # Organization-level lookups are shared by all projects, and key
+        # configs are derived from their project's config.
+        organization_contexts = {}
         config_cache = {}
         for project in projects:
+            organization_context = organization_contexts.get(project.organization_id)
+            if organization_context is None:
+                organization_context = OrganizationConfigContext(project.organization)
+                organization_contexts[project.organization_id] = organization_context
+
             project_config = get_project_config(
-                project, project_keys=project_keys.get(project.id, []), full_config=True
+                project,
+                project_keys=project_keys.get(project.id, []),
+                full_config=True,
+                organization_context=organization_context,
             )
             config_cache[project.id] = project_config.to_dict()
 
             for key in project_keys.get(project.id) or ():
-                # XXX(markus): This is currently the cleanest way to get only
-                # state for a single projectkey (considering quotas and
-                # everything)
                 if key.status != ProjectKeyStatus.ACTIVE:
                     continue
 
-                project_config = get_project_config(project, project_keys=[key], full_config=True)
-                config_cache[key.public_key] = project_config.to_dict()
+                config_cache[key.public_key] = get_project_config_for_key(
+                    project, project_config, key
+                ).to_dict()
 
-        projectconfig_cache.set_many(config_cache)
+        changed_configs = _get_changed_configs(config_cache)
+        unchanged_keys = [key for key in config_cache if key not in changed_configs]
+        metrics.incr("relay.projectconfig_cache.unchanged", amount=len(unchanged_keys))
+        projectconfig_cache.set_many(changed_configs, unchanged_keys)
     else:
         cache_keys_to_delete = []
         for project in projects:
@@ -4,7 +4,7 @@ import time
 import sentry_sdk
 from django.db import transaction
 
-from sentry import eventstore, eventstream, nodestore
+from sentry import eventstore, eventstream, nodestore, options
 from sentry.eventstore.models import Event
 from sentry.tasks.base import instrumented_task, retry
 from sentry.utils.query import celery_run_batch_query
@@ -42,6 +42,7 @@ def reprocess_group(
         logger,
         mark_event_reprocessed,
         reprocess_event,
+        reprocess_events,
         start_group_reprocessing,
     )
 
@@ -74,12 +75,18 @@ def reprocess_group(
         eventstream.exclude_groups(project_id, [group_id])
         return
 
-    remaining_event_ids = []
-    remaining_events_min_datetime = None
-    remaining_events_max_datetime = None
+    events_to_reprocess = events if max_events is None else events[:max_events]
 
-    for event in events:
-        if max_events is None or max_events > 0:
+    if options.get("reprocessing2.bulk-fetch-events"):
+        with sentry_sdk.start_span(op="reprocess_events"):
+            errors = reprocess_events(
+                project_id=project_id,
+                events=events_to_reprocess,
+                start_time=start_time,
+            )
+    else:
+        errors = {}
+        for event in events_to_reprocess:
             with sentry_sdk.start_span(op="reprocess_event"):
                 try:
                     reprocess_event(
@@ -87,15 +94,26 @@ def reprocess_group(
                         event_id=event.event_id,
                         start_time=start_time,
                     )
-                except CannotReprocess as e:
-                    logger.error(f"reprocessing2.{e}")
-                except Exception:
-                    sentry_sdk.capture_exception()
-                else:
-                    if max_events is not None:
-                        max_events -= 1
-
-                    continue
+                except Exception as e:
+                    errors[event.event_id] = e
+
+    remaining_event_ids = []
+    remaining_events_min_datetime = None
+    remaining_events_max_datetime = None
+
+    for i, event in enumerate(events):
+        if i < len(events_to_reprocess):
+            error = errors.get(event.event_id)
+            if error is None:
+                if max_events is not None:
+                    max_events -= 1
+
+                continue
+
+            if isinstance(error, CannotReprocess):
+                logger.error(f"reprocessing2.{error}")
+            else:
+                sentry_sdk.capture_exception(error)
 
             # In case of errors while kicking off reprocessing, mark the event
             # as reprocessed such that progressbar advances and the
@@ -1,5 +1,7 @@
 import logging
+from contextlib import contextmanager
 from datetime import datetime
+from threading import Lock, local
 from time import sleep, time
 
 import sentry_sdk
@@ -30,6 +32,11 @@ REPROCESSING_DEFAULT = False
 
 SYMBOLICATOR_MAX_RETRY_AFTER = settings.SYMBOLICATOR_MAX_RETRY_AFTER
 
+# Maximum number of events saved by a single save_event_many task
+SAVE_EVENT_MANY_MAX_EVENTS = 50
+
+_save_event_batch = local()
+
 
 class RetryProcessing(Exception):
     pass
@@ -123,6 +130,19 @@ def submit_save_event(project_id, from_reprocessing, cache_key, event_id, start_
 
     # XXX: honor from_reprocessing
 
+    batch = get_save_event_batch()
+    if batch is not None and cache_key:
+        batch.add(
+            project_id,
+            {
+                "cache_key": cache_key,
+                "start_time": start_time,
+                "event_id": event_id,
+                "project_id": project_id,
+            },
+        )
+        return
+
     save_event.delay(
         cache_key=cache_key,
         data=data,
@@ -132,6 +152,79 @@ def submit_save_event(project_id, from_reprocessing, cache_key, event_id, start_
     )
 
 
+class SaveEventBatch:
+    """
+    Events collected by `batch_save_events`, grouped by project. Can be shared
+    with the worker threads of the thread that collects them.
+    """
+
+    def __init__(self):
+        self.events = {}
+        self._lock = Lock()
+
+    def add(self, project_id, event):
+        with self._lock:
+            self.events.setdefault(project_id, []).append(event)
+
+
+def get_save_event_batch():
+    """
+    Returns the `SaveEventBatch` events of the current thread are collected
+    in, or `None` if they are submitted right away.
+    """
+    return getattr(_save_event_batch, "batch", None)
+
+
+@contextmanager
+def join_save_event_batch(batch):
+    """
+    Collects the events of the current thread in the batch of another thread,
+    which submits them when its `batch_save_events` context exits.
+    """
+    previous = get_save_event_batch()
+    _save_event_batch.batch = batch
+    try:
+        yield
+    finally:
+        _save_event_batch.batch = previous
+
+
+def _submit_save_event_batch(batch):
+    for project_id, events in batch.events.items():
+        metrics.timing("tasks.store.save_event_batch.size", len(events))
+        for i in range(0, len(events), SAVE_EVENT_MANY_MAX_EVENTS):
+            chunk = events[i : i + SAVE_EVENT_MANY_MAX_EVENTS]
+            if len(chunk) == 1:
+                save_event.delay(data=None, **chunk[0])
+            else:
+                save_event_many.delay(events=chunk)
+
+
+@contextmanager
+def batch_save_events():
+    """
+    Within this context, events that are ready to be saved are not submitted
+    as individual `save_event` tasks. They are collected and submitted as
+    one `save_event_many` task per project when the context exits.
+
+    Nested usage is a no-op, events are submitted by the outermost context.
+    Worker threads can add their events with `join_save_event_batch`, as long
+    as they are done before the context exits.
+    """
+    if get_save_event_batch() is not None:
+        yield
+        return
+
+    _save_event_batch.batch = batch = SaveEventBatch()
+    try:
+        yield
+    finally:
+        # Submit even if the batch was interrupted, since callers already
+        # consider collected events to be dispatched.
+        _save_event_batch.batch = None
+        _submit_save_event_batch(batch)
+
+
 def _do_preprocess_event(cache_key, data, start_time, event_id, process_task, project):
     from sentry.lang.native.processing import should_process_with_symbolicator
 
@@ -893,6 +986,162 @@ def _do_save_event(
             time_synthetic_monitoring_event(data, project_id, start_time)
 
 
+def _do_save_event_many(events):
+    """
+    Saves a batch of error events of the same project to the database.
+
+    This is the batched counterpart of `_do_save_event`. Event payloads are
+    fetched from the processing store at once and saved through
+    `save_error_events`. Transactions and events whose payload is gone take
+    the regular single-event path, as do all events of a batch that failed
+    to save.
+    """
+
+    cache_keys = [
+        event["cache_key"] for event in events if event.get("cache_key") and not event.get("data")
+    ]
+    cached_data = {}
+    if cache_keys:
+        with metrics.timer("tasks.store.do_save_event_many.get_cache"):
+            cached_data = event_processing_store.get_many(cache_keys)
+
+    jobs = []
+    for event in events:
+        cache_key = event.get("cache_key")
+        data = event.get("data") or cached_data.get(cache_key)
+
+        if not data or data.get("type") == "transaction":
+            _do_save_event(
+                cache_key=cache_key,
+                data=data,
+                start_time=event.get("start_time"),
+                event_id=event.get("event_id"),
+                project_id=event["project_id"],
+            )
+            continue
+
+        jobs.append(
+            {
+                "data": CanonicalKeyDict(data),
+                "project_id": event["project_id"],
+                "start_time": event.get("start_time"),
+                "cache_key": cache_key,
+                "event_id": event.get("event_id") or data["event_id"],
+                "save_event_kwargs": event,
+            }
+        )
+
+    if not jobs:
+        return
+
+    project_id = jobs[0]["project_id"]
+    set_current_event_project(project_id)
+    assert all(job["project_id"] == project_id for job in jobs), "Mixed projects in batch"
+
+    jobs_by_type = {}
+    for job in jobs:
+        jobs_by_type.setdefault(job["data"].get("type") or "none", []).append(job)
+
+    for event_type, typed_jobs in jobs_by_type.items():
+        with metrics.global_tags(event_type=event_type):
+            _do_save_error_event_jobs(typed_jobs, project_id)
+
+
+def _do_save_error_event_jobs(jobs, project_id):
+    from sentry.event_manager import HashDiscarded, save_error_events
+
+    jobs_to_save = []
+    for job in jobs:
+        # We only need to delete raw events for events that support
+        # reprocessing.
+        if reprocessing.event_supports_reprocessing(job["data"]):
+            with metrics.timer("tasks.store.do_save_event.delete_raw_event"):
+                delete_raw_event(project_id, job["event_id"], allow_hint_clear=True)
+
+        if killswitch_matches_context(
+            "store.load-shed-save-event-projects",
+            {
+                "project_id": project_id,
+                "event_type": job["data"].get("type") or "none",
+                "platform": job["data"].get("platform") or "none",
+            },
+        ):
+            job["discarded"] = HashDiscarded("Load shedding save_event")
+        else:
+            jobs_to_save.append(job)
+
+    try:
+        saved_jobs = []
+        fallback_jobs = []
+        if jobs_to_save:
+            project = Project.objects.get_from_cache(id=project_id)
+            try:
+                with metrics.timer("tasks.store.do_save_event_many.event_manager.save"):
+                    saved_jobs = save_error_events(jobs_to_save, {project.id: project})
+            except Exception:
+                # Do not let a single bad event take down the whole batch,
+                # save the events one by one instead.
+                error_logger.exception(
+                    "tasks.store.do_save_event_many.failed", extra={"project_id": project_id}
+                )
+                fallback_jobs = jobs_to_save
+
+        for job in fallback_jobs:
+            job["fallback"] = True
+            kwargs = job["save_event_kwargs"]
+            try:
+                _do_save_event(
+                    cache_key=kwargs.get("cache_key"),
+                    data=kwargs.get("data"),
+                    start_time=kwargs.get("start_time"),
+                    event_id=kwargs.get("event_id"),
+                    project_id=project_id,
+                )
+            except Exception:
+                error_logger.exception(
+                    "tasks.store.do_save_event_many.fallback_failed",
+                    extra={"project_id": project_id, "event_id": job["event_id"]},
+                )
+
+        for job in saved_jobs:
+            # Put the updated event back into the cache so that post_process
+            # has the most recent data.
+            data = job["event"].data.data
+            if isinstance(data, CANONICAL_TYPES):
+                data = dict(data.items())
+            job["data"] = data
+            with metrics.timer("tasks.store.do_save_event.write_processing_cache"):
+                event_processing_store.store(data)
+
+        for job in jobs:
+            # Delete the event payload from cache since it won't show up in
+            # post-processing.
+            if job.get("fallback"):
+                continue
+            if job.get("discarded") is not None and job["cache_key"]:
+                with metrics.timer("tasks.store.do_save_event.delete_cache"):
+                    event_processing_store.delete_by_key(job["cache_key"])
+
+    finally:
+        for job in jobs:
+            # `_do_save_event` already cleaned up after the event
+            if job.get("fallback"):
+                continue
+
+            data = job["data"]
+            reprocessing2.mark_event_reprocessed(data)
+            if job["cache_key"]:
+                with metrics.timer("tasks.store.do_save_event.delete_attachment_cache"):
+                    attachment_cache.delete(job["cache_key"])
+
+            if job["start_time"]:
+                metrics.timing(
+                    "events.time-to-process", time() - job["start_time"], instance=data["platform"]
+                )
+
+            time_synthetic_monitoring_event(data, project_id, job["start_time"])
+
+
 def time_synthetic_monitoring_event(data, project_id, start_time):
     """
     For special events produced by the recurring synthetic monitoring
@@ -951,3 +1200,17 @@ def save_event(
     cache_key=None, data=None, start_time=None, event_id=None, project_id=None, **kwargs
 ):
     _do_save_event(cache_key, data, start_time, event_id, project_id, **kwargs)
+
+
+@instrumented_task(
+    name="sentry.tasks.store.save_event_many",
+    queue="events.save_event",
+    time_limit=125,
+    soft_time_limit=120,
+)
+def save_event_many(events=None, **kwargs):
+    """
+    Saves multiple error events of the same project. Each item of `events`
+    takes the same arguments as `save_event`.
+    """
+    _do_save_event_many(events or [])
@@ -450,7 +450,10 @@ def lock_hashes(project_id, source_id, fingerprints):
             state=GroupHash.State.LOCKED_IN_MIGRATION
         )
 
-    return [h.hash for h in eligible_hashes]
+    locked_hashes = [h.hash for h in eligible_hashes]
+    # Cached hashes would otherwise keep sending events to the source group.
+    GroupHash.invalidate_cache(project_id, locked_hashes)
+    return locked_hashes
 
 
 def unlock_hashes(project_id, locked_primary_hashes):
@@ -80,3 +80,17 @@ def relay_is_available():
 requires_relay = pytest.mark.skipif(
     not relay_is_available(), reason="requires relay server running"
 )
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+requires_pytest_benchmark = pytest.mark.skipif(
+    not benchmark_available(), reason="requires pytest-benchmark"
+)
@@ -278,28 +278,62 @@ class RedisTSDB(BaseTSDB):
 
         self.validate_arguments([model], [environment_id])
 
+        return {
+            key: list(zip(timestamps, counts))
+            for key, (timestamps, counts) in self.get_range_columnar(
+                model, keys, start, end, rollup, environment_id
+            ).items()
+        }
+
+    def get_sums(self, model, keys, start, end, rollup=None, environment_id=None, use_cache=False):
+        self.validate_arguments([model], [environment_id])
+
+        return {
+            key: sum(counts)
+            for key, (_, counts) in self.get_range_columnar(
+                model, keys, start, end, rollup, environment_id
+            ).items()
+        }
+
+    def get_range_columnar(self, model, keys, start, end, rollup=None, environment_id=None):
+        """
+        Fetch the counters of ``keys`` for the series between ``start`` and
+        ``end``.
+
+        Returns a mapping of key => (timestamps, counts), where both are lists
+        of the same length ordered by timestamp.
+
+        All fields that share a hash (keys in the same vnode and rollup epoch)
+        are read with a single ``HMGET``, and all commands are routed through
+        one ``cluster.map()``, which batches them into a single round trip per
+        host.
+        """
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
-        series = map(to_datetime, series)
+        keys = list(dict.fromkeys(keys))
+
+        # hash_key -> [(key index, series index, hash_field), ...]
+        fields_by_hash_key = defaultdict(list)
+        for i, key in enumerate(keys):
+            for j, timestamp in enumerate(series):
+                hash_key, hash_field = self.make_counter_key(
+                    model, rollup, to_datetime(timestamp), key, environment_id
+                )
+                fields_by_hash_key[hash_key].append((i, j, hash_field))
 
-        results = []
         cluster, _ = self.get_cluster(environment_id)
         with cluster.map() as client:
-            for key in keys:
-                for timestamp in series:
-                    hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append(
-                        (to_timestamp(timestamp), key, client.hget(hash_key, hash_field))
-                    )
+            responses = [
+                (fields, client.hmget(hash_key, [hash_field for _, _, hash_field in fields]))
+                for hash_key, fields in fields_by_hash_key.items()
+            ]
 
-        results_by_key = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+        counts = [[0] * len(series) for _ in keys]
+        for fields, response in responses:
+            for (i, j, _), count in zip(fields, response.value):
+                if count is not None:
+                    counts[i][j] = int(count)
 
-        for key, points in results_by_key.items():
-            results_by_key[key] = sorted(points.items())
-        return dict(results_by_key)
+        return {key: (list(series), counts[i]) for i, key in enumerate(keys)}
 
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
@@ -120,6 +120,7 @@ class PrimaryHashUnmergeReplacement(UnmergeReplacement):
         GroupHash.objects.filter(project_id=project.id, hash__in=locked_primary_hashes).update(
             group=destination_id
         )
+        GroupHash.invalidate_cache(project.id, locked_primary_hashes)
 
     def get_activity_args(self) -> Mapping[str, Any]:
         return {"fingerprints": self.fingerprints}
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Any, Iterator, Optional, Sequence, Tuple
+from typing import Any, Iterator, Mapping, Optional, Sequence, Tuple
 
 from django.conf import settings
 
@@ -31,9 +31,15 @@ class CacheKVStorage(KVStorage[Any, Any]):
     def get(self, key: Any) -> Optional[Any]:
         return self.backend.get(key)
 
+    def get_many(self, keys: Sequence[Any]) -> Iterator[Tuple[Any, Any]]:
+        return iter(self.backend.get_many(keys).items())
+
     def set(self, key: Any, value: Any, ttl: Optional[timedelta] = None) -> None:
         self.backend.set(key, value, timeout=int(ttl.total_seconds()) if ttl is not None else None)
 
+    def set_many(self, items: Mapping[Any, Any], ttl: Optional[timedelta] = None) -> None:
+        self.backend.set_many(items, timeout=int(ttl.total_seconds()) if ttl is not None else None)
+
     def delete(self, key: Any) -> None:
         self.backend.delete(key)
 
@@ -91,6 +97,12 @@ class CacheKeyWrapper(KVStorage[str, V]):
             ttl,
         )
 
+    def set_many(self, items: Mapping[str, V], ttl: Optional[timedelta] = None) -> None:
+        return self.storage.set_many(
+            {wrap_key(self.prefix, self.version, key): value for key, value in items.items()},
+            ttl,
+        )
+
     def delete(self, key: str) -> None:
         self.storage.delete(wrap_key(self.prefix, self.version, key))
 
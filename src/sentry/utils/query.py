@@ -252,3 +252,58 @@ def bulk_delete_objects(
         )
 
     return has_more
+
+
+def bulk_delete_objects_after(model, limit=10000, after_id=None, partition_key=None, **filters):
+    """
+    Like `bulk_delete_objects`, but deletes rows in primary key order starting after
+    `after_id`, so that successive calls walk the primary key index instead of
+    rescanning rows that were already deleted.
+
+    Returns a tuple of the number of deleted rows and the largest deleted id, which is
+    to be passed as `after_id` of the next call.
+    """
+    connection = connections[router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+
+    params = []
+    partition_query = []
+    query = []
+
+    if partition_key:
+        for column, value in partition_key.items():
+            partition_query.append(f"{quote_name(column)} = %s")
+            params.append(value)
+
+    for column, value in filters.items():
+        query.append(f"{quote_name(column)} = %s")
+        params.append(value)
+
+    if after_id is not None:
+        query.append("id > %s")
+        params.append(after_id)
+
+    query = """
+        with deleted as (
+            delete from %(table)s
+            where %(partition_query)s id = any(array(
+                select id
+                from %(table)s
+                where (%(query)s)
+                order by id
+                limit %(limit)d
+            ))
+            returning id
+        )
+        select count(*), max(id) from deleted
+    """ % dict(
+        partition_query=(" AND ".join(partition_query)) + (" AND " if partition_query else ""),
+        query=" AND ".join(query) or "true",
+        table=model._meta.db_table,
+        limit=limit,
+    )
+
+    cursor = connection.cursor()
+    cursor.execute(query, params)
+    deleted, last_id = cursor.fetchone()
+    return deleted, last_id
@@ -1,9 +1,10 @@
+import threading
 from datetime import timedelta
 
 from django.utils import timezone
 
 from sentry.api.serializers import serialize
-from sentry.api.serializers.models.group import StreamGroupSerializer
+from sentry.api.serializers.models.group import StreamGroupSerializer, fetch_attrs
 from sentry.models import (
     Environment,
     Group,
@@ -17,6 +18,7 @@ from sentry.models import (
 )
 from sentry.notifications.types import NotificationSettingOptionValues, NotificationSettingTypes
 from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.types.integrations import ExternalProviders
 from sentry.utils.compat import mock
 from sentry.utils.compat.mock import patch
@@ -372,3 +374,44 @@ class StreamGroupSerializerTestCase(TestCase):
                 ),
             )
             assert make_series.call_count == 1
+
+
+class FetchAttrsTest(TestCase):
+    def fetcher(self, name):
+        def fetch():
+            self.threads[name] = threading.current_thread()
+            return name.upper()
+
+        return fetch
+
+    def setUp(self):
+        super().setUp()
+        self.threads = {}
+
+    def test_sequential(self):
+        assert fetch_attrs({"a": self.fetcher("a"), "b": self.fetcher("b")}) == {
+            "a": "A",
+            "b": "B",
+        }
+        assert set(self.threads.values()) == {threading.current_thread()}
+
+    @override_options({"api.group-serializer.concurrent-attrs": True})
+    def test_concurrent(self):
+        assert fetch_attrs({"a": self.fetcher("a"), "b": self.fetcher("b")}) == {
+            "a": "A",
+            "b": "B",
+        }
+        assert self.threads["a"] == threading.current_thread()
+        assert self.threads["b"] != threading.current_thread()
+
+    @override_options({"api.group-serializer.concurrent-attrs": True})
+    def test_nested(self):
+        def nested():
+            return fetch_attrs({"c": self.fetcher("c"), "d": self.fetcher("d")})
+
+        assert fetch_attrs({"a": self.fetcher("a"), "b": nested}) == {
+            "a": "A",
+            "b": {"c": "C", "d": "D"},
+        }
+        # fetchers on the pool don't submit to it again
+        assert self.threads["c"] == self.threads["d"] != threading.current_thread()
@@ -13,12 +13,15 @@ from sentry.api.event_search import (
     SearchFilter,
     SearchKey,
     SearchValue,
+    _parse_search_query_tree,
+    event_search_grammar,
     parse_search_query,
 )
 from sentry.constants import MODULE_ROOT
 from sentry.exceptions import InvalidSearchQuery
 from sentry.search.utils import parse_datetime_string, parse_duration, parse_numeric_value
 from sentry.utils import json
+from sentry.utils.compat.mock import patch
 
 fixture_path = "tests/fixtures/search-syntax"
 abs_fixtures_path = os.path.join(MODULE_ROOT, os.pardir, os.pardir, fixture_path)
@@ -220,6 +223,25 @@ class ParseSearchQueryBackendTest(SimpleTestCase):
             ),
         ]
 
+    def test_cached_parse_tree(self):
+        _parse_search_query_tree.cache_clear()
+        with patch.object(event_search_grammar, "parse", wraps=event_search_grammar.parse) as parse:
+            query = "user.email:foo@example.com release:1.2.1 count():>10"
+            assert parse_search_query(query) == parse_search_query(query)
+        assert parse.call_count == 1
+
+    def test_cached_parse_tree_rel_time_filter(self):
+        now = timezone.now()
+        for offset in (timedelta(0), timedelta(hours=1)):
+            with freeze_time(now + offset):
+                assert parse_search_query("first_seen:+7d") == [
+                    SearchFilter(
+                        key=SearchKey(name="first_seen"),
+                        operator="<=",
+                        value=SearchValue(raw_value=now + offset - timedelta(days=7)),
+                    )
+                ]
+
     def test_rel_time_filter(self):
         now = timezone.now()
         with freeze_time(now):
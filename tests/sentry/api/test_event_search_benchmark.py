@@ -0,0 +1,33 @@
+from sentry.api.event_search import _parse_search_query_tree, parse_search_query
+from sentry.testutils.skips import requires_pytest_benchmark
+
+QUERIES = [
+    "event.type:transaction",
+    "event.type:error !has:release",
+    'transaction:"/api/0/organizations/{organization_slug}/eventsv2/" http.method:GET',
+    "user.email:foo@example.com release:[1.2.1, 1.2.2] environment:production",
+    "transaction.duration:>300ms p95():>1s count():>100 failure_rate():>0.05",
+    "(browser.name:Chrome OR browser.name:Firefox) AND os.name:Windows level:error",
+    "timestamp:-24h message:*TimeoutError* !stack.filename:*/site-packages/*",
+    "measurements.lcp:>2.5s measurements.fcp:>1s transaction.op:pageload",
+]
+
+
+def parse_queries():
+    for query in QUERIES:
+        parse_search_query(query)
+
+
+@requires_pytest_benchmark
+def test_benchmark_parse_search_query_uncached(benchmark):
+    def run():
+        _parse_search_query_tree.cache_clear()
+        parse_queries()
+
+    benchmark(run)
+
+
+@requires_pytest_benchmark
+def test_benchmark_parse_search_query_cached(benchmark):
+    parse_queries()
+    benchmark(parse_queries)
@@ -73,3 +73,26 @@ class BufferTest(TestCase):
         self.buf.process(Group, columns, filters, {"last_seen": the_date}, signal_only=True)
         group.refresh_from_db()
         assert group.times_seen == prev_times_seen
+
+    def test_process_batch(self):
+        group = Group.objects.create(project=Project(id=1))
+        other_group = Group.objects.create(project=Project(id=1))
+        the_date = timezone.now() + timedelta(days=5)
+
+        self.buf.process_batch(
+            Group,
+            [
+                ({"times_seen": 2}, {"id": group.id}, {"last_seen": the_date}, None),
+                ({"times_seen": 3}, {"pk": other_group.id}, {"last_seen": the_date}, None),
+                ({"times_seen": 1}, {"message": "foo bar", "project_id": 1}, None, None),
+            ],
+        )
+
+        group_ = Group.objects.get(id=group.id)
+        assert group_.times_seen == group.times_seen + 2
+        assert group_.last_seen == the_date
+        other_group_ = Group.objects.get(id=other_group.id)
+        assert other_group_.times_seen == other_group.times_seen + 3
+        assert other_group_.last_seen == the_date
+        # rows not filtered by their primary key are processed on their own
+        assert Group.objects.get(message="foo bar").times_seen == 2
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+from django.utils import timezone
+
+from sentry.buffer.redis import RedisBuffer
+from sentry.models import Group, ReleaseProject
+from sentry.testutils.skips import requires_pytest_benchmark
+
+
+NOW = datetime(2021, 7, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+# Typical increments as written by the event manager
+INCREMENTS = {
+    "group": (
+        Group,
+        {"id": 1234567890},
+        {
+            "last_seen": NOW,
+            "data": {
+                "type": "error",
+                "metadata": {"type": "ZeroDivisionError", "value": "division by zero"},
+            },
+            "message": "ZeroDivisionError division by zero",
+            "culprit": "sentry.tasks.store in process_event",
+        },
+    ),
+    "releaseproject": (ReleaseProject, {"release_id": 123456, "project_id": 654321}, None),
+}
+
+
+def encode(buf, filters, extra, use_msgpack):
+    rv = {"f": buf._dump_field(filters, use_msgpack)}
+    for column, value in (extra or {}).items():
+        rv["e+" + column] = buf._dump_field(value, use_msgpack)
+    return rv
+
+
+def decode(buf, payload):
+    return {
+        k: buf._load_field(v, json_prefix=b"{" if k == "f" else b"[") for k, v in payload.items()
+    }
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("use_msgpack", [False, True], ids=["pickle", "msgpack"])
+@pytest.mark.parametrize("increment", sorted(INCREMENTS))
+def test_benchmark_encode(increment, use_msgpack, benchmark):
+    buf = RedisBuffer()
+    _, filters, extra = INCREMENTS[increment]
+
+    payload = benchmark(encode, buf, filters, extra, use_msgpack)
+    benchmark.extra_info["bytes"] = sum(len(v) for v in payload.values())
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("use_msgpack", [False, True], ids=["pickle", "msgpack"])
+@pytest.mark.parametrize("increment", sorted(INCREMENTS))
+def test_benchmark_decode(increment, use_msgpack, benchmark):
+    buf = RedisBuffer()
+    _, filters, extra = INCREMENTS[increment]
+    payload = encode(buf, filters, extra, use_msgpack)
+
+    benchmark(decode, buf, payload)
@@ -4,9 +4,10 @@ from datetime import datetime
 from django.utils import timezone
 from django.utils.encoding import force_text
 
-from sentry.buffer.redis import RedisBuffer
-from sentry.models import Group, Project
+from sentry.buffer.redis import MSGPACK_PREFIX, RedisBuffer
+from sentry.models import Group, Project, ReleaseProject
 from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.compat import mock
 
 
@@ -183,6 +184,64 @@ class RedisBufferTest(TestCase):
         self.buf.process("foo")
         process.assert_called_once_with(mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, True)
 
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    @mock.patch("sentry.buffer.redis.process_incr", mock.Mock())
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_incr_msgpack_roundtrip(self, process):
+        now = datetime(2017, 5, 3, 6, 6, 6, 123456, tzinfo=timezone.utc)
+        client = self.buf.cluster.get_routing_client()
+        columns = {"times_seen": 1}
+        filters = {"pk": 1, "datetime": now}
+        score = {1, 2}
+        counts = {1: "a", 2: ["b"]}
+        pair = ("a", 1)
+        extra = {"foo": "bar", "datetime": now, "score": score, "counts": counts, "pair": pair}
+        with override_options({"buffer.write-msgpack": True}):
+            self.buf.incr(Group, columns, filters, extra=extra)
+
+        result = {force_text(k): v for k, v in client.hgetall("foo").items()}
+        assert result["f"].startswith(MSGPACK_PREFIX)
+        assert result["e+foo"].startswith(MSGPACK_PREFIX)
+        assert result["e+datetime"].startswith(MSGPACK_PREFIX)
+        # values msgpack cannot represent fall back to pickle
+        assert pickle.loads(result["e+score"]) == score
+        assert result["e+counts"].startswith(MSGPACK_PREFIX)
+        # tuples would come back as lists
+        assert pickle.loads(result["e+pair"]) == pair
+
+        self.buf.process("foo")
+        process.assert_called_once_with(Group, columns, filters, extra, None)
+
+    @mock.patch("sentry.buffer.redis.process_incr", mock.Mock())
+    @mock.patch("sentry.buffer.base.Buffer.process_batch")
+    def test_process_batched(self, process_batch):
+        group = self.create_group()
+        release_project = self.create_release(project=self.project).releaseproject_set.get()
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+
+        self.buf.incr(Group, {"times_seen": 2}, {"id": group.id}, extra={"last_seen": now})
+        self.buf.incr(Group, {"times_seen": 1}, {"id": group.id})
+        self.buf.incr(ReleaseProject, {"new_groups": 1}, {"id": release_project.id})
+        keys = [
+            self.buf._make_key(Group, {"id": group.id}),
+            self.buf._make_key(ReleaseProject, {"id": release_project.id}),
+        ]
+
+        with override_options({"buffer.process-batched": True}):
+            self.buf.process(batch_keys=keys)
+
+        assert sorted(process_batch.mock_calls, key=lambda c: c[1][0].__name__) == [
+            mock.call(Group, [[{"times_seen": 3}, {"id": group.id}, {"last_seen": now}, None]]),
+            mock.call(ReleaseProject, [[{"new_groups": 1}, {"id": release_project.id}, {}, None]]),
+        ]
+
+        # hashes and pending keys are drained, locks released
+        client = self.buf.cluster.get_routing_client()
+        for key in keys:
+            assert client.hgetall(key) == {}
+            assert client.get(self.buf._make_lock_key(key)) is None
+        assert client.zrange("b:p", 0, -1) == []
+
     """
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     def test_incr_uses_signal_only(self):
@@ -1,12 +1,13 @@
 from django.db import IntegrityError
 
-from sentry.data_export.base import ExportQueryType
+from sentry.data_export.base import EXPORT_SHARD_OFFSET_STRIDE, ExportQueryType
 from sentry.data_export.models import ExportedData
-from sentry.data_export.tasks import assemble_download, merge_export_blobs
+from sentry.data_export.tasks import assemble_download, finish_export_shard, merge_export_blobs
 from sentry.exceptions import InvalidSearchQuery
 from sentry.models import File
 from sentry.testutils import SnubaTestCase, TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.compat.mock import patch
 from sentry.utils.samples import load_data
 from sentry.utils.snuba import (
@@ -223,6 +224,24 @@ class AssembleDownloadTest(TestCase, SnubaTestCase):
 
         assert emailer.called
 
+    @patch("sentry.data_export.models.ExportedData.email_success")
+    def test_discover_keyset_same_timestamp(self, emailer):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=ExportQueryType.DISCOVER,
+            query_info={"project": [self.project.id], "field": ["environment"], "query": ""},
+        )
+        # all events share a timestamp, so pages are only told apart by the rows they skip
+        with override_options({"dataexport.discover-keyset-shards": 1}), self.tasks():
+            assemble_download(de.id, batch_size=1)
+        de = ExportedData.objects.get(id=de.id)
+        header, *rows = de._get_file().getfile().read().strip().split(b"\r\n")
+        assert header == b"environment"
+        assert sorted(rows) == [b"dev", b"prod", b"prod"]
+
+        assert emailer.called
+
     @patch("sentry.data_export.models.ExportedData.email_success")
     def test_discover_respects_selected_environment(self, emailer):
         de = ExportedData.objects.create(
@@ -653,6 +672,50 @@ class AssembleDownloadLargeTest(TestCase, SnubaTestCase):
 
         assert emailer.called
 
+    @patch("sentry.data_export.tasks.MAX_BATCH_SIZE", 200)
+    @patch("sentry.data_export.models.ExportedData.email_success")
+    def test_discover_keyset_shards(self, emailer):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=ExportQueryType.DISCOVER,
+            query_info={
+                "project": [self.project.id],
+                "field": ["title"],
+                "query": "",
+                "statsPeriod": "2m",
+            },
+        )
+        with override_options({"dataexport.discover-keyset-shards": 3}), self.tasks():
+            assemble_download(de.id, batch_size=3)
+        de = ExportedData.objects.get(id=de.id)
+        assert de.date_finished is not None
+        header, *rows = de._get_file().getfile().read().strip().split(b"\r\n")
+        assert header == b"title"
+        # newest first, without gaps or duplicates across shards and pages
+        assert rows == [f"/event/{i:03d}/".encode() for i in range(50)]
+
+        assert emailer.called
+
+
+class FinishExportShardTest(TestCase):
+    @patch("sentry.data_export.tasks.merge_export_blobs.delay")
+    def test_last_shard_schedules_merge(self, merge):
+        finish_export_shard(1234, 1, 3, 10, False)
+        finish_export_shard(1234, 0, 3, 10, False)
+        assert not merge.called
+
+        finish_export_shard(1234, 2, 3, 10, False)
+        merge.assert_called_once_with(1234, max_offset=3 * EXPORT_SHARD_OFFSET_STRIDE)
+
+    @patch("sentry.data_export.tasks.merge_export_blobs.delay")
+    def test_truncated_shard(self, merge):
+        # shards after a truncated one are left out
+        finish_export_shard(1235, 2, 3, 10, False)
+        finish_export_shard(1235, 1, 3, 10, True)
+        finish_export_shard(1235, 0, 3, 10, False)
+        merge.assert_called_once_with(1235, max_offset=2 * EXPORT_SHARD_OFFSET_STRIDE)
+
 
 class MergeExportBlobsTest(TestCase, SnubaTestCase):
     def test_task_persistent_name(self):
@@ -0,0 +1,134 @@
+import threading
+from unittest import TestCase as BaseTestCase
+
+from django.test.utils import override_settings
+
+from sentry.db.models.manager.local_cache import LocalModelCache
+from sentry.models import Project
+from sentry.testutils import TestCase
+from sentry.utils.compat.mock import MagicMock, patch
+
+
+class LocalModelCacheTest(BaseTestCase):
+    def test_get_many(self):
+        cache = LocalModelCache(ttl=10, max_size=2)
+        load = MagicMock(side_effect=lambda keys: {key: key.upper() for key in keys if key != "c"})
+
+        assert cache.get_many(["a", "b", "c"], load) == {"a": "A", "b": "B"}
+        assert cache.get_many(["a", "b"], load) == {"a": "A", "b": "B"}
+        assert load.call_count == 1
+        assert len(cache) == 2
+
+    def test_returns_copies(self):
+        cache = LocalModelCache(ttl=10, max_size=10)
+        load = MagicMock(side_effect=lambda keys: {key: {"name": key} for key in keys})
+
+        first = cache.get_many(["a"], load)["a"]
+        first["name"] = "changed"
+        second = cache.get_many(["a"], load)["a"]
+        assert second == {"name": "a"}
+        assert cache.get_many(["a"], load)["a"] is not second
+        assert load.call_count == 1
+
+    def test_expiry(self):
+        cache = LocalModelCache(ttl=10, max_size=10)
+        load = MagicMock(side_effect=lambda keys: {key: key.upper() for key in keys})
+
+        cache.get_many(["a"], load)
+        with patch("sentry.db.models.manager.local_cache.time.monotonic", return_value=1e12):
+            cache.get_many(["a"], load)
+        assert load.call_count == 2
+
+    def test_set_version(self):
+        cache = LocalModelCache(ttl=10, max_size=10)
+        cache.get_many(["a"], lambda keys: {"a": "A"})
+
+        cache.set_version(None)
+        assert len(cache) == 1
+        cache.set_version("1")
+        assert len(cache) == 0
+
+    def test_clear_during_load(self):
+        cache = LocalModelCache(ttl=10, max_size=10)
+
+        def load(keys):
+            cache.clear()
+            return {"a": "A"}
+
+        assert cache.get_many(["a"], load) == {"a": "A"}
+        assert len(cache) == 0
+
+    def test_coalesce_misses(self):
+        cache = LocalModelCache(ttl=10, max_size=10)
+        loading = threading.Event()
+        release = threading.Event()
+
+        def slow_load(keys):
+            loading.set()
+            release.wait()
+            return {"a": "A"}
+
+        thread = threading.Thread(target=cache.get_many, args=(["a"], slow_load))
+        thread.start()
+        loading.wait()
+
+        load = MagicMock(return_value={"a": "other"})
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(cache.get_many(["a"], load)))
+        waiter.start()
+        release.set()
+        thread.join()
+        waiter.join()
+
+        assert results == [{"a": "A"}]
+        assert not load.called
+
+
+@override_settings(SENTRY_MODEL_LOCAL_CACHE_TTLS={"sentry.project": 10})
+class LocalTierTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        Project.objects._local_tier = None
+
+    def tearDown(self):
+        Project.objects._local_tier = None
+        super().tearDown()
+
+    def test_get_from_cache(self):
+        project = self.create_project()
+
+        cached = Project.objects.get_from_cache(id=project.id)
+        assert cached == project
+
+        cached.name = "changed"
+        with self.assertNumQueries(0):
+            result = Project.objects.get_from_cache(id=project.id)
+            assert result == project
+            assert result is not cached
+            assert result.name == project.name
+            (result,) = Project.objects.get_many_from_cache([project.id])
+            assert result == project
+            assert result is not cached
+
+    def test_invalidated_on_save(self):
+        project = self.create_project(name="foo")
+        Project.objects.get_from_cache(id=project.id)
+
+        project.name = "bar"
+        project.save()
+        assert len(Project.objects._local_tier) == 0
+        assert Project.objects.get_from_cache(id=project.id).name == "bar"
+
+    def test_invalidated_by_other_process(self):
+        project = self.create_project()
+        cached = Project.objects.get_from_cache(id=project.id)
+
+        # another process saves a project and bumps the shared version key
+        local_tier = Project.objects._local_tier
+        Project.objects._local_tier = None
+        project.save()
+        Project.objects._local_tier = local_tier
+        local_tier.version_checked_at = 0
+
+        assert Project.objects.get_from_cache(id=project.id) is not cached
+        assert local_tier.version is not None
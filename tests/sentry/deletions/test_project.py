@@ -19,6 +19,7 @@ from sentry.models import (
 )
 from sentry.tasks.deletion import run_deletion
 from sentry.testutils import TransactionTestCase
+from sentry.testutils.helpers.options import override_options
 
 
 class DeleteProjectTest(TransactionTestCase):
@@ -95,3 +96,7 @@ class DeleteProjectTest(TransactionTestCase):
         assert not ProjectDebugFile.objects.filter(id=dif.id).exists()
         assert not File.objects.filter(id=file.id).exists()
         assert not ServiceHook.objects.filter(id=hook.id).exists()
+
+    def test_set_based(self):
+        with override_options({"deletions.set-based": True}):
+            self.test_simple()
@@ -6,7 +6,7 @@ from time import time
 import pytest
 from django.utils import timezone
 
-from sentry import nodestore
+from sentry import event_manager, nodestore
 from sentry.app import tsdb
 from sentry.attachments import CachedAttachment, attachment_cache
 from sentry.constants import MAX_VERSION_LENGTH, DataCategory
@@ -15,6 +15,7 @@ from sentry.event_manager import (
     EventUser,
     HashDiscarded,
     has_pending_commit_resolution,
+    save_error_events,
 )
 from sentry.eventstore.models import Event
 from sentry.grouping.utils import hash_from_values
@@ -40,6 +41,7 @@ from sentry.models import (
     UserReport,
 )
 from sentry.testutils import TestCase, assert_mock_called_once_with_partial
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.cache import cache_key_for_event
 from sentry.utils.compat import mock
 from sentry.utils.outcomes import Outcome
@@ -1798,6 +1800,144 @@ class EventManagerTest(TestCase):
         assert mechanism.synthetic is True
         assert event.title == "foo"
 
+    def test_grouphashes_created_in_bulk(self):
+        manager = EventManager(make_event(message="foo", fingerprint=["a", "b"]))
+        manager.normalize()
+        event = manager.save(self.project.id)
+
+        hashes = event.get_hashes().hashes
+        assert len(hashes) == 1
+        grouphash = GroupHash.objects.get(project=self.project, hash=hashes[0])
+        assert grouphash.group_id == event.group_id
+
+    @override_options({"store.grouphash-cache-ttl": 60})
+    def test_grouphash_cache(self):
+        manager = EventManager(make_event(message="foo", fingerprint=["a"]))
+        manager.normalize()
+        event = manager.save(self.project.id)
+
+        hashes = event.get_hashes().hashes
+        assert GroupHash.get_group_ids_from_cache(self.project.id, hashes) == {
+            hashes[0]: event.group_id
+        }
+
+        manager = EventManager(make_event(message="foo", fingerprint=["a"]))
+        manager.normalize()
+        with mock.patch(
+            "sentry.event_manager._get_or_create_grouphashes_many"
+        ) as get_or_create_grouphashes:
+            event2 = manager.save(self.project.id)
+
+        assert get_or_create_grouphashes.call_count == 0
+        assert event2.group_id == event.group_id
+        assert Group.objects.get(id=event.group_id).times_seen == 2
+
+        GroupHash.invalidate_cache_for_groups(self.project.id, [event.group_id])
+        assert GroupHash.get_group_ids_from_cache(self.project.id, hashes) == {}
+
+    @override_options({"store.grouphash-cache-ttl": 60})
+    def test_grouphash_cache_ignores_deleted_group(self):
+        self._assert_grouphash_cache_ignores_group_status(GroupStatus.PENDING_DELETION)
+
+    @override_options({"store.grouphash-cache-ttl": 60})
+    def test_grouphash_cache_ignores_reprocessing_group(self):
+        self._assert_grouphash_cache_ignores_group_status(GroupStatus.REPROCESSING)
+
+    @override_options({"store.grouphash-cache-ttl": 60})
+    def test_grouphash_cache_invalidated_by_unmerge_lock(self):
+        from sentry.tasks.unmerge import lock_hashes
+
+        manager = EventManager(make_event(message="foo", fingerprint=["a"]))
+        manager.normalize()
+        event = manager.save(self.project.id)
+
+        hashes = event.get_hashes().hashes
+        assert lock_hashes(self.project.id, event.group_id, hashes) == hashes
+        assert GroupHash.get_group_ids_from_cache(self.project.id, hashes) == {}
+
+    def _assert_grouphash_cache_ignores_group_status(self, status):
+        manager = EventManager(make_event(message="foo", fingerprint=["a"]))
+        manager.normalize()
+        event = manager.save(self.project.id)
+
+        Group.objects.filter(id=event.group_id).update(status=status)
+
+        manager = EventManager(make_event(message="foo", fingerprint=["a"]))
+        manager.normalize()
+        with mock.patch(
+            "sentry.event_manager._get_or_create_grouphashes_many",
+            wraps=event_manager._get_or_create_grouphashes_many,
+        ) as get_or_create_grouphashes:
+            manager.save(self.project.id)
+
+        assert get_or_create_grouphashes.call_count == 1
+
+    def test_save_error_events_batch(self):
+        jobs = []
+        for event_id, message in (("a" * 32, "foo"), ("b" * 32, "foo"), ("c" * 32, "bar")):
+            manager = EventManager(
+                make_event(
+                    event_id=event_id,
+                    message=message,
+                    fingerprint=[message],
+                    release="1.0",
+                    environment="prod",
+                )
+            )
+            manager.normalize()
+            jobs.append(
+                {"data": manager.get_data(), "project_id": self.project.id, "start_time": time()}
+            )
+
+        saved_jobs = save_error_events(jobs, {self.project.id: self.project})
+
+        assert len(saved_jobs) == 3
+        assert all(job["discarded"] is None for job in saved_jobs)
+
+        group1, group2, group3 = (job["group"] for job in saved_jobs)
+        assert group1.id == group2.id
+        assert group1.id != group3.id
+        assert [job["is_new"] for job in saved_jobs] == [True, False, True]
+        assert [job["is_new_group_environment"] for job in saved_jobs] == [True, False, True]
+
+        assert Release.objects.filter(version="1.0", projects=self.project).count() == 1
+        assert Environment.objects.filter(name="prod", projects=self.project).count() == 1
+        assert GroupRelease.objects.filter(group_id=group1.id).count() == 1
+
+        for job in saved_jobs:
+            node_id = Event.generate_node_id(self.project.id, job["event"].event_id)
+            assert nodestore.get(node_id)["event_id"] == job["event"].event_id
+
+    def test_save_error_events_batch_discarded(self):
+        manager = EventManager(make_event(message="foo"))
+        manager.normalize()
+        event = manager.save(self.project.id)
+
+        group = event.group
+        tombstone = GroupTombstone.objects.create(
+            project_id=group.project_id,
+            level=group.level,
+            message=group.message,
+            culprit=group.culprit,
+            data=group.data,
+            previous_group_id=group.id,
+        )
+        GroupHash.objects.filter(group=group).update(group=None, group_tombstone_id=tombstone.id)
+
+        jobs = []
+        for message in ("foo", "bar"):
+            manager = EventManager(make_event(message=message))
+            manager.normalize()
+            jobs.append(
+                {"data": manager.get_data(), "project_id": self.project.id, "start_time": time()}
+            )
+
+        saved_jobs = save_error_events(jobs, {self.project.id: self.project})
+
+        assert saved_jobs == [jobs[1]]
+        assert isinstance(jobs[0]["discarded"], HashDiscarded)
+        assert jobs[1]["discarded"] is None
+
 
 class ReleaseIssueTest(TestCase):
     def setUp(self):
@@ -1,22 +1,18 @@
+import copy
+
 import pytest
 
 from sentry.grouping.api import get_default_grouping_config_dict
+from sentry.grouping.enhancer import Enhancements
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
+from sentry.testutils.skips import requires_pytest_benchmark
+from sentry.utils.safe import get_path
 from tests.sentry.grouping import grouping_input as grouping_inputs
 
 CONFIGS = {key: get_default_grouping_config_dict(key) for key in sorted(CONFIGURATIONS.keys())}
 
 
-def benchmark_available():
-    try:
-        import pytest_benchmark  # NOQA
-    except ModuleNotFoundError:
-        return False
-    else:
-        return True
-
-
-@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@requires_pytest_benchmark
 @pytest.mark.parametrize(
     "config_name", sorted(CONFIGURATIONS.keys()), ids=lambda x: x.replace("-", "_")
 )
@@ -37,3 +33,34 @@ def run_configuration(grouping_input, config):
     event.project = None
 
     event.get_hashes()
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize(
+    "config_name", sorted(CONFIGURATIONS.keys()), ids=lambda x: x.replace("-", "_")
+)
+def test_benchmark_enhancements(config_name, benchmark):
+    enhancements = Enhancements.loads(CONFIGS[config_name]["enhancements"])
+    stacktraces = [
+        (stacktrace["frames"], stacktrace.get("platform") or data.get("platform"))
+        for data in (grouping_input.data for grouping_input in grouping_inputs)
+        for stacktrace in _iter_stacktraces(data)
+    ]
+
+    def run():
+        for frames, platform in stacktraces:
+            frames = copy.deepcopy(frames)
+            enhancements.apply_modifications_to_frame(frames, platform, None)
+
+    benchmark(run)
+
+
+def _iter_stacktraces(data):
+    for exception in get_path(data, "exception", "values", filter=True) or ():
+        if get_path(exception, "stacktrace", "frames"):
+            yield exception["stacktrace"]
+    for thread in get_path(data, "threads", "values", filter=True) or ():
+        if get_path(thread, "stacktrace", "frames"):
+            yield thread["stacktrace"]
+    if get_path(data, "stacktrace", "frames"):
+        yield data["stacktrace"]
@@ -418,3 +418,37 @@ def test_sentinel_and_prefix(action, type):
     actions[0][1].update_frame_components_contributions([component], frames, 0)
     expected = True if action == "+" else False
     assert getattr(component, f"is_{type}_frame") is expected
+
+
+def test_candidate_rules():
+    enhancement = Enhancements.from_config_string(
+        """
+        family:native function:std::*                  -app
+        family:javascript module:react-dom             -group
+        function:foo*                                  +app
+        !function:bar                                  -group
+        [ function:baz ] | function:qux                +group
+    """
+    )
+    native_rule, js_rule, foo_rule, bar_rule, caller_rule = enhancement.rules
+
+    frames = [
+        create_match_frame({"function": "std::vector"}, "native"),
+        create_match_frame({"function": "foobar"}, "native"),
+    ]
+    assert enhancement._get_candidate_rules(True, frames) == [native_rule, foo_rule]
+    assert enhancement._get_candidate_rules(False, frames) == [native_rule, foo_rule, bar_rule]
+
+    frames = [
+        create_match_frame({"function": "baz", "module": "react-dom"}, "javascript"),
+        create_match_frame({"function": "qux", "module": "react"}, "javascript"),
+    ]
+    assert enhancement._get_candidate_rules(True, frames) == []
+    assert enhancement._get_candidate_rules(False, frames) == [js_rule, bar_rule, caller_rule]
+
+
+def test_loads_cached():
+    enhancement = Enhancements.from_config_string("function:foo +app")
+    dumped = enhancement.dumps()
+    assert Enhancements.loads(dumped) is Enhancements.loads(dumped)
+    assert Enhancements.loads(dumped).rules[0].as_dict() == enhancement.rules[0].as_dict()
@@ -33,12 +33,14 @@ from sentry.incidents.subscription_processor import (
     get_alert_rule_stats,
     get_redis_client,
     partition,
+    prefetch_subscription_processors,
     update_alert_rule_stats,
 )
 from sentry.models import Integration
 from sentry.snuba.models import QuerySubscription, SnubaQueryEventType
 from sentry.testutils import SnubaTestCase, TestCase
 from sentry.testutils.helpers.datetime import iso_format
+from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
 from sentry.utils.compat import map
 from sentry.utils.compat.mock import Mock, call
@@ -1144,6 +1146,32 @@ class ProcessUpdateTest(TestCase, SnubaTestCase):
         self.assert_trigger_exists_with_status(incident, trigger, TriggerStatus.RESOLVED)
         self.assert_actions_resolved_for_incident(incident, [self.action])
 
+    def test_comparison_alert_cached_value(self):
+        rule = self.comparison_rule_above
+        comparison_delta = timedelta(seconds=rule.comparison_delta)
+        trigger = self.trigger
+        with override_options({"incidents.comparison-value-cache": True}):
+            processor = self.send_update(
+                rule, 4, timedelta(minutes=-10) - comparison_delta, subscription=self.sub
+            )
+            # Nothing was recorded for the comparison period, and there are no events in it
+            self.assert_trigger_counts(processor, trigger, 0, 0)
+            self.assert_no_active_incident(rule)
+            self.metrics.incr.assert_any_call(
+                "incidents.alert_rules.comparison_value_cache", tags={"result": "miss"}
+            )
+
+            self.metrics.incr.reset_mock()
+            processor = self.send_update(rule, 7, timedelta(minutes=-10), subscription=self.sub)
+            # Should trigger, the previous update recorded 4 for the comparison period and
+            # 7/4 == 175% > 150%
+            self.metrics.incr.assert_any_call(
+                "incidents.alert_rules.comparison_value_cache", tags={"result": "hit"}
+            )
+            incident = self.assert_active_incident(rule)
+            self.assert_trigger_exists_with_status(incident, trigger, TriggerStatus.ACTIVE)
+            self.assert_actions_fired_for_incident(incident, [self.action])
+
 
 class TestBuildAlertRuleStatKeys(unittest.TestCase):
     def test(self):
@@ -1207,6 +1235,40 @@ class TestGetAlertRuleStats(TestCase):
         assert resolve_counts == {3: 2, 4: 4}
 
 
+class TestPrefetchSubscriptionProcessors(TestCase):
+    def test(self):
+        alert_rule = self.create_alert_rule()
+        sub = alert_rule.snuba_query.subscriptions.get()
+        critical = create_alert_rule_trigger(alert_rule, CRITICAL_TRIGGER_LABEL, 100)
+        warning = create_alert_rule_trigger(alert_rule, WARNING_TRIGGER_LABEL, 50)
+        other_sub = QuerySubscription.objects.create(
+            project=self.project, type="unregistered", subscription_id="other"
+        )
+        date = datetime.utcnow().replace(tzinfo=pytz.utc, microsecond=0)
+        update_alert_rule_stats(
+            alert_rule, sub, date, {critical.id: 2, warning.id: 1}, {critical.id: 3}
+        )
+
+        with self.assertNumQueries(2):
+            prefetched = prefetch_subscription_processors([sub, other_sub])
+        assert prefetched[other_sub.id].alert_rule is None
+        state = prefetched[sub.id]
+        assert state.alert_rule == alert_rule
+        assert state.triggers == [warning, critical]
+        assert state.stats == get_alert_rule_stats(alert_rule, sub, state.triggers)
+        assert state.stats[1] == {critical.id: 2, warning.id: 1}
+
+        # Alert rules and triggers are cached now
+        with self.assertNumQueries(0):
+            assert prefetch_subscription_processors([sub])[sub.id] == state
+
+        processor = SubscriptionProcessor(sub, prefetched=state)
+        assert processor.alert_rule == alert_rule
+        assert processor.triggers == [warning, critical]
+        assert processor.last_update == date
+        assert processor.trigger_resolve_counts == {critical.id: 3, warning.id: 0}
+
+
 class TestUpdateAlertRuleStats(TestCase):
     def test(self):
         alert_rule = AlertRule(id=1)
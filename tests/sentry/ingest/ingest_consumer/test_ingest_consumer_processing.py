@@ -1,17 +1,26 @@
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
+from django.core.cache import cache
 
+from sentry.attachments import attachment_cache
 from sentry.event_manager import EventManager
 from sentry.ingest.ingest_consumer import (
+    IngestConsumerWorker,
+    get_deduplication_key,
     process_attachment_chunk,
+    process_attachment_chunks,
     process_event,
     process_individual_attachment,
     process_userreport,
 )
 from sentry.models import EventAttachment, EventUser, File, UserReport
+from sentry.tasks.store import submit_save_event
+from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
+from sentry.utils.compat import mock
 
 
 def get_normalized_event(data, project):
@@ -312,3 +321,134 @@ def test_individual_attachments_missing_chunks(default_project, factories, monke
     attachments = list(EventAttachment.objects.filter(project_id=project_id, event_id=event_id))
 
     assert not attachments
+
+
+@pytest.mark.django_db
+def test_pipeline_preserves_order_per_event(default_project, monkeypatch):
+    calls = []
+
+    def record(name):
+        def inner(message, projects, **kwargs):
+            assert projects == {default_project.id: default_project}
+            calls.append((name, message["event_id"]))
+
+        return inner
+
+    def record_chunks(messages, projects):
+        for message in messages:
+            calls.append(("attachment_chunk", message["event_id"]))
+
+    monkeypatch.setattr("sentry.ingest.ingest_consumer.process_event", record("event"))
+    monkeypatch.setattr("sentry.ingest.ingest_consumer.process_attachment_chunks", record_chunks)
+    monkeypatch.setattr(
+        "sentry.ingest.ingest_consumer.process_individual_attachment", record("attachment")
+    )
+
+    event_ids = [uuid.uuid4().hex for _ in range(10)]
+    batch = []
+    for event_id in event_ids:
+        for message_type in ("event", "attachment", "attachment_chunk"):
+            batch.append(
+                {"type": message_type, "event_id": event_id, "project_id": default_project.id}
+            )
+
+    worker = IngestConsumerWorker(pipeline_executor=ThreadPoolExecutor(4))
+    try:
+        worker._flush_batch(batch)
+    finally:
+        worker.shutdown()
+
+    assert len(calls) == 30
+    # all chunks are written before any other message is processed
+    assert {name for name, _ in calls[:10]} == {"attachment_chunk"}
+    for event_id in event_ids:
+        assert [name for name, id in calls if id == event_id] == [
+            "attachment_chunk",
+            "event",
+            "attachment",
+        ]
+
+
+@pytest.mark.django_db
+def test_pipeline_batches_save_events(default_project, monkeypatch):
+    def save(message, projects, **kwargs):
+        submit_save_event(
+            project_id=message["project_id"],
+            from_reprocessing=False,
+            cache_key=f"e:{message['event_id']}",
+            event_id=message["event_id"],
+            start_time=1,
+            data=None,
+        )
+
+    monkeypatch.setattr("sentry.ingest.ingest_consumer.process_event", save)
+
+    event_ids = [uuid.uuid4().hex for _ in range(10)]
+    batch = [
+        {"type": "event", "event_id": event_id, "project_id": default_project.id}
+        for event_id in event_ids
+    ]
+
+    worker = IngestConsumerWorker(pipeline_executor=ThreadPoolExecutor(4))
+    try:
+        with override_options({"store.save-event-many-sample-rate": 1.0}), mock.patch(
+            "sentry.tasks.store.save_event"
+        ) as save_event, mock.patch("sentry.tasks.store.save_event_many") as save_event_many:
+            worker.flush_batch(batch)
+    finally:
+        worker.shutdown()
+
+    # events saved on the pipeline workers end up in the batch of the consumer
+    assert save_event.delay.call_count == 0
+    ((_, _, kwargs),) = save_event_many.delay.mock_calls
+    assert sorted(event["event_id"] for event in kwargs["events"]) == sorted(event_ids)
+
+
+@pytest.mark.django_db
+def test_batch_deduplication(default_project, preprocess_event):
+    project_id = default_project.id
+    start_time = time.time() - 3600
+    messages = {}
+    for message in ("hello", "world"):
+        payload = get_normalized_event({"message": message}, default_project)
+        messages[message] = {
+            "type": "event",
+            "payload": json.dumps(payload),
+            "start_time": start_time,
+            "event_id": payload["event_id"],
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+        }
+
+    # "hello" was processed by an earlier batch, "world" is duplicated within this one
+    cache.set(get_deduplication_key(project_id, messages["hello"]["event_id"]), "", 60)
+
+    IngestConsumerWorker()._flush_batch([messages["hello"], messages["world"], messages["world"]])
+
+    (kwargs,) = preprocess_event
+    assert kwargs["event_id"] == messages["world"]["event_id"]
+    assert cache.get(get_deduplication_key(project_id, messages["world"]["event_id"])) == ""
+
+
+@pytest.mark.django_db
+def test_attachment_chunks_batch(default_project):
+    event_id = uuid.uuid4().hex
+    attachment_id = "ca90fb45-6dd9-40a0-a18f-8693aa621abb"
+    process_attachment_chunks(
+        [
+            {
+                "payload": payload,
+                "event_id": event_id,
+                "project_id": default_project.id,
+                "id": attachment_id,
+                "chunk_index": chunk_index,
+            }
+            for chunk_index, payload in enumerate((b"Hello ", b"World!"))
+        ],
+        projects={default_project.id: default_project},
+    )
+
+    attachment = attachment_cache.get_from_chunks(
+        key=f"e:{event_id}:{default_project.id}", id=attachment_id, chunks=2
+    )
+    assert attachment.data == b"Hello World!"
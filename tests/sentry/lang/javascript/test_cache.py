@@ -1,6 +1,7 @@
 from unittest import TestCase
 
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import ParsedArtifactCache, SourceCache
+from sentry.utils.compat.mock import MagicMock
 
 
 class BasicCacheTest(TestCase):
@@ -37,3 +38,41 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == "foobar"
+
+
+class ParsedArtifactCacheTest(TestCase):
+    def test_get_or_parse(self):
+        cache = ParsedArtifactCache()
+        parse_fn = MagicMock(side_effect=lambda: object())
+
+        view = cache.get_or_parse("a", 10, parse_fn, max_size=25, kind="source")
+        assert cache.get_or_parse("a", 10, parse_fn, max_size=25, kind="source") is view
+        assert parse_fn.call_count == 1
+        assert len(cache) == 1
+        assert cache.size == 10
+
+    def test_disabled(self):
+        cache = ParsedArtifactCache()
+        parse_fn = MagicMock(side_effect=lambda: object())
+
+        cache.get_or_parse("a", 10, parse_fn, max_size=0, kind="source")
+        cache.get_or_parse("a", 10, parse_fn, max_size=0, kind="source")
+        assert parse_fn.call_count == 2
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = ParsedArtifactCache()
+
+        a = cache.get_or_parse("a", 10, object, max_size=25, kind="source")
+        cache.get_or_parse("b", 10, object, max_size=25, kind="source")
+        # touch "a" so that "b" is evicted first
+        assert cache.get_or_parse("a", 10, object, max_size=25, kind="source") is a
+        cache.get_or_parse("c", 10, object, max_size=25, kind="source")
+
+        assert len(cache) == 2
+        assert cache.size == 20
+        assert cache.get_or_parse("a", 10, object, max_size=25, kind="source") is a
+
+        # too large to be cached at all
+        cache.get_or_parse("d", 30, object, max_size=25, kind="source")
+        assert len(cache) == 2
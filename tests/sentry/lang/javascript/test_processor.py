@@ -8,6 +8,7 @@ from io import BytesIO
 import pytest
 import responses
 from requests.exceptions import RequestException
+from sentry_sdk import Hub
 from symbolic import SourceMapTokenMatch
 
 from sentry import http, options
@@ -25,6 +26,7 @@ from sentry.lang.javascript.processor import (
     fetch_sourcemap,
     generate_module,
     get_max_age,
+    get_parsed_artifact,
     get_release_file_cache_key,
     get_release_file_cache_key_meta,
     should_retry_fetch,
@@ -1024,6 +1026,17 @@ class FetchSourcemapTest(TestCase):
             fetch_sourcemap("http://example.com")
 
 
+class GetParsedArtifactTest(unittest.TestCase):
+    @patch("sentry.lang.javascript.processor.sha1_text")
+    def test_disabled_cache_skips_hashing(self, sha1_text):
+        parse_fn = MagicMock(return_value="view")
+        with override_options({"processing.js-parsed-artifact-cache-size": 0}):
+            assert get_parsed_artifact("source", b"foo", parse_fn) == "view"
+
+        assert parse_fn.call_count == 1
+        assert not sha1_text.called
+
+
 class TrimLineTest(unittest.TestCase):
     long_line = "The public is more familiar with bad design than good design. It is, in effect, conditioned to prefer bad design, because that is what it lives with. The new becomes threatening, the old reassuring."
 
@@ -1372,3 +1385,96 @@ class CacheSourceTest(TestCase):
         # now we have an error
         assert len(processor.cache.get_errors(abs_path)) == 1
         assert processor.cache.get_errors(abs_path)[0] == {"url": map_url, "type": "js_no_source"}
+
+    @patch("sentry.lang.javascript.processor.fetch_sourcemap")
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_cache_sources_concurrently(self, mock_fetch_file, mock_fetch_sourcemap):
+        def fetch_file(url, **kwargs):
+            if url.endswith("missing.js"):
+                raise http.BadSource({"type": EventError.JS_MISSING_SOURCE, "url": url})
+            return http.UrlResult(
+                url, {}, b"foo()\n//# sourceMappingURL=bundle.js.map", 200, "utf-8"
+            )
+
+        def fetch_sourcemap(url, **kwargs):
+            if url == "http://example.com/broken/bundle.js.map":
+                raise UnparseableSourcemap({"url": url})
+            sourcemap_view = MagicMock()
+            sourcemap_view.iter_sources.return_value = []
+            return sourcemap_view
+
+        mock_fetch_file.side_effect = fetch_file
+        mock_fetch_sourcemap.side_effect = fetch_sourcemap
+
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+
+        filenames = [
+            "http://example.com/a.js",
+            "http://example.com/b.js",
+            "http://example.com/missing.js",
+            "http://example.com/broken/c.js",
+            "http://example.com/broken/d.js",
+        ]
+        processor.cache_sources_concurrently(filenames, 3)
+
+        assert processor.fetch_count == 5
+        assert mock_fetch_file.call_count == 5
+        # sourcemaps shared by multiple files are only fetched once
+        assert mock_fetch_sourcemap.call_count == 2
+
+        for filename in filenames[:2]:
+            assert processor.cache.get(filename)
+            assert processor.cache.get_errors(filename) == []
+            assert processor.sourcemaps.get_link(filename)
+
+        assert processor.cache.get_errors("http://example.com/missing.js") == [
+            {"type": EventError.JS_MISSING_SOURCE, "url": "http://example.com/missing.js"}
+        ]
+        for filename in filenames[3:]:
+            assert processor.cache.get_errors(filename) == [
+                {
+                    "type": EventError.JS_INVALID_SOURCEMAP,
+                    "url": "http://example.com/broken/bundle.js.map",
+                }
+            ]
+
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_cache_sources_concurrently_max_fetches(self, mock_fetch_file):
+        mock_fetch_file.side_effect = lambda url, **kwargs: http.UrlResult(
+            url, {}, b"foo()", 200, "utf-8"
+        )
+
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+        processor.max_fetches = 2
+
+        filenames = [f"http://example.com/{i}.js" for i in range(4)]
+        processor.cache_sources_concurrently(filenames, 3)
+
+        assert mock_fetch_file.call_count == 2
+        assert [processor.cache.get_errors(filename) for filename in filenames[2:]] == [
+            [{"type": EventError.JS_TOO_MANY_REMOTE_SOURCES}],
+            [{"type": EventError.JS_TOO_MANY_REMOTE_SOURCES}],
+        ]
+
+    @patch("sentry.lang.javascript.processor.connections")
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_cache_sources_concurrently_hub(self, mock_fetch_file, mock_connections):
+        fetch_tags = []
+
+        def fetch_file(url, **kwargs):
+            fetch_tags.append(Hub.current.scope._tags.get("fetch"))
+            return http.UrlResult(url, {}, b"foo()", 200, "utf-8")
+
+        mock_fetch_file.side_effect = fetch_file
+
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+
+        with Hub(Hub.current) as hub:
+            hub.scope.set_tag("fetch", "caller")
+            processor.cache_sources_concurrently(["http://example.com/a.js"], 3)
+
+        assert fetch_tags == ["caller"]
+        assert mock_connections.close_all.call_count == 1
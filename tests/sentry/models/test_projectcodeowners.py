@@ -93,3 +93,4 @@ class ProjectCodeOwnersTestCase(TestCase):
                 },
             ],
         }
+        assert merged.schema_version == tuple((c.id, c.date_updated) for c in code_owners)
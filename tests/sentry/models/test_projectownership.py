@@ -230,6 +230,46 @@ class ProjectOwnershipTestCase(TestCase):
             self.project.id, {"stacktrace": {"frames": [{"filename": "src/foo.py"}]}}
         ) == (True, [self.user, self.team], False)
 
+    def test_get_compiled_rules(self):
+        rule_a = Rule(Matcher("path", "*.py"), [Owner("team", self.team.slug)])
+        rule_b = Rule(Matcher("codeowners", "src/"), [Owner("user", self.user.email)])
+
+        schema = dump_schema([rule_a, rule_b])
+        compiled = ProjectOwnership.get_compiled_rules(self.project.id, schema)
+        assert compiled.rules == [rule_a, rule_b]
+        assert (
+            ProjectOwnership.get_compiled_rules(self.project.id, dump_schema([rule_a, rule_b]))
+            is compiled
+        )
+
+        # A changed schema is compiled again
+        updated = ProjectOwnership.get_compiled_rules(self.project.id, dump_schema([rule_a]))
+        assert updated is not compiled
+        assert updated.rules == [rule_a]
+
+    def test_get_compiled_rules_by_version(self):
+        rule_a = Rule(Matcher("path", "*.py"), [Owner("team", self.team.slug)])
+        rule_b = Rule(Matcher("path", "src/*"), [Owner("user", self.user.email)])
+        ownership = ProjectOwnership.objects.create(
+            project_id=self.project.id, schema=dump_schema([rule_a])
+        )
+
+        version = ProjectOwnership.get_schema_version(ownership=ownership)
+        compiled = ProjectOwnership.get_compiled_rules(self.project.id, ownership.schema, version)
+        assert compiled.rules == [rule_a]
+        # The schema is not looked at as long as the version is the same
+        assert (
+            ProjectOwnership.get_compiled_rules(self.project.id, dump_schema([rule_b]), version)
+            is compiled
+        )
+
+        # Every save results in a new version
+        ownership.schema = dump_schema([rule_b])
+        ownership.save()
+        version = ProjectOwnership.get_schema_version(ownership=ownership)
+        updated = ProjectOwnership.get_compiled_rules(self.project.id, ownership.schema, version)
+        assert updated.rules == [rule_b]
+
 
 class ResolveActorsTestCase(TestCase):
     def test_no_actors(self):
@@ -4,9 +4,10 @@ from datetime import timedelta
 import pytest
 from django.utils import timezone
 
-from sentry.nodestore.base import json_dumps
+from sentry.nodestore.base import json_dumps, local_bytes_cache
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from sentry.nodestore.django.models import Node
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.compat import mock
 from sentry.utils.strings import compress
 
@@ -132,3 +133,52 @@ class TestDjangoNodeStorage:
             self.ns.get("node_4")
             self.ns.get("node_4")
             assert mock_get.call_count == 2
+
+    def test_bytes_cache(self):
+        node_id = "a" * 32
+        local_bytes_cache.clear()
+
+        with override_options(
+            {"nodestore.local-cache-size": 1024 * 1024, "nodestore.cache-bytes": True}
+        ):
+            self.ns.set_subkeys(node_id, {None: {"foo": "a"}, "unprocessed": {"foo": "b"}})
+            # decoded nodes are not cached, raw payloads are in both tiers
+            assert self.ns.cache.get(node_id) is None
+            assert self.ns.cache.get(self.ns._get_bytes_cache_key(node_id)) is not None
+            assert local_bytes_cache.get(node_id) is not None
+
+            with mock.patch.object(Node.objects, "get") as mock_get:
+                assert self.ns.get(node_id) == {"foo": "a"}
+                assert self.ns.get(node_id, subkey="unprocessed") == {"foo": "b"}
+                assert mock_get.call_count == 0
+
+            # the shared tier repopulates the local tier
+            local_bytes_cache.clear()
+            with mock.patch.object(Node.objects, "filter") as mock_filter:
+                assert self.ns.get_multi([node_id], subkey="unprocessed") == {node_id: {"foo": "b"}}
+                assert mock_filter.call_count == 0
+            assert local_bytes_cache.get(node_id) is not None
+
+            self.ns.delete(node_id)
+            assert local_bytes_cache.get(node_id) is None
+            assert self.ns.get(node_id) is None
+            assert self.ns.get(node_id, subkey="unprocessed") is None
+
+    def test_local_bytes_cache_evicts(self):
+        local_bytes_cache.clear()
+
+        with override_options({"nodestore.local-cache-size": 40}):
+            self.ns.set("a" * 32, {"foo": "a"})
+            self.ns.set("b" * 32, {"foo": "b"})
+            self.ns.set("c" * 32, {"foo": "c"})
+
+        assert len(local_bytes_cache) == 3
+        assert local_bytes_cache.size == 33
+
+        with override_options({"nodestore.local-cache-size": 30}):
+            self.ns.set("d" * 32, {"foo": "d"})
+
+        assert len(local_bytes_cache) == 2
+        assert local_bytes_cache.get("a" * 32) is None
+        assert local_bytes_cache.get("d" * 32) == b'{"foo":"d"}'
+        local_bytes_cache.clear()
@@ -97,3 +97,19 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+def test_set_subkeys_multi(ns):
+    ns.set_subkeys_multi(
+        {
+            "node_1": {None: {"foo": "a"}, "other": {"foo": "b"}},
+            "node_2": {None: {"foo": "c"}},
+        }
+    )
+    assert ns.get_multi(["node_1", "node_2"]) == {"node_1": {"foo": "a"}, "node_2": {"foo": "c"}}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get("node_2", subkey="other") is None
+
+    ns.set_multi({"node_1": {"foo": "d"}})
+    assert ns.get("node_1") == {"foo": "d"}
+    assert ns.get("node_1", subkey="other") is None
@@ -1,6 +1,7 @@
 import pytest
 
 from sentry.ownership.grammar import (
+    CompiledRules,
     Matcher,
     Owner,
     Rule,
@@ -191,6 +192,33 @@ def test_matcher_test_tags_without_tag_data(data):
     assert not Matcher("tags.bar", "barval").test(data)
 
 
+def test_compiled_rules():
+    rules = parse_rules(fixture_data)
+    compiled = CompiledRules(rules)
+
+    data = {
+        "request": {"url": "http://google.com/foo"},
+        "tags": [["foo", "bar"]],
+        "stacktrace": {
+            "frames": [
+                {"filename": "src/components/app.js", "module": "foo.bar"},
+                {"abs_path": "/usr/local/src/sentry/models.py"},
+            ]
+        },
+        "exception": {"values": [{"stacktrace": {"frames": [{"filename": "frontend/index.ts"}]}}]},
+    }
+
+    assert compiled.test(data) == [rule for rule in rules if rule.test(data)]
+    matchers = [rule.matcher for rule in compiled.test(data)]
+    assert Matcher("path", "*.js") in matchers
+    assert Matcher("url", "http://google.com/*") in matchers
+    assert Matcher("module", "foo.bar") in matchers
+    assert Matcher("codeowners", "/src/components/") in matchers
+    assert Matcher("codeowners", "frontend/*.ts") in matchers
+    assert Matcher("module", "foo bar") not in matchers
+    assert compiled.test({}) == []
+
+
 def _assert_matcher(matcher: Matcher, path_details, expected):
     """Helper function to reduce repeated code"""
     frames = {"stacktrace": {"frames": path_details}}
@@ -1,7 +1,7 @@
 import pytest
 
 from sentry.models import ProjectKey
-from sentry.relay.config import get_project_config
+from sentry.relay.config import get_project_config, get_project_config_for_key
 from sentry.testutils.helpers import Feature
 from sentry.utils.safe import get_path
 
@@ -119,3 +119,21 @@ def test_project_config_with_span_attributes(default_project, insta_snapshot):
 
     cfg = cfg.to_dict()
     insta_snapshot(cfg["config"]["spanAttributes"])
+
+
+@pytest.mark.django_db
+def test_get_project_config_for_key(default_project, factories):
+    factories.create_project_key(project=default_project)
+    keys = list(ProjectKey.objects.filter(project=default_project))
+    assert len(keys) == 2
+
+    project_config = get_project_config(default_project, project_keys=keys)
+    for key in keys:
+        cfg = get_project_config_for_key(default_project, project_config, key).to_dict()
+        expected = get_project_config(default_project, project_keys=[key]).to_dict()
+        for field in ("lastChange", "lastFetch", "rev"):
+            cfg.pop(field)
+            expected.pop(field)
+
+        assert cfg == expected
+        assert [k["publicKey"] for k in cfg["publicKeys"]] == [key.public_key]
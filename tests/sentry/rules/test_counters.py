@@ -0,0 +1,88 @@
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from sentry.rules.counters import (
+    COUNTER_TYPE_EVENTS,
+    COUNTER_TYPE_USERS,
+    get_window_count,
+    record_events,
+)
+from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.compat.mock import patch
+
+
+class FrequencyCountersTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        options = override_options(
+            {"rules.frequency-counters.write": True, "rules.frequency-counters.read": True}
+        )
+        options.__enter__()
+        self.addCleanup(options.__exit__, None, None, None)
+
+    def record(self, *events):
+        now = time.time()
+        events = [
+            {
+                "group_id": 1,
+                "environment_id": environment_id,
+                "timestamp": now - seconds_ago,
+                "user": user,
+            }
+            for environment_id, seconds_ago, user in events
+        ]
+        # Counting started ten minutes ago
+        with patch("sentry.rules.counters.time.time", return_value=now - 600):
+            record_events(events)
+
+    def get_count(self, counter_type, environment_id, start, end, group_id=1):
+        return get_window_count(counter_type, group_id, environment_id, start, end)
+
+    def test_window_count(self):
+        self.record((2, 120, "a"), (2, 120, "b"), (2, 90, "a"), (3, 30, "c"), (3, 7200, "d"))
+        end = timezone.now()
+        start = end - timedelta(minutes=5)
+
+        assert self.get_count(COUNTER_TYPE_EVENTS, None, start, end) == 4
+        assert self.get_count(COUNTER_TYPE_EVENTS, 2, start, end) == 3
+        assert self.get_count(COUNTER_TYPE_USERS, None, start, end) == 3
+        assert self.get_count(COUNTER_TYPE_USERS, 2, start, end) == 2
+        assert self.get_count(COUNTER_TYPE_EVENTS, 4, start, end) == 0
+
+        # Windows that end before the events were received
+        assert self.get_count(COUNTER_TYPE_EVENTS, None, start, end - timedelta(minutes=3)) == 0
+
+    def test_incomplete_window(self):
+        self.record((2, 120, "a"))
+        end = timezone.now()
+
+        # Counting started after the start of the window
+        assert self.get_count(COUNTER_TYPE_EVENTS, None, end - timedelta(hours=1), end) is None
+        # Windows too long or too old for the counters
+        assert self.get_count(COUNTER_TYPE_EVENTS, None, end - timedelta(days=1), end) is None
+        assert (
+            self.get_count(
+                COUNTER_TYPE_EVENTS,
+                None,
+                end - timedelta(days=1, minutes=5),
+                end - timedelta(days=1),
+            )
+            is None
+        )
+        # Groups without any events
+        assert (
+            self.get_count(COUNTER_TYPE_EVENTS, None, end - timedelta(minutes=5), end, group_id=2)
+            is None
+        )
+
+    def test_disabled(self):
+        self.record((2, 120, "a"))
+        end = timezone.now()
+
+        with override_options({"rules.frequency-counters.read": False}):
+            assert (
+                self.get_count(COUNTER_TYPE_EVENTS, None, end - timedelta(minutes=5), end) is None
+            )
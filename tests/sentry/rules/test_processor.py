@@ -155,6 +155,37 @@ class RuleProcessorTest(TestCase):
             # creates no rows.
             self.run_query_test(rp, 2)
 
+    @patch("sentry.rules.conditions.event_frequency.tsdb")
+    def test_frequency_conditions_share_queries(self, mock_tsdb):
+        mock_tsdb.get_sums.return_value = {self.event.group_id: 10}
+        Rule.objects.filter(project=self.event.project).delete()
+        for interval, value in (("1h", 5), ("1h", 20), ("1d", 5)):
+            Rule.objects.create(
+                project=self.event.project,
+                data={
+                    "conditions": [
+                        {
+                            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+                            "interval": interval,
+                            "value": value,
+                        }
+                    ],
+                    "actions": [EMAIL_ACTION_DATA],
+                },
+            )
+
+        rp = RuleProcessor(
+            self.event,
+            is_new=True,
+            is_regression=True,
+            is_new_group_environment=True,
+            has_reappeared=True,
+        )
+        results = list(rp.apply())
+        assert len(results) == 1
+        assert len(results[0][1]) == 2
+        assert mock_tsdb.get_sums.call_count == 2
+
 
 # mock filter which always passes
 class MockFilterTrue(EventFilter):
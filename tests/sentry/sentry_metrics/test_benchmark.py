@@ -0,0 +1,44 @@
+import pytest
+
+from sentry.sentry_metrics.indexer.base import UseCase
+from sentry.sentry_metrics.indexer.postgres import PostgresIndexer
+from sentry.testutils.skips import requires_pytest_benchmark
+
+
+BATCH_SIZE = 1000
+
+
+@requires_pytest_benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize("hit_ratio", [0.0, 0.5, 0.9, 1.0])
+@pytest.mark.parametrize("tier", ["local", "shared"])
+def test_benchmark_bulk_resolve(default_organization, hit_ratio, tier, benchmark):
+    """
+    Resolves a batch of strings, of which ``hit_ratio`` are cached in
+    ``tier``. The remaining strings exist in the database only.
+    """
+    indexer = PostgresIndexer(local_cache_size=BATCH_SIZE)
+    strings = [f"tag-value-{i}" for i in range(BATCH_SIZE)]
+    indexer.bulk_record(default_organization, UseCase.TAG_VALUE, strings)
+    cached = strings[: int(BATCH_SIZE * hit_ratio)]
+
+    def setup():
+        indexer.cache.client.flushdb()
+        indexer._ids.clear()
+        indexer.bulk_resolve(default_organization, UseCase.TAG_VALUE, cached)
+        if tier == "shared":
+            indexer._ids.clear()
+
+    try:
+        result = benchmark.pedantic(
+            indexer.bulk_resolve,
+            args=(default_organization, UseCase.TAG_VALUE, strings),
+            setup=setup,
+            rounds=20,
+        )
+    finally:
+        indexer.cache.client.flushdb()
+
+    assert None not in result.values()
+    benchmark.extra_info["strings"] = BATCH_SIZE
+    benchmark.extra_info["strings_per_second"] = BATCH_SIZE / benchmark.stats.stats.mean
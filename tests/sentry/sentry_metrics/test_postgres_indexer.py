@@ -0,0 +1,61 @@
+from sentry.models import MetricsKeyIndexer
+from sentry.sentry_metrics.indexer.base import UseCase
+from sentry.sentry_metrics.indexer.postgres import PostgresIndexer
+from sentry.testutils import TestCase
+from sentry.utils.compat.mock import patch
+
+
+class PostgresIndexerTest(TestCase):
+    def setUp(self):
+        self.indexer = PostgresIndexer()
+
+    def tearDown(self):
+        self.indexer.cache.client.flushdb()
+
+    def test_bulk_record(self):
+        strings = ["session", "session.status", "release"]
+        ids = self.indexer.bulk_record(self.organization, UseCase.METRIC, strings)
+        assert set(ids) == set(strings)
+        assert len(set(ids.values())) == 3
+
+        # recording again returns the same ids without touching the database
+        with patch.object(MetricsKeyIndexer.objects, "bulk_create") as bulk_create:
+            assert self.indexer.bulk_record(self.organization, UseCase.METRIC, strings) == ids
+            assert bulk_create.call_count == 0
+
+        # the ids are shared between processes
+        other = PostgresIndexer()
+        with patch.object(MetricsKeyIndexer.objects, "filter") as mock_filter:
+            assert other.bulk_resolve(self.organization, UseCase.TAG_KEY, strings) == ids
+            assert mock_filter.call_count == 0
+
+        assert self.indexer.reverse_resolve(self.organization, UseCase.METRIC, ids["release"]) == (
+            "release"
+        )
+        assert other.reverse_resolve(self.organization, UseCase.METRIC, ids["release"]) == (
+            "release"
+        )
+
+        # ids are scoped to the organization
+        organization = self.create_organization()
+        assert self.indexer.resolve(organization, UseCase.METRIC, "release") is None
+        assert self.indexer.reverse_resolve(organization, UseCase.METRIC, ids["release"]) is None
+        assert self.indexer.record(organization, UseCase.METRIC, "release") != ids["release"]
+
+    def test_negative_cache(self):
+        assert self.indexer.resolve(self.organization, UseCase.METRIC, "foo") is None
+
+        other = PostgresIndexer()
+        with patch.object(MetricsKeyIndexer.objects, "filter") as mock_filter:
+            assert other.resolve(self.organization, UseCase.METRIC, "foo") is None
+            assert mock_filter.call_count == 0
+
+        # recording a string overrides the negative cache entry
+        id = self.indexer.record(self.organization, UseCase.METRIC, "foo")
+        assert other.resolve(self.organization, UseCase.METRIC, "foo") == id
+
+    def test_local_cache_size(self):
+        indexer = PostgresIndexer(local_cache_size=2)
+        indexer.bulk_record(self.organization, UseCase.METRIC, ["a", "b", "c"])
+        assert len(indexer._ids) == 2
+        assert len(indexer._strings) == 2
@@ -1,8 +1,12 @@
 import unittest
+from concurrent.futures import Executor, Future
 from copy import deepcopy
 from datetime import timedelta
 
+import pytest
 import pytz
+import sentry_sdk
+from confluent_kafka import TopicPartition
 from dateutil.parser import parse as parse_date
 from django.conf import settings
 from exam import fixture, patcher
@@ -13,6 +17,8 @@ from sentry.snuba.query_subscription_consumer import (
     InvalidSchemaError,
     QuerySubscriptionConsumer,
     register_subscriber,
+    register_subscriber_prefetch,
+    subscriber_prefetch_registry,
     subscriber_registry,
 )
 from sentry.snuba.subscriptions import create_snuba_query, create_snuba_subscription
@@ -47,11 +53,15 @@ class BaseQuerySubscriptionTest:
             "timestamp": "2020-01-01T01:23:45.1234",
         }
 
-    def build_mock_message(self, data, topic=None):
+    def build_mock_message(self, data, topic=None, offset=None):
         message = mock.Mock()
         message.value.return_value = json.dumps(data)
         if topic:
             message.topic.return_value = topic
+        if offset is not None:
+            message.error.return_value = None
+            message.partition.return_value = 0
+            message.offset.return_value = offset
         return message
 
 
@@ -114,6 +124,130 @@ class HandleMessageTest(BaseQuerySubscriptionTest, TestCase):
         mock_callback.assert_called_once_with(data["payload"], sub)
 
 
+class InlineExecutor(Executor):
+    """
+    Runs submitted functions right away, so that they can see the test transaction.
+    Connections are not closed after the functions, as that would end the transaction.
+    """
+
+    def __init__(self):
+        self.closed_connections = 0
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        with mock.patch("sentry.snuba.query_subscription_consumer.connections") as mock_connections:
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+        self.closed_connections += mock_connections.close_all.call_count
+        return future
+
+
+class HandleBatchTest(BaseQuerySubscriptionTest, TestCase):
+    registration_key = "batch_test"
+
+    def setUp(self):
+        super().setUp()
+        self.orig_registry = deepcopy(subscriber_registry)
+        self.orig_prefetch_registry = deepcopy(subscriber_prefetch_registry)
+
+    def tearDown(self):
+        super().tearDown()
+        subscriber_registry.clear()
+        subscriber_registry.update(self.orig_registry)
+        subscriber_prefetch_registry.clear()
+        subscriber_prefetch_registry.update(self.orig_prefetch_registry)
+
+    def create_subscription(self):
+        with self.tasks():
+            snuba_query = create_snuba_query(
+                QueryDatasets.EVENTS,
+                "hello",
+                "count()",
+                timedelta(minutes=10),
+                timedelta(minutes=1),
+                None,
+            )
+            sub = create_snuba_subscription(self.project, self.registration_key, snuba_query)
+        sub.refresh_from_db()
+        return sub
+
+    def build_update(self, sub, value, offset):
+        data = deepcopy(self.valid_wrapper)
+        data["payload"]["subscription_id"] = sub.subscription_id
+        data["payload"]["result"] = {"data": [{"hello": value}]}
+        return self.build_mock_message(data, offset=offset)
+
+    def test_batch(self):
+        calls = []
+
+        def callback(subscription_update, subscription, prefetched=None):
+            calls.append((subscription.id, subscription_update["values"], prefetched))
+
+        prefetch = mock.Mock(side_effect=lambda subs: {sub.id: f"state-{sub.id}" for sub in subs})
+        register_subscriber(self.registration_key)(callback)
+        register_subscriber_prefetch(self.registration_key)(prefetch)
+
+        sub = self.create_subscription()
+        other_sub = self.create_subscription()
+        messages = [
+            self.build_update(sub, 1, 10),
+            self.build_update(other_sub, 2, 11),
+            self.build_update(sub, 3, 12),
+        ]
+
+        consumer = QuerySubscriptionConsumer("hello", max_batch_size=10, executor=InlineExecutor())
+        consumer.consumer = mock.Mock()
+        consumer.consumer.consume.return_value = messages
+        consumer.run_batch()
+
+        prefetch.assert_called_once_with([sub, other_sub])
+        assert [c for c in calls if c[0] == sub.id] == [
+            (sub.id, {"data": [{"hello": 1}]}, f"state-{sub.id}"),
+            (sub.id, {"data": [{"hello": 3}]}, None),
+        ]
+        assert [c for c in calls if c[0] == other_sub.id] == [
+            (other_sub.id, {"data": [{"hello": 2}]}, f"state-{other_sub.id}"),
+        ]
+        consumer.consumer.commit.assert_called_once_with(
+            offsets=[TopicPartition(consumer.topic, 0, 13)]
+        )
+        assert consumer.executor.closed_connections == 2
+
+    def test_batch_hub(self):
+        tags = []
+
+        def callback(subscription_update, subscription):
+            tags.append(sentry_sdk.Hub.current.scope._tags.get("batch"))
+
+        register_subscriber(self.registration_key)(callback)
+        messages = [self.build_update(self.create_subscription(), 1, 10)]
+
+        consumer = QuerySubscriptionConsumer("hello", max_batch_size=10, executor=InlineExecutor())
+        consumer.consumer = mock.Mock()
+        consumer.consumer.consume.return_value = messages
+        with sentry_sdk.Hub(sentry_sdk.Hub.current) as hub:
+            hub.scope.set_tag("batch", "caller")
+            consumer.run_batch()
+
+        assert tags == ["caller"]
+
+    def test_batch_error(self):
+        def callback(subscription_update, subscription):
+            raise ValueError("oops")
+
+        register_subscriber(self.registration_key)(callback)
+        messages = [self.build_update(self.create_subscription(), 1, 10)]
+
+        consumer = QuerySubscriptionConsumer("hello", max_batch_size=10, executor=InlineExecutor())
+        consumer.consumer = mock.Mock()
+        consumer.consumer.consume.return_value = messages
+        with pytest.raises(ValueError):
+            consumer.run_batch()
+        assert not consumer.consumer.commit.called
+
+
 class ParseMessageValueTest(BaseQuerySubscriptionTest, unittest.TestCase):
     def run_test(self, message):
         self.consumer.parse_message_value(json.dumps(message))
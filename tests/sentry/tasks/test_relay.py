@@ -3,8 +3,8 @@ import pytest
 from sentry.models import ProjectKey, ProjectOption
 from sentry.relay.projectconfig_cache.redis import RedisProjectConfigCache
 from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDebounceCache
-from sentry.tasks.relay import schedule_update_config_cache
-from sentry.utils.compat.mock import patch
+from sentry.tasks.relay import schedule_update_config_cache, update_config_cache
+from sentry.utils.compat.mock import Mock, patch
 
 
 def _cache_keys_for_project(project):
@@ -24,6 +24,7 @@ def redis_cache(monkeypatch):
     monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", cache.set_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.delete_many", cache.delete_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.get", cache.get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.get_many", cache.get_many)
 
     monkeypatch.setattr(
         "django.conf.settings.SENTRY_RELAY_PROJECTCONFIG_DEBOUNCE_CACHE",
@@ -118,6 +119,37 @@ def test_generate(
     ]
 
 
+@pytest.mark.django_db
+def test_generate_skips_unchanged(
+    monkeypatch, default_project, default_organization, default_projectkey, task_runner, redis_cache
+):
+    with task_runner():
+        schedule_update_config_cache(generate=True, organization_id=default_organization.id)
+
+    assert redis_cache.get(default_project.id)
+    assert redis_cache.get(default_projectkey.public_key)
+
+    set_many = Mock(wraps=redis_cache.set_many)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", set_many)
+
+    # unchanged configs are not written again, but do not expire either
+    key = f"relayconfig:{default_project.id}"
+    if redis_cache.is_redis_cluster:
+        client = redis_cache.cluster
+    else:
+        client = redis_cache.cluster.get_local_client_for_key(key)
+    client.expire(key, 10)
+    update_config_cache(generate=True, organization_id=default_organization.id)
+    set_many.assert_called_once_with({}, [default_project.id, default_projectkey.public_key])
+    assert client.ttl(key) > 10
+
+    redis_cache.delete_many([default_projectkey.public_key])
+    update_config_cache(generate=True, organization_id=default_organization.id)
+
+    (pk_json,) = redis_cache.get(default_projectkey.public_key)["publicKeys"]
+    assert pk_json["publicKey"] == default_projectkey.public_key
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize("entire_organization", (True, False))
 def test_invalidate(
@@ -14,15 +14,17 @@ from sentry.models import (
     File,
     Group,
     GroupAssignee,
+    GroupHash,
     GroupRedirect,
     UserReport,
 )
 from sentry.plugins.base.v2 import Plugin2
-from sentry.reprocessing2 import is_group_finished
+from sentry.reprocessing2 import is_group_finished, start_group_reprocessing
 from sentry.tasks.reprocessing2 import reprocess_group
 from sentry.tasks.store import preprocess_event
 from sentry.testutils.helpers import Feature
 from sentry.testutils.helpers.datetime import before_now, iso_format
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.cache import cache_key_for_event
 
 
@@ -55,6 +57,16 @@ def reprocessing_feature(monkeypatch):
         yield
 
 
+@pytest.fixture(params=(False, True), ids=("sequential", "bulk_fetch"))
+def bulk_fetch_events(request, monkeypatch):
+    if request.param:
+        # Chunks of several events, such that they are actually fetched at once
+        monkeypatch.setattr("sentry.tasks.reprocessing2.GROUP_REPROCESSING_CHUNK_SIZE", 3)
+
+    with override_options({"reprocessing2.bulk-fetch-events": request.param}):
+        yield request.param
+
+
 @pytest.fixture
 def process_and_save(default_project, task_runner):
     def inner(data, seconds_ago=1):
@@ -242,6 +254,7 @@ def test_max_events(
     monkeypatch,
     remaining_events,
     max_events,
+    bulk_fetch_events,
 ):
     @register_event_preprocessor
     def event_preprocessor(data):
@@ -313,6 +326,7 @@ def test_attachments_and_userfeedback(
     process_and_save,
     burst_task_runner,
     monkeypatch,
+    bulk_fetch_events,
 ):
     @register_event_preprocessor
     def event_preprocessor(data):
@@ -375,7 +389,13 @@ def test_attachments_and_userfeedback(
 @pytest.mark.snuba
 @pytest.mark.parametrize("remaining_events", ["keep", "delete"])
 def test_nodestore_missing(
-    default_project, reset_snuba, process_and_save, burst_task_runner, monkeypatch, remaining_events
+    default_project,
+    reset_snuba,
+    process_and_save,
+    burst_task_runner,
+    monkeypatch,
+    remaining_events,
+    bulk_fetch_events,
 ):
     logs = []
     monkeypatch.setattr("sentry.reprocessing2.logger.error", logs.append)
@@ -409,3 +429,20 @@ def test_nodestore_missing(
         )
 
     assert logs == ["reprocessing2.unprocessed_event.not_found"]
+
+
+@pytest.mark.django_db
+@pytest.mark.snuba
+def test_grouphash_cache_invalidated(default_project, reset_snuba, process_and_save):
+    with override_options({"store.grouphash-cache-ttl": 60}):
+        event_id = process_and_save({"message": "hello world"})
+
+    event = eventstore.get_event_by_id(default_project.id, event_id)
+    hashes = event.get_hashes().hashes
+    assert GroupHash.get_group_ids_from_cache(default_project.id, hashes) == {
+        hashes[0]: event.group_id
+    }
+
+    start_group_reprocessing(default_project.id, event.group_id, remaining_events="delete")
+
+    assert GroupHash.get_group_ids_from_cache(default_project.id, hashes) == {}
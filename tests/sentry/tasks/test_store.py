@@ -7,9 +7,11 @@ from sentry import quotas
 from sentry.event_manager import EventManager, HashDiscarded
 from sentry.plugins.base.v2 import Plugin2
 from sentry.tasks.store import (
+    batch_save_events,
     preprocess_event,
     process_event,
     save_event,
+    save_event_many,
     should_demote_symbolication,
     symbolicate_event,
     time_synthetic_monitoring_event,
@@ -306,6 +308,90 @@ def test_process_event_unprocessed(
     )
 
 
+@pytest.mark.django_db
+def test_batch_save_events(
+    default_project, mock_event_processing_store, mock_save_event, register_plugin
+):
+    register_plugin(globals(), BasicPreprocessorPlugin)
+
+    data = {
+        "project": default_project.id,
+        "platform": "noop",
+        "logentry": {"formatted": "test"},
+        "event_id": EVENT_ID,
+        "extra": {"foo": "bar"},
+    }
+
+    mock_event_processing_store.get.return_value = data
+
+    with mock.patch("sentry.tasks.store.save_event_many") as mock_save_event_many:
+        with batch_save_events():
+            process_event(cache_key="e:1", start_time=1)
+            process_event(cache_key="e:2", start_time=2)
+
+            assert mock_save_event_many.delay.call_count == 0
+
+    assert mock_save_event.delay.call_count == 0
+    mock_save_event_many.delay.assert_called_once_with(
+        events=[
+            {
+                "cache_key": "e:1",
+                "start_time": 1,
+                "event_id": EVENT_ID,
+                "project_id": default_project.id,
+            },
+            {
+                "cache_key": "e:2",
+                "start_time": 2,
+                "event_id": EVENT_ID,
+                "project_id": default_project.id,
+            },
+        ]
+    )
+
+
+@pytest.mark.django_db
+def test_save_event_many_falls_back_on_failure(default_project, mock_event_processing_store):
+    mock_event_processing_store.get_many.return_value = {
+        f"e:{i}": {
+            "project": default_project.id,
+            "platform": "python",
+            "type": "error",
+            "event_id": EVENT_ID,
+        }
+        for i in range(2)
+    }
+    events = [
+        {
+            "cache_key": f"e:{i}",
+            "start_time": 1,
+            "event_id": EVENT_ID,
+            "project_id": default_project.id,
+        }
+        for i in range(2)
+    ]
+
+    with mock.patch("sentry.event_manager.save_error_events", side_effect=ValueError), mock.patch(
+        "sentry.tasks.store._do_save_event"
+    ) as mock_do_save_event, mock.patch(
+        "sentry.tasks.store.attachment_cache"
+    ) as mock_attachment_cache:
+        save_event_many(events=events)
+
+    assert mock_do_save_event.mock_calls == [
+        mock.call(
+            cache_key=f"e:{i}",
+            data=None,
+            start_time=1,
+            event_id=EVENT_ID,
+            project_id=default_project.id,
+        )
+        for i in range(2)
+    ]
+    # cleaning up is left to `_do_save_event`
+    assert not mock_attachment_cache.delete.called
+
+
 @pytest.mark.django_db
 def test_hash_discarded_raised(default_project, mock_refund, register_plugin):
     register_plugin(globals(), BasicPreprocessorPlugin)
@@ -1,4 +1,17 @@
-from sentry.killswitches import _value_matches, normalize_value
+import time
+
+from django.test.utils import override_settings
+
+from sentry.killswitches import (
+    ALL_KILLSWITCH_OPTIONS,
+    CompiledKillswitch,
+    _value_matches,
+    compile_killswitch,
+    killswitch_matches_context,
+    normalize_value,
+)
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.compat.mock import patch
 
 
 def test_normalize_value():
@@ -67,3 +80,49 @@ def test_value_matches():
         [{"event_type": "transaction"}],
         {"project_id": 3, "event_type": "transaction"},
     )
+
+
+def test_compiled_killswitch_index():
+    compiled = CompiledKillswitch(
+        "store.load-shed-save-event-projects",
+        [
+            1,
+            {"platform": "python", "event_type": "transaction"},
+            {"project_id": 2, "platform": None},
+        ],
+    )
+    assert compiled.index == {
+        "project_id": {"1": [{"project_id": "1"}], "2": [{"project_id": "2"}]},
+        "platform": {"python": [{"platform": "python", "event_type": "transaction"}]},
+    }
+
+    assert compiled.matches({"project_id": 2, "event_type": "error", "platform": "java"})
+    assert compiled.matches({"project_id": 3, "event_type": "transaction", "platform": "python"})
+    assert not compiled.matches({"project_id": 3, "event_type": "error", "platform": "python"})
+    assert not compiled.matches({"project_id": None, "event_type": None, "platform": None})
+
+
+def test_compile_killswitch_reuses_unchanged_value():
+    name = "store.load-shed-group-creation-projects"
+    compiled = compile_killswitch(name, [{"project_id": 1}])
+    assert compile_killswitch(name, [{"project_id": 1}]) is compiled
+    assert compile_killswitch(name, [{"project_id": 2}]) is not compiled
+
+
+def test_killswitch_snapshot():
+    name = "store.load-shed-group-creation-projects"
+    context = {"project_id": 1, "platform": "python"}
+    values = {killswitch_name: [] for killswitch_name in ALL_KILLSWITCH_OPTIONS}
+
+    with override_settings(SENTRY_KILLSWITCH_SNAPSHOT_INTERVAL=60), patch(
+        "sentry.killswitches._snapshot", None
+    ):
+        with override_options({**values, name: [1]}):
+            assert killswitch_matches_context(name, context)
+
+        # the snapshot is still fresh
+        with override_options(values):
+            assert killswitch_matches_context(name, context)
+
+            with patch("sentry.killswitches.time.time", return_value=time.time() + 120):
+                assert not killswitch_matches_context(name, context)
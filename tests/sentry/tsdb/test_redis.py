@@ -179,6 +179,31 @@ class RedisTSDBTest(TestCase):
         results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
         assert results == {1: 0, 2: 0}
 
+    def test_get_range_multiple_keys(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+        keys = list(range(1, 101))
+
+        def timestamp(d):
+            t = int(to_timestamp(d))
+            return t - (t % 3600)
+
+        for i, dt in enumerate(dts):
+            self.db.incr_multi([(TSDBModel.group, key) for key in keys], dt, count=i + 1)
+
+        expected = [(timestamp(dt), i + 1) for i, dt in enumerate(dts)]
+
+        results = self.db.get_range(TSDBModel.group, keys, dts[0], dts[-1])
+        assert results == {key: expected for key in keys}
+
+        results = self.db.get_range_columnar(TSDBModel.group, keys + [1000], dts[0], dts[-1])
+        assert results[1] == ([timestamp(dt) for dt in dts], [1, 2, 3, 4])
+        assert results[100] == results[1]
+        assert results[1000] == ([timestamp(dt) for dt in dts], [0, 0, 0, 0])
+
+        results = self.db.get_sums(TSDBModel.group, keys, dts[0], dts[-1])
+        assert results == {key: 10 for key in keys}
+
     def test_count_distinct(self):
         now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
         dts = [now + timedelta(hours=i) for i in range(4)]
@@ -1,6 +1,6 @@
-from sentry.models import User
+from sentry.models import ProjectKey, User
 from sentry.testutils import TestCase
-from sentry.utils.query import RangeQuerySetWrapper
+from sentry.utils.query import RangeQuerySetWrapper, bulk_delete_objects_after
 
 
 class RangeQuerySetWrapperTest(TestCase):
@@ -26,3 +26,30 @@ class RangeQuerySetWrapperTest(TestCase):
             user.delete()
 
         assert User.objects.all().count() == 0
+
+
+class BulkDeleteObjectsAfterTest(TestCase):
+    def test_deletes_in_id_order(self):
+        other = self.create_project(organization=self.organization)
+        for _ in range(5):
+            ProjectKey.objects.create(project=self.project)
+        other_key = ProjectKey.objects.create(project=other)
+        project_keys = ProjectKey.objects.filter(project_id=self.project.id)
+        ids = sorted(project_keys.values_list("id", flat=True))
+        assert len(ids) >= 5
+
+        assert bulk_delete_objects_after(ProjectKey, limit=4, project_id=self.project.id) == (
+            4,
+            ids[3],
+        )
+        assert sorted(project_keys.values_list("id", flat=True)) == ids[4:]
+
+        assert bulk_delete_objects_after(
+            ProjectKey, limit=4, after_id=ids[3], project_id=self.project.id
+        ) == (len(ids) - 4, ids[-1])
+        assert bulk_delete_objects_after(
+            ProjectKey, limit=4, after_id=ids[-1], project_id=self.project.id
+        ) == (0, None)
+
+        assert not project_keys.exists()
+        assert ProjectKey.objects.filter(id=other_key.id).exists()